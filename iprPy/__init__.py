@@ -17,7 +17,7 @@ __all__ = ['__version__', 'rootdir', 'compatibility', 'tools', 'input',
            'record', 'load_record', 'calculation', 'load_calculation',
            'database', 'load_database', 'set_database', 'unset_database',
            'load_run_directory', 'set_run_directory', 'unset_run_directory',
-           'analysis', 'check_modules']
+           'analysis', 'check_modules', 'check_import_time']
 __all__.sort()
 
 # Define root package directory
@@ -41,4 +41,5 @@ from .database import (load_database, set_database, unset_database,
 
 from . import analysis
 
-from .check_modules import check_modules
\ No newline at end of file
+from .check_modules import check_modules
+from .check_import_time import check_import_time
\ No newline at end of file
@@ -32,6 +32,7 @@ class EvsRScan(Calculation):
         return [
                 'lammps_command',
                 'mpi_command',
+                'lammps_mode',
                 'length_unit',
                 'pressure_unit',
                 'energy_unit',
@@ -48,7 +48,13 @@ def main(*args):
                           ucell = input_dict['ucell'],
                           rmin = input_dict['minimum_r'],
                           rmax = input_dict['maximum_r'],
-                          rsteps = input_dict['number_of_steps_r'])
+                          rsteps = input_dict['number_of_steps_r'],
+                          mode = input_dict['lammps_mode'],
+                          lammps_date = input_dict['lammps_date'])
+    
+    # Record the version of the LAMMPS library if it was used
+    if 'lammps_version' in results_dict:
+        input_dict['lammps_version'] = results_dict['lammps_version']
     
     # Save data model of results
     script = os.path.splitext(os.path.basename(__file__))[0]
@@ -62,7 +68,8 @@ def main(*args):
 def e_vs_r(lammps_command, system, potential,
            mpi_command=None, ucell=None, 
            rmin=uc.set_in_units(2.0, 'angstrom'), 
-           rmax=uc.set_in_units(6.0, 'angstrom'), rsteps=200):
+           rmax=uc.set_in_units(6.0, 'angstrom'), rsteps=200, mode='script',
+           lammps_date=None):
     """
     Performs a cohesive energy scan over a range of interatomic spaces, r.
     
@@ -87,6 +94,16 @@ def e_vs_r(lammps_command, system, potential,
         The maximum r spacing to use (default value is 6.0 angstroms).
     rsteps : int, optional
         The number of r spacing steps to evaluate (default value is 200).
+    mode : str, optional
+        How LAMMPS is run.  'script' (default) runs one LAMMPS simulation
+        with a script that rescales the box and evaluates the energy for all
+        r values.  'library' keeps one LAMMPS instance alive using the LAMMPS
+        Python module, and rescales its box for each r value.  'subprocess'
+        runs a separate LAMMPS simulation for each r value.
+    lammps_date : datetime.date or None, optional
+        The date version of the LAMMPS executable.  Only used by the 'script'
+        mode.  If None, will be identified from the lammps_command (default is
+        None).
     
     Returns
     -------
@@ -101,10 +118,13 @@ def e_vs_r(lammps_command, system, potential,
           energies for each r value.
         - **'min_cell'** (*list of atomman.System*) - Systems corresponding to
           the minima identified in the Ecoh_values.
+        - **'lammps_version'** (*str*) - The version of the LAMMPS Python
+          module, only included if mode is 'library'.
     """
     
     # Make system a deepcopy of itself (protect original from changes)
     system = deepcopy(system)
+    lammps_version = None
     
     # Set ucell = system if ucell not given
     if ucell is None:
@@ -126,26 +146,43 @@ def e_vs_r(lammps_command, system, potential,
     a_values = r_values / r_a
     Ecoh_values = np.empty(rsteps)
     
-    # Loop over values
-    for i in range(rsteps):
+    # Get lammps units
+    lammps_units = lmp.style.unit(potential.units)
+    
+    # Evaluate all values with one LAMMPS script
+    if mode == 'script':
         
-        # Rescale system's box
-        a = a_values[i]
-        system.box_set(a = a * lx_a, 
-                       b = a * ly_a, 
-                       c = a * lz_a, 
-                       alpha=alpha, beta=beta, gamma=gamma, scale=True)
+        #Get lammps version date
+        if lammps_date is None:
+            lammps_date = iprPy.tools.checkversion(lammps_command)['date']
         
-        # Get lammps units
-        lammps_units = lmp.style.unit(potential.units)
+        # Build change_box commands for all values after the first
+        commands = []
         
-        # Define lammps variables
-        lammps_variables = {}
-        system_info = system.dump('atom_data', f='atom.dat',
-                                  units=potential.units,
-                                  atom_style=potential.atom_style)
-        lammps_variables['atomman_system_info'] = system_info
-        lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
+        # Keep the warning limit from interrupting the thermo output
+        if lammps_date >= datetime.date(2020, 10, 29):
+            commands.append('thermo_modify warn ignore')
+        for i in range(rsteps):
+            
+            # Rescale system's box
+            a = a_values[i]
+            system.box_set(a = a * lx_a, 
+                           b = a * ly_a, 
+                           c = a * lz_a, 
+                           alpha=alpha, beta=beta, gamma=gamma, scale=True)
+            
+            if i > 0:
+                commands.append(iprPy.tools.LammpsEngine.change_box_command(system, potential.units))
+                commands.append('run 0')
+            
+            # Define lammps variables using the first system
+            else:
+                lammps_variables = {}
+                system_info = system.dump('atom_data', f='atom.dat',
+                                          units=potential.units,
+                                          atom_style=potential.atom_style)
+                lammps_variables['atomman_system_info'] = system_info
+                lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
         
         # Write lammps input script
         template_file = 'run0.template'
@@ -155,21 +192,96 @@ def e_vs_r(lammps_command, system, potential,
         with open(lammps_script, 'w') as f:
             f.write(iprPy.tools.filltemplate(template, lammps_variables,
                                              '<', '>'))
+            f.write('\n\n')
+            f.write('\n'.join(commands))
+            f.write('\n')
         
         # Run lammps and extract data
         output = lmp.run(lammps_command, lammps_script, mpi_command)
         
-        thermo = output.simulations[0]['thermo']
+        for i in range(rsteps):
+            thermo = output.simulations[i]['thermo']
+            
+            if output.lammps_date < datetime.date(2016, 8, 1):
+                Ecoh_values[i] = uc.set_in_units(thermo.peatom.values[-1],
+                                                 lammps_units['energy'])
+            else:
+                Ecoh_values[i] = uc.set_in_units(thermo.v_peatom.values[-1],
+                                                 lammps_units['energy'])
         
-        if output.lammps_date < datetime.date(2016, 8, 1):
-            Ecoh_values[i] = uc.set_in_units(thermo.peatom.values[-1],
-                                             lammps_units['energy'])
+        # Rename log.lammps
+        shutil.move('log.lammps', 'run0-log.lammps')
+    
+    # Evaluate each value with a LAMMPS engine
+    else:
+        if mode == 'library':
+            library = True
+        elif mode == 'subprocess':
+            library = False
         else:
-            Ecoh_values[i] = uc.set_in_units(thermo.v_peatom.values[-1],
-                                             lammps_units['energy'])
+            raise ValueError('Invalid mode')
         
-        # Rename log.lammps
-        shutil.move('log.lammps', 'run0-'+str(i)+'-log.lammps')
+        with iprPy.tools.LammpsEngine(lammps_command, mpi_command=mpi_command,
+                                      library=library) as engine:
+            if engine.library:
+                lammps_version = engine.lammps_version
+            
+            # Loop over values
+            for i in range(rsteps):
+                
+                # Rescale system's box
+                a = a_values[i]
+                system.box_set(a = a * lx_a, 
+                               b = a * ly_a, 
+                               c = a * lz_a, 
+                               alpha=alpha, beta=beta, gamma=gamma, scale=True)
+                
+                # Rescale the box of the live LAMMPS instance
+                if engine.library and i > 0:
+                    engine.change_box(system, potential.units)
+                    engine.command('run 0')
+                    Ecoh_values[i] = uc.set_in_units(engine.extract_variable('peatom'),
+                                                     lammps_units['energy'])
+                    continue
+                
+                # Define lammps variables
+                lammps_variables = {}
+                system_info = system.dump('atom_data', f='atom.dat',
+                                          units=potential.units,
+                                          atom_style=potential.atom_style)
+                lammps_variables['atomman_system_info'] = system_info
+                lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
+                
+                # Write lammps input script
+                template_file = 'run0.template'
+                lammps_script = 'run0.in'
+                with open(template_file) as f:
+                    template = f.read()
+                with open(lammps_script, 'w') as f:
+                    f.write(iprPy.tools.filltemplate(template, lammps_variables,
+                                                     '<', '>'))
+                
+                # Start the live LAMMPS instance
+                if engine.library:
+                    engine.run(lammps_script, logfile='run0-log.lammps')
+                    Ecoh_values[i] = uc.set_in_units(engine.extract_variable('peatom'),
+                                                     lammps_units['energy'])
+                    continue
+                
+                # Run lammps and extract data
+                output = engine.run(lammps_script)
+                
+                thermo = output.simulations[0]['thermo']
+                
+                if output.lammps_date < datetime.date(2016, 8, 1):
+                    Ecoh_values[i] = uc.set_in_units(thermo.peatom.values[-1],
+                                                     lammps_units['energy'])
+                else:
+                    Ecoh_values[i] = uc.set_in_units(thermo.v_peatom.values[-1],
+                                                     lammps_units['energy'])
+                
+                # Rename log.lammps
+                shutil.move('log.lammps', 'run0-'+str(i)+'-log.lammps')
     
     # Find unit cell systems at the energy minimums
     min_cells = []
@@ -190,6 +302,8 @@ def e_vs_r(lammps_command, system, potential,
     results_dict['a_values'] = a_values
     results_dict['Ecoh_values'] = Ecoh_values
     results_dict['min_cell'] = min_cells
+    if lammps_version is not None:
+        results_dict['lammps_version'] = lammps_version
     
     return results_dict
     
@@ -248,6 +362,7 @@ def process_input(input_dict, UUID=None, build=True):
     
     # These are calculation-specific default strings
     input_dict['sizemults'] = input_dict.get('sizemults', '3 3 3')
+    input_dict['lammps_mode'] = input_dict.get('lammps_mode', 'script')
     
     # These are calculation-specific default booleans
     # None for this calculation
@@ -58,7 +58,8 @@ def main(*args):
                                        annealtemp =  input_dict['annealtemperature'],
                                        randomseed = input_dict['randomseed'],
                                        bshape = input_dict['dislocation_boundaryshape'],
-                                       bwidth = input_dict['boundarywidth'])
+                                       bwidth = input_dict['boundarywidth'],
+                                       dump_format = input_dict['dump_format'])
     
     # Save data model of results
     script = os.path.splitext(os.path.basename(__file__))[0]
@@ -75,7 +76,8 @@ def dislocationmonopole(lammps_command, system, potential, burgers,
                         etol=0.0, ftol=0.0, maxiter=10000, maxeval=100000,
                         dmax=uc.set_in_units(0.01, 'angstrom'),
                         annealtemp=0.0, bshape='circle',
-                        bwidth=uc.set_in_units(10, 'angstrom')):
+                        bwidth=uc.set_in_units(10, 'angstrom'),
+                        dump_format='text'):
     """
     Creates and relaxes a dislocation monopole system.
     
@@ -127,6 +129,9 @@ def dislocationmonopole(lammps_command, system, potential, burgers,
     bwidth : float, optional
         The minimum thickness of the boundary region (default is 10
         Angstroms).
+    dump_format : str, optional
+        The format of the saved dump files: 'text' for LAMMPS text dump files
+        or 'binary' for LAMMPS binary dump files (default is 'text').
     
     Returns
     -------
@@ -153,9 +158,12 @@ def dislocationmonopole(lammps_command, system, potential, burgers,
     # Initialize results dict
     results_dict = {}
     
+    # Get dump file extension
+    dump_ext = iprPy.tools.dump_extension(dump_format)
+    
     # Save initial perfect system
-    system.dump('atom_dump', f='base.dump')
-    results_dict['dumpfile_base'] = 'base.dump'
+    iprPy.tools.save_dump(system, 'base' + dump_ext)
+    results_dict['dumpfile_base'] = 'base' + dump_ext
     results_dict['symbols_base'] = system.symbols
     
     # Solve Stroh method for dislocation
@@ -178,20 +186,21 @@ def dislocationmonopole(lammps_command, system, potential, burgers,
                          etol = etol, 
                          ftol = ftol, 
                          maxiter = maxiter, 
-                         maxeval = maxeval)
+                         maxeval = maxeval,
+                         dump_format = dump_format)
     
     # Save relaxed dislocation system with original box vects
-    system_disl = am.load('atom_dump', relaxed['dumpfile'], symbols=system.symbols)
+    system_disl = iprPy.tools.load_dump(relaxed['dumpfile'], symbols=system.symbols)
     
     system_disl.box_set(vects=system.box.vects, origin=system.box.origin)
-    system_disl.dump('atom_dump', f='disl.dump')
-    results_dict['dumpfile_disl'] = 'disl.dump'
+    iprPy.tools.save_dump(system_disl, 'disl' + dump_ext)
+    results_dict['dumpfile_disl'] = 'disl' + dump_ext
     results_dict['symbols_disl'] = system_disl.symbols
     
     results_dict['E_total_disl'] = relaxed['E_total']
     
     # Cleanup files
-    os.remove('0.dump')
+    os.remove('0' + dump_ext)
     os.remove(relaxed['dumpfile'])
     for dumpjsonfile in glob.iglob('*.dump.json'):
         os.remove(dumpjsonfile)
@@ -246,7 +255,7 @@ def disl_boundary_fix(system, bwidth, bshape='circle', m=[1,0,0], n=[0,1,0]):
 def disl_relax(lammps_command, system, potential,
                mpi_command=None, annealtemp=0.0, randomseed=None,
                etol=0.0, ftol=1e-6, maxiter=10000, maxeval=100000,
-               dmax=uc.set_in_units(0.01, 'angstrom')):
+               dmax=uc.set_in_units(0.01, 'angstrom'), dump_format='text'):
     """
     Sets up and runs the disl_relax.in LAMMPS script for relaxing a
     dislocation monopole system.
@@ -285,6 +294,9 @@ def disl_relax(lammps_command, system, potential,
         The maximum distance in length units that any atom is allowed to relax
         in any direction during a single minimization iteration (default is
         0.01 Angstroms).
+    dump_format : str, optional
+        The format of the dump files: 'text' for LAMMPS text dump files or
+        'binary' for LAMMPS binary dump files (default is 'text').
         
     Returns
     -------
@@ -302,7 +314,7 @@ def disl_relax(lammps_command, system, potential,
     lammps_units = lmp.style.unit(potential.units)
     
     #Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.checkversion(lammps_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -318,6 +330,7 @@ def disl_relax(lammps_command, system, potential,
     lammps_variables['maxiter'] = maxiter
     lammps_variables['maxeval'] = maxeval
     lammps_variables['dmax'] = dmax
+    lammps_variables['dump_extension'] = iprPy.tools.dump_extension(dump_format)
     lammps_variables['group_move'] = ' '.join(np.array(range(1, system.natypes // 2 + 1), dtype=str))
     
     # Set dump_modify format based on dump_modify_version
@@ -342,7 +355,8 @@ def disl_relax(lammps_command, system, potential,
     # Extract output values
     results = {}
     results['logfile'] = 'log.lammps'
-    results['dumpfile'] = '%i.dump' % thermo.Step.values[-1] 
+    results['dumpfile'] = ('%i' % thermo.Step.values[-1]
+                           + lammps_variables['dump_extension'])
     results['E_total'] = uc.set_in_units(thermo.PotEng.values[-1],
                                          lammps_units['energy'])
     
@@ -430,6 +444,7 @@ def process_input(input_dict, UUID=None, build=True):
                                                   'circle')
     input_dict['forcetolerance'] = input_dict.get('forcetolerance',
                                                   '1.0e-6 eV/angstrom')
+    input_dict['dump_format'] = input_dict.get('dump_format', 'text')
     
     # These are calculation-specific default booleans
     # None for this calculation
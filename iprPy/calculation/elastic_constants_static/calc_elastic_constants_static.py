@@ -127,7 +127,7 @@ def elastic_constants_static(lammps_command, system, potential, mpi_command=None
     lammps_units = lmp.style.unit(potential.units)
     
     # Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.checkversion(lammps_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -50,7 +50,9 @@ def main(*args):
                                ftol = input_dict['forcetolerance'],
                                maxiter = input_dict['maxiterations'],
                                maxeval = input_dict['maxevaluations'],
-                               dmax = input_dict['maxatommotion'])
+                               dmax = input_dict['maxatommotion'],
+                               dump_format = input_dict['dump_format'],
+                               reference_cache = input_dict['reference_cache'])
     
     # Run check_ptd_config
     cutoff = 1.05 * input_dict['ucell'].box.a
@@ -69,10 +71,12 @@ def main(*args):
 
 def pointdefect(lammps_command, system, potential, point_kwargs,
                 mpi_command=None, etol=0.0, ftol=0.0, maxiter=10000,
-                maxeval=100000, dmax=uc.set_in_units(0.01, 'angstrom')):
+                maxeval=100000, dmax=uc.set_in_units(0.01, 'angstrom'),
+                dump_format='text', reference_cache=None):
     """
     Adds one or more point defects to a system and evaluates the defect 
-    formation energy.
+    formation energy.  The relaxed perfect crystal results can be shared
+    between calculations through a reference cache directory.
     
     Parameters
     ----------
@@ -108,6 +112,15 @@ def pointdefect(lammps_command, system, potential, point_kwargs,
         The maximum distance in length units that any atom is allowed to relax
         in any direction during a single minimization iteration (default is
         0.01 Angstroms).
+    dump_format : str, optional
+        The format of the saved dump files: 'text' for LAMMPS text dump files
+        or 'binary' for LAMMPS binary dump files (default is 'text').
+    reference_cache : str or None, optional
+        The path to a directory where the relaxed perfect crystal results are
+        shared.  If the results for the same potential, system and run
+        parameters have been saved there, the perfect crystal relaxation is
+        skipped.  Otherwise, the results are saved for other calculations to
+        use.  If None (default), results are not shared.
     
     Returns
     -------
@@ -126,26 +139,29 @@ def pointdefect(lammps_command, system, potential, point_kwargs,
           for the relaxed bulk system.
         - **'dumpfile_ptd'** (*str*) - The filename of the LAMMPS dump file
           for the relaxed defect system.
+        - **'reference_key'** (*str or None*) - The reference cache key of
+          the perfect system results if they were loaded from the cache instead
+          of being simulated, otherwise None.
     """
     
     # Get lammps units
     lammps_units = lmp.style.unit(potential.units)
     
     #Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.checkversion(lammps_command)['date']
+    
+    # Get dump file extension
+    dump_ext = iprPy.tools.dump_extension(dump_format)
     
     # Define lammps variables
     lammps_variables = {}
-    system_info = system.dump('atom_data', f='perfect.dat',
-                              units=potential.units,
-                              atom_style=potential.atom_style)
-    lammps_variables['atomman_system_info'] = system_info
     lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
     lammps_variables['etol'] = etol
     lammps_variables['ftol'] = uc.get_in_units(ftol, lammps_units['force'])
     lammps_variables['maxiter'] = maxiter
     lammps_variables['maxeval'] = maxeval
     lammps_variables['dmax'] = dmax
+    lammps_variables['dump_extension'] = dump_ext
     
     # Set dump_modify_format based on lammps_date
     if lammps_date < datetime.date(2016, 8, 3):
@@ -153,32 +169,66 @@ def pointdefect(lammps_command, system, potential, point_kwargs,
     else:
         lammps_variables['dump_modify_format'] = 'float %.13e'
     
-    # Write lammps input script
+    # Read lammps input script template
     template_file = 'min.template'
     lammps_script = 'min.in'
     with open(template_file) as f:
         template = f.read()
-    with open(lammps_script, 'w') as f:
-        f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
-
-    # Run lammps to relax perfect.dat
-    output = lmp.run(lammps_command, lammps_script, mpi_command)
     
-    # Extract LAMMPS thermo data.
-    thermo = output.simulations[0]['thermo']
-    E_total_base = uc.set_in_units(thermo.PotEng.values[-1],
-                                   lammps_units['energy'])
-    E_coh = E_total_base / system.natoms
+    # Look for shared perfect crystal reference results
+    reference = None
+    if reference_cache is not None:
+        reference_key = iprPy.tools.system_reference_key(
+            'point_defect_static', lammps_command, potential, system,
+            etol=etol, ftol=ftol, maxiter=maxiter, maxeval=maxeval, dmax=dmax)
+        reference = iprPy.tools.load_reference(reference_cache, reference_key)
+    
+    # Use shared perfect crystal reference results
+    if reference is not None:
+        values, files = reference
+        E_total_base = values['E_total_base']
+        iprPy.tools.use_reference_dump(files[values['dumpfile_base']],
+                                       'perfect' + dump_ext, system.symbols)
+        system_base = iprPy.tools.load_dump('perfect' + dump_ext,
+                                            symbols=system.symbols)
+        system_base.box_set(vects=system.box.vects)
     
-    # Rename log file
-    shutil.move('log.lammps', 'min-perfect-log.lammps')
+    else:
+        # Write lammps input script for perfect system
+        system_info = system.dump('atom_data', f='perfect.dat',
+                                  units=potential.units,
+                                  atom_style=potential.atom_style)
+        lammps_variables['atomman_system_info'] = system_info
+        with open(lammps_script, 'w') as f:
+            f.write(iprPy.tools.filltemplate(template, lammps_variables,
+                                             '<', '>'))
+        
+        # Run lammps to relax perfect.dat
+        output = lmp.run(lammps_command, lammps_script, mpi_command)
+        
+        # Extract LAMMPS thermo data.
+        thermo = output.simulations[0]['thermo']
+        E_total_base = uc.set_in_units(thermo.PotEng.values[-1],
+                                       lammps_units['energy'])
+        
+        # Rename log file
+        shutil.move('log.lammps', 'min-perfect-log.lammps')
+        
+        # Load relaxed system from dump file and copy old box vectors because 
+        # dump files crop the values.
+        last_dump_file = 'atom.' + str(thermo.Step.values[-1]) + dump_ext
+        system_base = iprPy.tools.load_dump(last_dump_file, symbols=system.symbols)
+        system_base.box_set(vects=system.box.vects)
+        iprPy.tools.save_dump(system_base, 'perfect' + dump_ext)
+        
+        # Share perfect crystal reference results
+        if reference_cache is not None:
+            iprPy.tools.save_reference(reference_cache, reference_key,
+                                       {'E_total_base': float(E_total_base),
+                                        'dumpfile_base': 'perfect' + dump_ext},
+                                       files=['perfect' + dump_ext])
     
-    # Load relaxed system from dump file and copy old box vectors because 
-    # dump files crop the values.
-    last_dump_file = 'atom.' + str(thermo.Step.values[-1])
-    system_base = am.load('atom_dump', last_dump_file, symbols=system.symbols)
-    system_base.box_set(vects=system.box.vects)
-    system_base.dump('atom_dump', f='perfect.dump')
+    E_coh = E_total_base / system.natoms
     
     # Add defect(s)
     system_ptd = deepcopy(system_base)
@@ -211,10 +261,10 @@ def pointdefect(lammps_command, system, potential, point_kwargs,
     
     # Load relaxed system from dump file and copy old vects as 
     # the dump files crop the values
-    last_dump_file = 'atom.'+str(thermo.Step.values[-1])
-    system_ptd = am.load('atom_dump', last_dump_file, symbols=system_ptd.symbols)
+    last_dump_file = 'atom.' + str(thermo.Step.values[-1]) + dump_ext
+    system_ptd = iprPy.tools.load_dump(last_dump_file, symbols=system_ptd.symbols)
     system_ptd.box_set(vects=system.box.vects)
-    system_ptd.dump('atom_dump', f='defect.dump')
+    iprPy.tools.save_dump(system_ptd, 'defect' + dump_ext)
     
     # Compute defect formation energy
     E_ptd_f = E_total_ptd - E_coh * system_ptd.natoms
@@ -233,8 +283,12 @@ def pointdefect(lammps_command, system, potential, point_kwargs,
     results_dict['E_total_ptd'] = E_total_ptd
     results_dict['system_base'] = system_base
     results_dict['system_ptd'] = system_ptd
-    results_dict['dumpfile_base'] = 'perfect.dump'
-    results_dict['dumpfile_ptd'] = 'defect.dump'
+    results_dict['dumpfile_base'] = 'perfect' + dump_ext
+    results_dict['dumpfile_ptd'] = 'defect' + dump_ext
+    if reference is not None:
+        results_dict['reference_key'] = reference_key
+    else:
+        results_dict['reference_key'] = None
     
     return results_dict
 
@@ -283,7 +337,7 @@ def check_ptd_config(system, point_kwargs, cutoff,
     elif len(point_kwargs) == 1:
         point_kwargs = point_kwargs[0]
         pos = point_kwargs['pos']
-        
+    
     # If it is a list of two (divacancy), use the first and average position
     elif len(point_kwargs) == 2:
         pos = (np.array(point_kwargs[0]['pos'])
@@ -293,7 +347,7 @@ def check_ptd_config(system, point_kwargs, cutoff,
     # More than two not supported by this function
     else:
         raise ValueError('Invalid point defect parameters')
-
+    
     # Initially set has_reconfigured to False
     has_reconfigured = False
     
@@ -306,18 +360,18 @@ def check_ptd_config(system, point_kwargs, cutoff,
     
     if not np.allclose(centrosummation, np.zeros(3), atol=tol):
         has_reconfigured = True
-        
+    
     # Calculate shift of defect atom's position if interstitial or substitutional
     if point_kwargs['ptd_type'] == 'i' or point_kwargs['ptd_type'] == 's':
         position_shift = system.dvect(system.natoms-1, pos)
-       
+        
         if not np.allclose(position_shift, np.zeros(3), atol=tol):
             has_reconfigured = True
         
         return {'has_reconfigured': has_reconfigured,
                 'centrosummation': centrosummation,
                 'position_shift': position_shift}
-        
+    
     # Investigate if dumbbell vector has shifted direction 
     elif point_kwargs['ptd_type'] == 'db':
         db_vect = point_kwargs['db_vect'] / np.linalg.norm(point_kwargs['db_vect'])
@@ -369,6 +423,8 @@ def process_input(input_dict, UUID=None, build=True):
     input_dict['sizemults'] = input_dict.get('sizemults', '5 5 5')
     input_dict['forcetolerance'] = input_dict.get('forcetolerance',
                                                   '1.0e-6 eV/angstrom')
+    input_dict['dump_format'] = input_dict.get('dump_format', 'text')
+    input_dict['reference_cache'] = input_dict.get('reference_cache', None)
     
     # These are calculation-specific default booleans
     # None for this calculation
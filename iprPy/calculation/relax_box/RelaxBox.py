@@ -36,6 +36,8 @@ class RelaxBox(Calculation):
                 'pressure_unit',
                 'energy_unit',
                 'force_unit',
+                'cij_update',
+                'dump_format',
                ]
     
     @property
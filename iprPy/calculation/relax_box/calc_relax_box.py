@@ -10,6 +10,7 @@ import sys
 import uuid
 import shutil
 import datetime
+import time
 from copy import deepcopy
 
 # http://www.numpy.org/
@@ -51,7 +52,9 @@ def main(*args):
                              p_xy = input_dict['pressure_xy'],
                              p_xz = input_dict['pressure_xz'],
                              p_yz = input_dict['pressure_yz'],
-                             strainrange = input_dict['strainrange'])
+                             strainrange = input_dict['strainrange'],
+                             cij_update = input_dict['cij_update'],
+                             dump_format = input_dict['dump_format'])
     
     # Save data model of results
     script = os.path.splitext(os.path.basename(__file__))[0]
@@ -65,7 +68,8 @@ def main(*args):
 def relax_box(lammps_command, system, potential,
               mpi_command=None, strainrange=1e-6,
               p_xx=0.0, p_yy=0.0, p_zz=0.0, p_xy=0.0, p_xz=0.0, p_yz=0.0,
-              tol=1e-10, diverge_scale=3.):
+              tol=1e-10, diverge_scale=3., cij_update='always',
+              cij_tol=0.01, dump_format='text'):
     """
     Quickly refines static orthorhombic system by evaluating the elastic
     constants and the virial pressure.
@@ -102,6 +106,22 @@ def relax_box(lammps_command, system, potential,
         original dimension multiplied by diverge_scale, or if any current box
         dimension is less than the original dimension divided by diverge_scale.
         (Default is 3.0).
+    cij_update : str, optional
+        Indicates how the elastic compliances used to update the box
+        dimensions are obtained for each cycle.  'always' (default)
+        evaluates the elastic constants every cycle.  'fixed' stops evaluating
+        the elastic constants once the compliances have stabilized and
+        reuses them, only measuring the stress state in later cycles.
+        'broyden' is like 'fixed' but also refines the reused compliances
+        with a Broyden update from the measured stress changes for as long
+        as the stress keeps decreasing.
+    cij_tol : float, optional
+        The relative change in the compliances between two successive
+        cycles below which they are considered stable (default is 0.01).
+        Not used if cij_update is 'always'.
+    dump_format : str, optional
+        The format of the saved dump files: 'text' for LAMMPS text dump files
+        or 'binary' for LAMMPS binary dump files (default is 'text').
     
     Returns
     -------
@@ -120,12 +140,23 @@ def relax_box(lammps_command, system, potential,
         - **'C_elastic'** (*atomman.ElasticConstants*) - The relaxed system's
           elastic constants.
         - **'system_relaxed'** (*atomman.System*) - The relaxed system.
+        - **'cycles'** (*int*) - The number of LAMMPS runs performed.
+        - **'cij_evaluations'** (*int*) - The number of LAMMPS runs that
+          evaluated the elastic constants.
+        - **'cycle_cij'** (*list of bool*) - Indicates if the elastic
+          constants were evaluated for each cycle.
+        - **'cycle_times'** (*list of float*) - The wall time in seconds of
+          each cycle.
     
     Raises
     ------
+    ValueError
+        If cij_update is not a supported style.
     RuntimeError
         If system diverges or no convergence reached after 100 cycles.
     """
+    if cij_update not in ['always', 'fixed', 'broyden']:
+        raise ValueError('Unsupported cij_update style ' + str(cij_update))
     
     # Flag for if values have converged
     converged = False
@@ -134,16 +165,62 @@ def relax_box(lammps_command, system, potential,
     system_current = deepcopy(system)
     system_old = None
     
-    system.dump('atom_dump', f='initial.dump')
+    # Compliances to use and the stress residual of system_old
+    compliance = None
+    residual_old = None
+    
+    # Flags for if the compliances are stable, and are no longer updated
+    stable = False
+    frozen = cij_update != 'broyden'
+    
+    # Lists of per-cycle convergence info
+    cycle_cij = []
+    cycle_times = []
+    
+    # Save initial configuration as a dump file
+    dump_ext = iprPy.tools.dump_extension(dump_format)
+    iprPy.tools.save_dump(system, 'initial' + dump_ext)
     
     for cycle in range(100):
+        start_time = time.time()
+        
+        # Evaluate the elastic constants until they stabilize
+        if not stable:
+            compliance_old = compliance
+            compliance = None
         
         # Run LAMMPS and evaluate results based on system_old
         results = calc_cij(lammps_command, system_current, potential,
                            mpi_command=mpi_command,
                            p_xx=p_xx, p_yy=p_yy, p_zz=p_zz,
-                           strainrange=strainrange, cycle=cycle)
-        system_new = results['system_new']
+                           strainrange=strainrange, cycle=cycle,
+                           compliance=compliance)
+        residual = results['residual']
+        cycle_cij.append(compliance is None)
+        cycle_times.append(time.time() - start_time)
+        
+        # Use newly evaluated compliances and check if they are stable
+        if compliance is None:
+            compliance = compliance_cij = results['compliance']
+            if cij_update != 'always' and compliance_old is not None:
+                stable = (np.linalg.norm(compliance - compliance_old)
+                          < cij_tol * np.linalg.norm(compliance))
+        
+        # Revert to the evaluated compliances once the stress stops
+        # decreasing.  This keeps the cycles deterministic when the stress is
+        # limited by numerical noise so that the double-value test applies.
+        elif (not frozen and
+              np.linalg.norm(residual) >= np.linalg.norm(residual_old)):
+            compliance = compliance_cij
+            frozen = True
+        
+        # Refine the reused compliances using the last step
+        elif not frozen:
+            compliance = broyden_update(compliance,
+                                        box_strain(system_old, system_current),
+                                        residual - residual_old)
+        
+        system_new = relax_step(system_current, compliance, residual)
         
         # Compare new and current to test for convergence
         if np.allclose(system_new.box.vects,
@@ -161,12 +238,21 @@ def relax_box(lammps_command, system, potential,
                                    b = (system_new.box.b+system_old.box.b) / 2.,
                                    c = (system_new.box.c+system_old.box.c) / 2.,
                                    scale=True)
-            # Calculate Cij for the averaged system
+            # Evaluate the averaged system
+            if not stable:
+                compliance = None
+            start_time = time.time()
             results = calc_cij(lammps_command, system_current, potential,
                                mpi_command=mpi_command,
                                p_xx=p_xx, p_yy=p_yy, p_zz=p_zz, 
-                               strainrange=strainrange, cycle=cycle+1)
-            system_new = results['system_new']
+                               strainrange=strainrange, cycle=cycle+1,
+                               compliance=compliance)
+            cycle_cij.append(compliance is None)
+            cycle_times.append(time.time() - start_time)
+            if compliance is None:
+                compliance = results['compliance']
+            system_new = relax_step(system_current, compliance,
+                                    results['residual'])
             converged = True
             break
         
@@ -189,16 +275,17 @@ def relax_box(lammps_command, system, potential,
         # If not converged or diverged, current -> old and new -> current
         else:
             system_old, system_current = system_current, system_new
+            residual_old = residual
     
     # Return values when converged
     if converged:
-        system_new.dump('atom_dump', f='final.dump')
+        iprPy.tools.save_dump(system_new, 'final' + dump_ext)
         
         # Build results_dict
         results_dict = {}
-        results_dict['dumpfile_initial'] = 'initial.dump'
+        results_dict['dumpfile_initial'] = 'initial' + dump_ext
         results_dict['symbols_initial'] = system.symbols
-        results_dict['dumpfile_final'] = 'final.dump'
+        results_dict['dumpfile_final'] = 'final' + dump_ext
         results_dict['symbols_final'] = system.symbols
         
         results_dict['lx'] = system_new.box.lx
@@ -216,16 +303,21 @@ def relax_box(lammps_command, system, potential,
         results_dict['measured_pxz'] = results['measured_pxz']
         results_dict['measured_pyz'] = results['measured_pyz']
         
+        results_dict['cycles'] = len(cycle_cij)
+        results_dict['cij_evaluations'] = sum(cycle_cij)
+        results_dict['cycle_cij'] = cycle_cij
+        results_dict['cycle_times'] = cycle_times
+        
         return results_dict
     else:
         raise RuntimeError('Failed to converge after 100 cycles')
 
 def calc_cij(lammps_command, system, potential,
              mpi_command=None, p_xx=0.0, p_yy=0.0, p_zz=0.0,
-             strainrange=1e-6, cycle=0):
+             strainrange=1e-6, cycle=0, compliance=None):
     """
     Runs cij.in LAMMPS script to evaluate Cij, and E_coh of the current system,
-    and define a new system with updated box dimensions to test.
+    and the stress residual used to update the box dimensions.
     
     Parameters
     ----------
@@ -253,6 +345,10 @@ def calc_cij(lammps_command, system, potential,
     cycle : int, optional
         Indicates the iteration cycle of quick_a_Cij().  This is used to
         uniquely save the LAMMPS input and output files.
+    compliance : numpy.ndarray, optional
+        The 3x3 normal elastic compliances being reused.  If given, only the
+        stress state of the system is measured and the strained states used
+        to evaluate Cij are skipped.
     
     Returns
     -------
@@ -260,17 +356,13 @@ def calc_cij(lammps_command, system, potential,
         Dictionary of results consisting of keys:
         
         - **'E_coh'** (*float*) - The cohesive energy of the supplied system.
-        - **'stress'** (*numpy.array*) - The measured stress state of the
-          supplied system.
+        - **'residual'** (*numpy.ndarray*) - The normal stresses of the
+          supplied system offset by the target pressures.
         - **'C_elastic'** (*atomman.ElasticConstants*) - The supplied system's
-          elastic constants.
-        - **'system_new'** (*atomman.System*) - System with updated box
-          dimensions.
-    
-    Raises
-    ------
-    RuntimeError
-        If any of the new box dimensions are less than zero.
+          elastic constants.  Only included if compliance is not given.
+        - **'compliance'** (*numpy.ndarray*) - The 3x3 normal elastic
+          compliances of the supplied system.  Only included if compliance
+          is not given.
     """
     
     # Get lammps units
@@ -285,6 +377,10 @@ def calc_cij(lammps_command, system, potential,
     lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
     lammps_variables['delta'] = strainrange
     lammps_variables['steps'] = 2
+    if compliance is None:
+        lammps_variables['evaluate_cij'] = 1
+    else:
+        lammps_variables['evaluate_cij'] = 0
     
     # Write lammps input script
     template_file = 'cij.template'
@@ -319,6 +415,27 @@ def calc_cij(lammps_command, system, potential,
     pe = uc.set_in_units(np.array(output.finds('PotEng')) / system.natoms,
                          lammps_units['energy'])
     
+    # Extract the current stress state
+    stress = -1 * np.array([[pxx[0], pxy[0], pxz[0]],
+                            [pxy[0], pyy[0], pyz[0]],
+                            [pxz[0], pyz[0], pzz[0]]])
+    
+    results_dict = {}
+    results_dict['E_coh'] = pe[0]
+    results_dict['residual'] = np.array([stress[0,0] + p_xx,
+                                         stress[1,1] + p_yy,
+                                         stress[2,2] + p_zz])
+    results_dict['measured_pxx'] = pxx[0]
+    results_dict['measured_pyy'] = pyy[0]
+    results_dict['measured_pzz'] = pzz[0]
+    results_dict['measured_pxy'] = pxy[0]
+    results_dict['measured_pxz'] = pxz[0]
+    results_dict['measured_pyz'] = pyz[0]
+    
+    # Stop if only the stress state was measured
+    if compliance is not None:
+        return results_dict
+    
     # Set the six non-zero strain values
     strains = np.array([ (lx[2] -  lx[1])  / lx[0],
                          (ly[4] -  ly[3])  / ly[0],
@@ -345,20 +462,36 @@ def calc_cij(lammps_command, system, potential,
     
     C = am.ElasticConstants(Cij=cij)
     
-    S = C.Sij
+    results_dict['C_elastic'] = C
+    results_dict['compliance'] = C.Sij[:3, :3]
+    return results_dict
+
+def relax_step(system, compliance, residual):
+    """
+    Defines a new system with box dimensions updated to relieve the stress
+    residual.
     
-    # Extract the current stress state
-    stress = -1 * np.array([[pxx[0], pxy[0], pxz[0]],
-                            [pxy[0], pyy[0], pyz[0]],
-                            [pxz[0], pyz[0], pzz[0]]])
+    Parameters
+    ----------
+    system : atomman.System
+        The system that the residual was measured for.
+    compliance : numpy.ndarray
+        The 3x3 normal elastic compliances to use.
+    residual : numpy.ndarray
+        The normal stresses of system offset by the target pressures.
     
-    s_xx = stress[0,0] + p_xx
-    s_yy = stress[1,1] + p_yy
-    s_zz = stress[2,2] + p_zz
+    Returns
+    -------
+    atomman.System
+        System with updated box dimensions.
     
-    new_a = system.box.a / (S[0,0]*s_xx + S[0,1]*s_yy + S[0,2]*s_zz + 1)
-    new_b = system.box.b / (S[1,0]*s_xx + S[1,1]*s_yy + S[1,2]*s_zz + 1)
-    new_c = system.box.c / (S[2,0]*s_xx + S[2,1]*s_yy + S[2,2]*s_zz + 1)
+    Raises
+    ------
+    RuntimeError
+        If any of the new box dimensions are less than zero.
+    """
+    new_a, new_b, new_c = (np.array([system.box.a, system.box.b, system.box.c])
+                           / (compliance.dot(residual) + 1))
     
     if new_a <= 0 or new_b <= 0 or new_c <=0:
         raise RuntimeError('Divergence of box dimensions to <= 0')
@@ -366,16 +499,43 @@ def calc_cij(lammps_command, system, potential,
     system_new = deepcopy(system)
     system_new.box_set(a=new_a, b=new_b, c=new_c, scale=True)
     
-    results_dict = {}
-    results_dict['E_coh'] = pe[0]
-    results_dict['system_new'] = system_new
-    results_dict['measured_pxx'] = pxx[0]
-    results_dict['measured_pyy'] = pyy[0]
-    results_dict['measured_pzz'] = pzz[0]
-    results_dict['measured_pxy'] = pxy[0]
-    results_dict['measured_pxz'] = pxz[0]
-    results_dict['measured_pyz'] = pyz[0]
-    return results_dict
+    return system_new
+
+def box_strain(system_old, system_new):
+    """
+    Returns the normal (logarithmic) strains between two systems' boxes.
+    """
+    return np.log(np.array([system_new.box.a / system_old.box.a,
+                            system_new.box.b / system_old.box.b,
+                            system_new.box.c / system_old.box.c]))
+
+def broyden_update(compliance, strain, delta_residual):
+    """
+    Refines reused elastic compliances with Broyden's (good) update so that
+    they reproduce the last measured change in stress residual.
+    
+    Parameters
+    ----------
+    compliance : numpy.ndarray
+        The 3x3 normal elastic compliances used for the last step.
+    strain : numpy.ndarray
+        The normal strains of the last step.
+    delta_residual : numpy.ndarray
+        The change in stress residual due to the last step.
+    
+    Returns
+    -------
+    numpy.ndarray
+        The updated compliances, or the given compliances if the update is
+        ill-conditioned.
+    """
+    # Relieving the residual requires strain = -compliance . residual
+    Sr = compliance.dot(delta_residual)
+    denom = strain.dot(Sr)
+    if abs(denom) <= 1e-12 * np.linalg.norm(strain) * np.linalg.norm(Sr):
+        return compliance
+    
+    return compliance - np.outer(strain + Sr, strain.dot(compliance)) / denom
 
 def process_input(input_dict, UUID=None, build=True):
     """
@@ -408,6 +568,8 @@ def process_input(input_dict, UUID=None, build=True):
     
     # These are calculation-specific default strings
     input_dict['sizemults'] = input_dict.get('sizemults', '1 1 1')
+    input_dict['cij_update'] = input_dict.get('cij_update', 'always')
+    input_dict['dump_format'] = input_dict.get('dump_format', 'text')
     
     # These are calculation-specific default booleans
     # None for this calculation
@@ -56,7 +56,8 @@ def main(*args):
                                  thermosteps = input_dict['thermosteps'],
                                  dumpsteps = input_dict['dumpsteps'],
                                  equilsteps = input_dict['equilsteps'],
-                                 randomseed = input_dict['randomseed'])
+                                 randomseed = input_dict['randomseed'],
+                                 dump_format = input_dict['dump_format'])
     
     # Save data model of results
     script = os.path.splitext(os.path.basename(__file__))[0]
@@ -71,7 +72,7 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
                   p_xx=0.0, p_yy=0.0, p_zz=0.0, p_xy=0.0, p_xz=0.0, p_yz=0.0,
                   temperature=0.0, integrator=None, runsteps=220000,
                   thermosteps=100, dumpsteps=None, equilsteps=20000,
-                  randomseed=None):
+                  randomseed=None, dump_format='text'):
     """
     Performs a full dynamic relax on a given system at the given temperature
     to the specified pressure state.
@@ -121,6 +122,9 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
         Random number seed used by LAMMPS in creating velocities and with
         the Langevin thermostat.  (Default is None which will select a
         random int between 1 and 900000000.)
+    dump_format : str, optional
+        The format of the saved dump files: 'text' for LAMMPS text dump files
+        or 'binary' for LAMMPS binary dump files (default is 'text').
     
     Returns
     -------
@@ -163,12 +167,15 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
     lammps_units = lmp.style.unit(potential.units)
     
     #Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.checkversion(lammps_command)['date']
     
     # Handle default values
     if dumpsteps is None:
         dumpsteps = runsteps
     
+    # Get dump file extension
+    dump_ext = iprPy.tools.dump_extension(dump_format)
+    
     # Define lammps variables
     lammps_variables = {}
     system_info = system.dump('atom_data', f='init.dat',
@@ -186,6 +193,7 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
     lammps_variables['thermosteps'] = thermosteps
     lammps_variables['runsteps'] = runsteps
     lammps_variables['dumpsteps'] = dumpsteps
+    lammps_variables['dump_extension'] = dump_ext
     
     # Set compute stress/atom based on LAMMPS version
     if lammps_date < datetime.date(2014, 2, 12):
@@ -214,13 +222,13 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
     results = {}
     thermo = output.simulations[0]['thermo']
     
-    results['dumpfile_initial'] = '0.dump'
+    results['dumpfile_initial'] = '0' + dump_ext
     results['symbols_initial'] = system.symbols
     
     # Load relaxed system from dump file
-    last_dump_file = str(thermo.Step.values[-1])+'.dump'
+    last_dump_file = str(thermo.Step.values[-1]) + dump_ext
     results['dumpfile_final'] = last_dump_file
-    system = am.load('atom_dump', last_dump_file, symbols=system.symbols)
+    system = iprPy.tools.load_dump(last_dump_file, symbols=system.symbols)
     results['symbols_final'] = system.symbols
     
     # Only consider values where Step >= equilsteps
@@ -429,6 +437,7 @@ def process_input(input_dict, UUID=None, build=True):
     # These are calculation-specific default strings
     input_dict['sizemults'] = input_dict.get('sizemults', '10 10 10')
     input_dict['integrator'] = input_dict.get('integrator', None)
+    input_dict['dump_format'] = input_dict.get('dump_format', 'text')
     
     # These are calculation-specific default booleans
     # None for this calculation
@@ -36,6 +36,7 @@ class RelaxStatic(Calculation):
                 'pressure_unit',
                 'energy_unit',
                 'force_unit',
+                'dump_format',
                ]
     
     @property
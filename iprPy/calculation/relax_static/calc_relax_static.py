@@ -11,7 +11,6 @@ import uuid
 import glob
 import shutil
 import datetime
-from copy import deepcopy
 
 # http://www.numpy.org/
 import numpy as np
@@ -59,7 +58,8 @@ def main(*args):
                                 maxeval = input_dict['maxevaluations'],
                                 dmax = input_dict['maxatommotion'],
                                 maxcycles = input_dict['maxcycles'],
-                                ctol = input_dict['cycletolerance'])
+                                ctol = input_dict['cycletolerance'],
+                                dump_format = input_dict['dump_format'])
     
     # Save data model of results
     script = os.path.splitext(os.path.basename(__file__))[0]
@@ -74,7 +74,7 @@ def relax_static(lammps_command, system, potential, mpi_command=None,
                  p_xx=0.0, p_yy=0.0, p_zz=0.0, p_xy=0.0, p_xz=0.0, p_yz=0.0,
                  dispmult=0.0, etol=0.0, ftol=0.0,  maxiter=10000,
                  maxeval=100000, dmax=uc.set_in_units(0.01, 'angstrom'),
-                 maxcycles=100, ctol=1e-10):
+                 maxcycles=100, ctol=1e-10, dump_format='text'):
     """
     Repeatedly runs the ELASTIC example distributed with LAMMPS until box
     dimensions converge within a tolerance.
@@ -135,6 +135,9 @@ def relax_static(lammps_command, system, potential, mpi_command=None,
     ctol : float, optional
         The relative tolerance used to determine if the lattice constants have
         converged (default is 1e-10).
+    dump_format : str, optional
+        The format of the saved dump files: 'text' for LAMMPS text dump files
+        or 'binary' for LAMMPS binary dump files (default is 'text').
     
     Returns
     -------
@@ -161,99 +164,85 @@ def relax_static(lammps_command, system, potential, mpi_command=None,
     lammps_units = lmp.style.unit(potential.units)
     
     # Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.checkversion(lammps_command)['date']
+    
+    # Get dump file extension
+    dump_ext = iprPy.tools.dump_extension(dump_format)
     
     # Save initial configuration as a dump file
-    system.dump('atom_dump', f='initial.dump')
+    iprPy.tools.save_dump(system, 'initial' + dump_ext)
     
     # Apply small random distortions to atoms
     system.atoms.pos += dispmult * np.random.rand(*system.atoms.pos.shape) - dispmult / 2
     
-    # Initialize parameters
-    old_vects = system.box.vects
-    converged = False
-    
-    # Run minimizations up to maxcycles times
-    for cycle in range(maxcycles):
-        old_system = deepcopy(system)
-        
-        # Define lammps variables
-        lammps_variables = {}
-        system_info = system.dump('atom_data', f='init.dat',
-                                  units=potential.units,
-                                  atom_style=potential.atom_style)
-        lammps_variables['atomman_system_info'] = system_info
-        lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
-        lammps_variables['p_xx'] = uc.get_in_units(p_xx, lammps_units['pressure'])
-        lammps_variables['p_yy'] = uc.get_in_units(p_yy, lammps_units['pressure'])
-        lammps_variables['p_zz'] = uc.get_in_units(p_zz, lammps_units['pressure'])
-        lammps_variables['p_xy'] = uc.get_in_units(p_xy, lammps_units['pressure'])
-        lammps_variables['p_xz'] = uc.get_in_units(p_xz, lammps_units['pressure'])
-        lammps_variables['p_yz'] = uc.get_in_units(p_yz, lammps_units['pressure'])
-        lammps_variables['etol'] = etol
-        lammps_variables['ftol'] = uc.get_in_units(ftol, lammps_units['force'])
-        lammps_variables['maxiter'] = maxiter
-        lammps_variables['maxeval'] = maxeval
-        lammps_variables['dmax'] = uc.get_in_units(dmax, lammps_units['length'])
-        
-        # Set dump_modify_format based on lammps_date
-        if lammps_date < datetime.date(2016, 8, 3):
-            lammps_variables['dump_modify_format'] = '"%d %d %.13e %.13e %.13e %.13e"'
-        else:
-            lammps_variables['dump_modify_format'] = 'float %.13e'
-        
-        # Write lammps input script
-        template_file = 'minbox.template'
-        lammps_script = 'minbox.in'
-        with open(template_file) as f:
-            template = f.read()
-        with open(lammps_script, 'w') as f:
-            f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
-        
-        # Run LAMMPS and extract thermo data
-        logfile = 'log-' + str(cycle) + '.lammps'
-        output = lmp.run(lammps_command, lammps_script, mpi_command, logfile=logfile)
-        thermo = output.simulations[0]['thermo']
-        
-        # Clean up dump files
-        os.remove('0.dump')
-        last_dump_file = str(thermo.Step.values[-1]) + '.dump'
-        renamed_dump_file = 'relax_static-' + str(cycle) + '.dump'
-        shutil.move(last_dump_file, renamed_dump_file)
-        
-        # Load relaxed system
-        system = am.load('atom_dump', renamed_dump_file, symbols=system.symbols)
-        
-        # Test if box dimensions have converged
-        if np.allclose(old_vects, system.box.vects, rtol=ctol, atol=0):
-            converged = True
-            break
-        else:
-            old_vects = system.box.vects
-    
-    # Check for convergence
-    if converged is False:
+    # Define lammps variables
+    lammps_variables = {}
+    system_info = system.dump('atom_data', f='init.dat',
+                              units=potential.units,
+                              atom_style=potential.atom_style)
+    lammps_variables['atomman_system_info'] = system_info
+    lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
+    lammps_variables['p_xx'] = uc.get_in_units(p_xx, lammps_units['pressure'])
+    lammps_variables['p_yy'] = uc.get_in_units(p_yy, lammps_units['pressure'])
+    lammps_variables['p_zz'] = uc.get_in_units(p_zz, lammps_units['pressure'])
+    lammps_variables['p_xy'] = uc.get_in_units(p_xy, lammps_units['pressure'])
+    lammps_variables['p_xz'] = uc.get_in_units(p_xz, lammps_units['pressure'])
+    lammps_variables['p_yz'] = uc.get_in_units(p_yz, lammps_units['pressure'])
+    lammps_variables['etol'] = etol
+    lammps_variables['ftol'] = uc.get_in_units(ftol, lammps_units['force'])
+    lammps_variables['maxiter'] = maxiter
+    lammps_variables['maxeval'] = maxeval
+    lammps_variables['dmax'] = uc.get_in_units(dmax, lammps_units['length'])
+    lammps_variables['maxcycles'] = maxcycles
+    
+    lammps_variables['boxchange'] = boxchange(ctol)
+    lammps_variables['dumpfile'] = 'relax_static' + dump_ext
+    
+    # Set dump_modify_format based on lammps_date
+    if lammps_date < datetime.date(2016, 8, 3):
+        lammps_variables['dump_modify_format'] = '"%d %d %.13e %.13e %.13e %.13e"'
+    else:
+        lammps_variables['dump_modify_format'] = 'float %.13e'
+    
+    # Write lammps input script
+    template_file = 'minbox.template'
+    lammps_script = 'minbox.in'
+    with open(template_file) as f:
+        template = f.read()
+    with open(lammps_script, 'w') as f:
+        f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
+    
+    # Run LAMMPS, which repeats the minimization until the box converges
+    output = lmp.run(lammps_command, lammps_script, mpi_command)
+    
+    # Check for convergence: the final configuration is only dumped if the
+    # box converged, and its run 0 comes after one simulation per cycle
+    if not os.path.isfile(lammps_variables['dumpfile']):
         raise RuntimeError('Failed to converge after ' + str(maxcycles) + ' cycles')
+    cycles = len(output.simulations) - 1
+    renamed_dump_file = 'relax_static-' + str(cycles - 1) + dump_ext
+    shutil.move(lammps_variables['dumpfile'], renamed_dump_file)
+    
+    # Extract the final box and thermo data
+    thermo = output.simulations[-1]['thermo']
+    lx = thermo.Lx.values[-1]
+    ly = thermo.Ly.values[-1]
+    lz = thermo.Lz.values[-1]
+    xy = thermo.Xy.values[-1]
+    xz = thermo.Xz.values[-1]
+    yz = thermo.Yz.values[-1]
     
     # Zero out near-zero tilt factors
-    lx = system.box.lx
-    ly = system.box.ly
-    lz = system.box.lz
-    xy = system.box.xy
-    xz = system.box.xz
-    yz = system.box.yz
     if np.isclose(xy/ly, 0.0, rtol=0.0, atol=1e-10):
         xy = 0.0
     if np.isclose(xz/lz, 0.0, rtol=0.0, atol=1e-10):
         xz = 0.0
     if np.isclose(yz/lz, 0.0, rtol=0.0, atol=1e-10):
         yz = 0.0
-    system.box.set(lx=lx, ly=ly, lz=lz, xy=xy, xz=xz, yz=yz)
-    system.wrap()
     
     # Build results_dict
     results_dict = {}
-    results_dict['dumpfile_initial'] = 'initial.dump'
+    results_dict['dumpfile_initial'] = 'initial' + dump_ext
     results_dict['symbols_initial'] = system.symbols
     results_dict['dumpfile_final'] = renamed_dump_file
     results_dict['symbols_final'] = system.symbols
@@ -282,6 +271,37 @@ def relax_static(lammps_command, system, potential, mpi_command=None,
     
     return results_dict
 
+def boxchange(ctol):
+    """
+    Builds the LAMMPS equal-style variable formula used by minbox.template
+    to test if the box dimensions converged during a cycle.
+    
+    Parameters
+    ----------
+    ctol : float
+        The relative tolerance used to determine if the box dimensions have
+        converged.
+    
+    Returns
+    -------
+    str
+        Formula for the sum of how much each box term changed by more than
+        its tolerance, which is only zero if the box dimensions converged.
+        The tolerance of each term is ctol times the larger of the term and
+        the largest box length, so that tilt factors that should be zero
+        converge even though their round-off noise changes sign each cycle.
+    """
+    # Comparison operators cannot be used as they match the delimiters, and
+    # max() is a special function in LAMMPS so it is built from abs()
+    def lmpmax(a, b):
+        return '(({0})+({1})+abs(({0})-({1})))/2'.format(a, b)
+    
+    floor = lmpmax('lx', lmpmax('ly', 'lz'))
+    excess = 'abs({0}-v_{0}0)-{1!r}*{2}'
+    return '+'.join(['({0}+abs({0}))'.format(
+                        excess.format(term, ctol, lmpmax('abs(%s)' % term, floor)))
+                     for term in ['lx', 'ly', 'lz', 'xy', 'xz', 'yz']])
+
 def process_input(input_dict, UUID=None, build=True):
     """
     Processes str input parameters, assigns default values if needed, and
@@ -315,6 +335,7 @@ def process_input(input_dict, UUID=None, build=True):
     input_dict['sizemults'] = input_dict.get('sizemults', '1 1 1')
     input_dict['forcetolerance'] = input_dict.get('forcetolerance',
                                                   '1.0e-6 eV/angstrom')
+    input_dict['dump_format'] = input_dict.get('dump_format', 'text')
     
     # These are calculation-specific default booleans
     # None for this calculation
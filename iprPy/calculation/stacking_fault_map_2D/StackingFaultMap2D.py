@@ -32,10 +32,15 @@ class StackingFaultMap2D(Calculation):
         return [
                 'lammps_command',
                 'mpi_command',
+                'lammps_mode',
+                'stackingfault_nprocs',
+                'stackingfault_symmetry',
+                'symmetryprecision',
                 'length_unit',
                 'pressure_unit',
                 'energy_unit',
                 'force_unit',
+                'dump_format',
                ]
     
     @property
@@ -11,6 +11,7 @@ import uuid
 import shutil
 import datetime
 from copy import deepcopy
+from multiprocessing import Pool
 
 # http://www.numpy.org/
 import numpy as np 
@@ -18,6 +19,9 @@ import numpy as np
 # https://pandas.pydata.org/
 import pandas as pd
 
+# https://atztogo.github.io/spglib/python-spglib.html
+import spglib
+
 # https://github.com/usnistgov/atomman 
 import atomman as am
 import atomman.lammps as lmp
@@ -53,7 +57,16 @@ def main(*args):
                                      ftol = input_dict['forcetolerance'],
                                      maxiter = input_dict['maxiterations'],
                                      maxeval = input_dict['maxevaluations'],
-                                     dmax = input_dict['maxatommotion'])
+                                     dmax = input_dict['maxatommotion'],
+                                     nprocs = input_dict['stackingfault_nprocs'],
+                                     symmetry = input_dict['stackingfault_symmetry'],
+                                     symprec = input_dict['symmetryprecision'],
+                                     mode = input_dict['lammps_mode'],
+                                     dump_format = input_dict['dump_format'])
+    
+    # Record the version of the LAMMPS library if it was used
+    if 'lammps_version' in results_dict:
+        input_dict['lammps_version'] = results_dict['lammps_version']
     
     results_dict['gamma'] = am.defect.GammaSurface(a1vect = input_dict['stackingfault_shiftvector1'],
                                                    a2vect = input_dict['stackingfault_shiftvector2'],
@@ -77,7 +90,7 @@ def stackingfaultpoint(lammps_command, system, potential,
                        faultshift=[0.0, 0.0, 0.0], etol=0.0, ftol=0.0,
                        maxiter=10000, maxeval=100000,
                        dmax=uc.set_in_units(0.01, 'angstrom'),
-                       lammps_date=None):
+                       lammps_date=None, engine=None, dump_format='text'):
     """
     Perform a stacking fault relaxation simulation for a single faultshift.
     
@@ -122,6 +135,12 @@ def stackingfaultpoint(lammps_command, system, potential,
         by faultpos (default is [0,0,0], i.e. no shift applied).
     lammps_date : datetime.date or None, optional
         The date version of the LAMMPS executable.  If None, will be identified from the lammps_command (default is None).
+    engine : iprPy.tools.LammpsEngine, optional
+        The engine to run LAMMPS with.  If not given, LAMMPS is run as a
+        subprocess using lammps_command and mpi_command.
+    dump_format : str, optional
+        The format of the dump files: 'text' for LAMMPS text dump files or
+        'binary' for LAMMPS binary dump files (default is 'text').
     
     Returns
     -------
@@ -229,7 +248,10 @@ def stackingfaultpoint(lammps_command, system, potential,
        
     #Get lammps version date
     if lammps_date is None:
-        lammps_date = lmp.checkversion(lammps_command)['date']
+        if engine is not None:
+            lammps_date = engine.lammps_date
+        else:
+            lammps_date = iprPy.tools.checkversion(lammps_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -246,6 +268,7 @@ def stackingfaultpoint(lammps_command, system, potential,
     lammps_variables['maxiter'] = maxiter
     lammps_variables['maxeval'] = maxeval
     lammps_variables['dmax'] = uc.get_in_units(dmax, lammps_units['length'])
+    lammps_variables['dump_extension'] = iprPy.tools.dump_extension(dump_format)
     
     # Set dump_modify format based on dump_modify_version
     if lammps_date < datetime.date(2016, 8, 3):
@@ -263,18 +286,23 @@ def stackingfaultpoint(lammps_command, system, potential,
                                          '<', '>'))
     
     # Run LAMMPS
-    output = lmp.run(lammps_command, lammps_script, mpi_command,
-                     logfile=os.path.join(sim_directory, 'log.lammps'))
+    if engine is not None:
+        output = engine.run(lammps_script,
+                            logfile=os.path.join(sim_directory, 'log.lammps'))
+    else:
+        output = lmp.run(lammps_command, lammps_script, mpi_command,
+                         logfile=os.path.join(sim_directory, 'log.lammps'))
     
     # Extract output values
     thermo = output.simulations[-1]['thermo']
     logfile = os.path.join(sim_directory, 'log.lammps')
-    dumpfile = os.path.join(sim_directory, '%i.dump' % thermo.Step.values[-1])
+    dumpfile = os.path.join(sim_directory, '%i%s' % (thermo.Step.values[-1],
+                                                     lammps_variables['dump_extension']))
     E_total = uc.set_in_units(thermo.PotEng.values[-1],
                               lammps_units['energy'])
     
     #Load relaxed system
-    sfsystem = am.load('atom_dump', dumpfile, symbols=sfsystem.symbols)
+    sfsystem = iprPy.tools.load_dump(dumpfile, symbols=sfsystem.symbols)
     
     # Find center of mass difference in top/bottom planes
     disp = (sfsystem.atoms.pos[abovefault, cutindex].mean()
@@ -297,7 +325,7 @@ def stackingfaultworker(lammps_command, system, potential,
                         faultpos=0.5, etol=0.0, ftol=0.0, maxiter=10000,
                         maxeval=100000, 
                         dmax=uc.set_in_units(0.01, 'angstrom'),
-                        lammps_date=None):
+                        lammps_date=None, engine=None, dump_format='text'):
     """
     A wrapper function around stackingfaultpoint. Converts
     shiftfractions and shiftvectors to a faultshift, runs stackingfaultpoint,
@@ -323,7 +351,9 @@ def stackingfaultworker(lammps_command, system, potential,
                             dmax=dmax,
                             faultshift=faultshift,
                             sim_directory=sim_directory,
-                            lammps_date=lammps_date)
+                            lammps_date=lammps_date,
+                            engine=engine,
+                            dump_format=dump_format)
     
     # Add shiftfractions to sf results
     sf['shift1'] = shiftfraction1
@@ -331,15 +361,44 @@ def stackingfaultworker(lammps_command, system, potential,
     
     return sf
 
+# Common stackingfaultworker parameters for pool workers
+poolparams = None
+
+def init_stackingfaultpool(lammps_command, system, potential, shiftvector1,
+                           shiftvector2, kwargs):
+    """
+    Initializes a stackingfaultmap pool worker by storing the parameters
+    common to all grid points.
+    """
+    global poolparams
+    poolparams = (lammps_command, system, potential, shiftvector1,
+                  shiftvector2, kwargs)
+
+def stackingfaultpoolworker(shiftfraction1, shiftfraction2):
+    """
+    Calls stackingfaultworker in a pool worker.  The relaxed system is not
+    returned as it can be loaded from the dump file.
+    """
+    lammps_command, system, potential, shiftvector1, shiftvector2, kwargs = poolparams
+    sf = stackingfaultworker(lammps_command, system, potential,
+                             shiftvector1, shiftvector2,
+                             shiftfraction1, shiftfraction2, **kwargs)
+    del sf['system']
+    return sf
+
 def stackingfaultmap(lammps_command, system, potential,
                      shiftvector1, shiftvector2, mpi_command=None,
                      numshifts1=11, numshifts2=11,
                      cutboxvector=None, faultpos=0.5,
                      etol=0.0, ftol=0.0, maxiter=10000, maxeval=100000,
-                     dmax=uc.set_in_units(0.01, 'angstrom')):
+                     dmax=uc.set_in_units(0.01, 'angstrom'), nprocs=1,
+                     symmetry=False, symprec=0.01, mode='subprocess',
+                     dump_format='text'):
     """
     Computes a generalized stacking fault map for shifts along a regular 2D
-    grid.
+    grid.  Each grid point is evaluated in its own simulation directory,
+    allowing for the points to be evaluated in parallel.  Optionally, only
+    the symmetry-irreducible grid points are evaluated.
     
     Parameters
     ----------
@@ -381,6 +440,27 @@ def stackingfaultmap(lammps_command, system, potential,
     numshifts2 : int, optional
         The number of equally spaced shiftfractions to evaluate along
         shiftvector2.
+    nprocs : int, optional
+        The number of grid points to evaluate at the same time using a
+        process pool.  (Default is 1, i.e. evaluate serially.)
+    symmetry : bool, optional
+        If True, only grid points that are not equivalent by the symmetry of
+        the system in the fault plane are evaluated, and the results of the
+        other grid points are copied from their equivalents.  If False
+        (default), all grid points are evaluated.
+    symprec : float, optional
+        Absolute length tolerance in angstroms used by spglib in identifying
+        the symmetry of the system.  Only used if symmetry is True.  (Default
+        is 0.01, matching the symmetryprecision input default.)
+    mode : str, optional
+        How LAMMPS is run when nprocs is 1.  'subprocess' (default) runs a
+        separate LAMMPS simulation with lammps_command for each grid point.
+        'library' keeps one LAMMPS instance alive using the LAMMPS Python
+        module for all grid points.  Parallel evaluations always use
+        'subprocess'.
+    dump_format : str, optional
+        The format of the dump files: 'text' for LAMMPS text dump files or
+        'binary' for LAMMPS binary dump files (default is 'text').
     
     Returns
     -------
@@ -397,34 +477,100 @@ def stackingfaultmap(lammps_command, system, potential,
           of mass difference between before and after applying the faultshift
           for all the (shift1, shift2) coordinates.
         - **'A_fault'** (*float*) - The area of the fault surface.
+        - **'lammps_version'** (*str*) - The version of the LAMMPS Python
+          module, only included if mode is 'library'.
     """
    
     # Start sf_df as empty list
     sf_df = []
+    lammps_version = None
 
     # Construct mesh of regular points
     shifts1, shifts2 = np.meshgrid(np.linspace(0, 1, numshifts1),
                                    np.linspace(0, 1, numshifts2))
     
-    # Identify lammps_date version
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    # Identify the grid point to evaluate for each grid point
+    if symmetry:
+        irreducible = stackingfaultsymmetry(system, shiftvector1,
+                                            shiftvector2,
+                                            numshifts1=numshifts1,
+                                            numshifts2=numshifts2,
+                                            cutboxvector=cutboxvector,
+                                            symprec=symprec)
+    else:
+        irreducible = np.arange(shifts1.size)
+    evaluate = np.unique(irreducible)
+    
+    # Define the common worker parameters
+    kwargs = {}
+    kwargs['mpi_command'] = mpi_command
+    kwargs['cutboxvector'] = cutboxvector
+    kwargs['faultpos'] = faultpos
+    kwargs['etol'] = etol
+    kwargs['ftol'] = ftol
+    kwargs['maxiter'] = maxiter
+    kwargs['maxeval'] = maxeval
+    kwargs['dmax'] = dmax
+    kwargs['dump_format'] = dump_format
+    
+    # Evaluate shift combinations in parallel
+    if nprocs > 1:
+        
+        # Identify lammps_date version
+        kwargs['lammps_date'] = iprPy.tools.checkversion(lammps_command)['date']
+        
+        # Share the common parameters with the workers once
+        pool = Pool(nprocs, initializer=init_stackingfaultpool,
+                    initargs=(lammps_command, system, potential,
+                              shiftvector1, shiftvector2, kwargs))
+        try:
+            jobs = []
+            for shiftfraction1, shiftfraction2 in zip(shifts1.flat[evaluate],
+                                                      shifts2.flat[evaluate]):
+                jobs.append(pool.apply_async(stackingfaultpoolworker,
+                                             (shiftfraction1, shiftfraction2)))
+            pool.close()
+            
+            # Collect results in grid order
+            for job in jobs:
+                sf_df.append(job.get())
+        finally:
+            pool.terminate()
+            pool.join()
     
     # Loop over all shift combinations
-    for shiftfraction1, shiftfraction2 in zip(shifts1.flat, shifts2.flat):
+    else:
+        if mode == 'library':
+            library = True
+        elif mode == 'subprocess':
+            library = False
+        else:
+            raise ValueError('Invalid mode')
         
-        # Evaluate the system at the shift
-        sf_df.append(stackingfaultworker(lammps_command, system, potential,
-                                         shiftvector1, shiftvector2,
-                                         shiftfraction1, shiftfraction2,
-                                         mpi_command=mpi_command,
-                                         cutboxvector=cutboxvector,
-                                         faultpos=faultpos,
-                                         etol=etol,
-                                         ftol=ftol,
-                                         maxiter=maxiter,
-                                         maxeval=maxeval,
-                                         dmax=dmax,
-                                         lammps_date=lammps_date))
+        with iprPy.tools.LammpsEngine(lammps_command, mpi_command=mpi_command,
+                                      library=library) as engine:
+            kwargs['engine'] = engine
+            kwargs['lammps_date'] = engine.lammps_date
+            if engine.library:
+                lammps_version = engine.lammps_version
+            for shiftfraction1, shiftfraction2 in zip(shifts1.flat[evaluate],
+                                                      shifts2.flat[evaluate]):
+                
+                # Evaluate the system at the shift
+                sf_df.append(stackingfaultworker(lammps_command, system, potential,
+                                                 shiftvector1, shiftvector2,
+                                                 shiftfraction1, shiftfraction2,
+                                                 **kwargs))
+    
+    # Copy results to symmetry-equivalent grid points
+    if len(evaluate) < shifts1.size:
+        evaluated = dict(zip(evaluate, sf_df))
+        sf_df = []
+        for i in range(shifts1.size):
+            sf = dict(evaluated[irreducible[i]])
+            sf['shift1'] = shifts1.flat[i]
+            sf['shift2'] = shifts2.flat[i]
+            sf_df.append(sf)
     
     # Convert sf_df to pandas DataFrame
     sf_df = pd.DataFrame(sf_df)
@@ -451,9 +597,134 @@ def stackingfaultmap(lammps_command, system, potential,
     results_dict['E_gsf'] = E_gsf
     results_dict['delta_disp'] = delta_disp
     results_dict['A_fault'] = A_fault
+    if lammps_version is not None:
+        results_dict['lammps_version'] = lammps_version
     
     return results_dict
 
+def stackingfaultsymmetry(system, shiftvector1, shiftvector2,
+                          numshifts1=11, numshifts2=11, cutboxvector='c',
+                          symprec=0.01):
+    """
+    Identifies which points of a generalized stacking fault grid are
+    equivalent by symmetry.  Only the symmetry operations of the system that
+    leave the fractional coordinate along the cutboxvector unchanged are
+    used, as these map the atoms above and below the fault plane onto
+    themselves.  The rotations of these operations transform the shift, and
+    the pure translations offset the shift by a lattice vector.  Grid points
+    at shift fractions 0 and 1 are also taken as equivalent.
+    
+    Parameters
+    ----------
+    system : atomman.System
+        The system to perform the calculation on.
+    shiftvector1 : list of floats or numpy.array
+        One of the generalized stacking fault shifting vectors.
+    shiftvector2 : list of floats or numpy.array
+        One of the generalized stacking fault shifting vectors.
+    numshifts1 : int, optional
+        The number of equally spaced shiftfractions to evaluate along
+        shiftvector1.
+    numshifts2 : int, optional
+        The number of equally spaced shiftfractions to evaluate along
+        shiftvector2.
+    cutboxvector : str, optional
+        Indicates which of the three system box vectors, 'a', 'b', or 'c', to
+        cut with a non-periodic boundary (default is 'c').
+    symprec : float, optional
+        Absolute length tolerance in angstroms used by spglib in identifying
+        the symmetry of the system.  (Default is 0.01.)
+    
+    Returns
+    -------
+    numpy.array of int
+        For each point of the flattened grid, the index of the first
+        equivalent grid point.
+    
+    Raises
+    ------
+    ValueError
+        For invalid cutboxvectors.
+    """
+    if cutboxvector not in ['a', 'b', 'c']:
+        raise ValueError('Invalid cutboxvector')
+    cutindex = ['a', 'b', 'c'].index(cutboxvector)
+    numshifts = np.array([numshifts1, numshifts2])
+    
+    # Get the symmetry operations of the system
+    cell = system.dump('spglib_cell')
+    symmetry = spglib.get_symmetry(cell, symprec=symprec)
+    
+    # Express the shiftvectors in fractional box coordinates
+    shiftvectors = np.array([shiftvector1, shiftvector2], dtype=float)
+    basis = np.linalg.solve(np.asarray(cell[0]).T, shiftvectors.T)
+    
+    # Find how each operation transforms the shiftfractions
+    transforms = []
+    offsets = []
+    for rotation, translation in zip(symmetry['rotations'],
+                                     symmetry['translations']):
+        
+        # Skip operations that move atoms along the cutboxvector
+        if (rotation[cutindex, cutindex] != 1
+            or np.any(np.delete(rotation[cutindex], cutindex) != 0)
+            or np.any(np.delete(rotation[:, cutindex], cutindex) != 0)
+            or not np.isclose(translation[cutindex],
+                              np.round(translation[cutindex]),
+                              atol=1e-5, rtol=0.0)):
+            continue
+        
+        # Pure translations offset the shiftfractions
+        if np.all(rotation == np.identity(3, dtype=int)):
+            offset = np.linalg.lstsq(basis, translation, rcond=None)[0]
+            if np.allclose(basis.dot(offset), translation, atol=1e-5):
+                offsets.append(offset)
+            continue
+        
+        # Skip operations that do not map the shiftvectors onto themselves
+        rotated = rotation.dot(basis)
+        transform = np.linalg.lstsq(basis, rotated, rcond=None)[0]
+        if np.allclose(basis.dot(transform), rotated, atol=1e-8):
+            transforms.append(transform)
+    
+    # Key each grid point by its periodically unique indices
+    period = np.maximum(numshifts - 1, 1)
+    def gridkey(fractions):
+        index = fractions * (numshifts - 1)
+        if not np.allclose(index, np.round(index), atol=1e-5, rtol=0.0):
+            return None
+        return tuple(np.round(index).astype(int) % period)
+    
+    # Join equivalent grid points using union-find
+    root = {}
+    def findroot(key):
+        while root.setdefault(key, key) != key:
+            root[key] = root[root[key]]
+            key = root[key]
+        return key
+    
+    for i in range(period[0]):
+        for j in range(period[1]):
+            key = (i, j)
+            fractions = np.array([i, j]) / np.maximum(numshifts - 1, 1)
+            images = [transform.dot(fractions) for transform in transforms]
+            images += [fractions + offset for offset in offsets]
+            for image in images:
+                image = gridkey(image)
+                if image is not None:
+                    root[findroot(image)] = findroot(key)
+    
+    # Assign the first grid point of each equivalent set to all members
+    irreducible = np.empty(numshifts1 * numshifts2, dtype=int)
+    first = {}
+    for j in range(numshifts2):
+        for i in range(numshifts1):
+            k = j * numshifts1 + i
+            key = findroot((i % period[0], j % period[1]))
+            irreducible[k] = first.setdefault(key, k)
+    
+    return irreducible
+
 def process_input(input_dict, UUID=None, build=True):
     """
     Processes str input parameters, assigns default values if needed, and
@@ -487,19 +758,24 @@ def process_input(input_dict, UUID=None, build=True):
     input_dict['sizemults'] = input_dict.get('sizemults', '3 3 3')
     input_dict['forcetolerance'] = input_dict.get('forcetolerance',
                                                   '1.0e-6 eV/angstrom')
+    input_dict['lammps_mode'] = input_dict.get('lammps_mode', 'subprocess')
+    input_dict['dump_format'] = input_dict.get('dump_format', 'text')
     
     # These are calculation-specific default booleans
-    # None for this calculation
+    input_dict['stackingfault_symmetry'] = iprPy.input.boolean(input_dict.get('stackingfault_symmetry', False))
     
     # These are calculation-specific default integers
     input_dict['stackingfault_numshifts1'] = int(input_dict.get('stackingfault_numshifts1', 11))
     input_dict['stackingfault_numshifts2'] = int(input_dict.get('stackingfault_numshifts2', 11))
+    input_dict['stackingfault_nprocs'] = int(input_dict.get('stackingfault_nprocs', 1))
     
     # These are calculation-specific default unitless floats
     # None for this calculation
     
     # These are calculation-specific default floats with units
-    # None for this calculation
+    input_dict['symmetryprecision'] = iprPy.input.value(input_dict, 'symmetryprecision',
+                                            default_unit=input_dict['length_unit'],
+                                            default_term='0.01 angstrom')
     
     # Check lammps_command and mpi_command
     iprPy.input.interpret('lammps_commands', input_dict)
@@ -36,6 +36,8 @@ class StackingFaultStatic(Calculation):
                 'pressure_unit',
                 'energy_unit',
                 'force_unit',
+                'dump_format',
+                'reference_cache',
                ]
     
     @property
@@ -50,7 +50,9 @@ def main(*args):
                                  ftol = input_dict['forcetolerance'],
                                  maxiter = input_dict['maxiterations'],
                                  maxeval = input_dict['maxevaluations'],
-                                 dmax = input_dict['maxatommotion'])
+                                 dmax = input_dict['maxatommotion'],
+                                 dump_format = input_dict['dump_format'],
+                                 reference_cache = input_dict['reference_cache'])
     
     # Save data model of results
     script = os.path.splitext(os.path.basename(__file__))[0]
@@ -67,7 +69,7 @@ def stackingfaultpoint(lammps_command, system, potential,
                        faultshift=[0.0, 0.0, 0.0], etol=0.0, ftol=0.0,
                        maxiter=10000, maxeval=100000,
                        dmax=uc.set_in_units(0.01, 'angstrom'),
-                       lammps_date=None):
+                       lammps_date=None, dump_format='text'):
     """
     Perform a stacking fault relaxation simulation for a single faultshift.
     
@@ -112,6 +114,9 @@ def stackingfaultpoint(lammps_command, system, potential,
         by faultpos (default is [0,0,0], i.e. no shift applied).
     lammps_date : datetime.date or None, optional
         The date version of the LAMMPS executable.  If None, will be identified from the lammps_command (default is None).
+    dump_format : str, optional
+        The format of the dump files: 'text' for LAMMPS text dump files or
+        'binary' for LAMMPS binary dump files (default is 'text').
     
     Returns
     -------
@@ -187,7 +192,7 @@ def stackingfaultpoint(lammps_command, system, potential,
         
         # Give correct LAMMPS fix setforce command
         fix_cut_setforce = 'fix cut all setforce 0 0 NULL'
-        
+    
     else: 
         raise ValueError('Invalid cutboxvector')
     
@@ -219,7 +224,7 @@ def stackingfaultpoint(lammps_command, system, potential,
     
     #Get lammps version date
     if lammps_date is None:
-        lammps_date = lmp.checkversion(lammps_command)['date']
+        lammps_date = iprPy.tools.checkversion(lammps_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -236,6 +241,7 @@ def stackingfaultpoint(lammps_command, system, potential,
     lammps_variables['maxiter'] = maxiter
     lammps_variables['maxeval'] = maxeval
     lammps_variables['dmax'] = uc.get_in_units(dmax, lammps_units['length'])
+    lammps_variables['dump_extension'] = iprPy.tools.dump_extension(dump_format)
     
     # Set dump_modify format based on dump_modify_version
     if lammps_date < datetime.date(2016, 8, 3):
@@ -259,12 +265,13 @@ def stackingfaultpoint(lammps_command, system, potential,
     # Extract output values
     thermo = output.simulations[-1]['thermo']
     logfile = os.path.join(sim_directory, 'log.lammps')
-    dumpfile = os.path.join(sim_directory, '%i.dump' % thermo.Step.values[-1])
+    dumpfile = os.path.join(sim_directory, '%i%s' % (thermo.Step.values[-1],
+                                                     lammps_variables['dump_extension']))
     E_total = uc.set_in_units(thermo.PotEng.values[-1],
                               lammps_units['energy'])
     
     # Load relaxed system
-    sfsystem = am.load('atom_dump', dumpfile, symbols=sfsystem.symbols)
+    sfsystem = iprPy.tools.load_dump(dumpfile, symbols=sfsystem.symbols)
     
     # Find center of mass difference in top/bottom planes
     disp = (sfsystem.atoms.pos[abovefault, cutindex].mean()
@@ -285,9 +292,12 @@ def stackingfault(lammps_command, system, potential,
                   mpi_command=None, cutboxvector=None, faultpos=0.5,
                   faultshift=[0.0, 0.0, 0.0], etol=0.0, ftol=0.0,
                   maxiter=10000, maxeval=100000,
-                  dmax=uc.set_in_units(0.01, 'angstrom')):
+                  dmax=uc.set_in_units(0.01, 'angstrom'), dump_format='text',
+                  reference_cache=None):
     """
     Computes the generalized stacking fault value for a single faultshift.
+    The zero-shift reference results can be shared between calculations
+    through a reference cache directory.
     
     Parameters
     ----------
@@ -325,6 +335,15 @@ def stackingfault(lammps_command, system, potential,
     faultshift : list of float, optional
         The vector shift to apply to all atoms above the fault plane defined
         by faultpos (default is [0,0,0], i.e. no shift applied).
+    dump_format : str, optional
+        The format of the saved dump files: 'text' for LAMMPS text dump files
+        or 'binary' for LAMMPS binary dump files (default is 'text').
+    reference_cache : str or None, optional
+        The path to a directory where the zero-shift reference results are
+        shared.  If the results for the same potential, system, fault
+        position and run parameters have been saved there, the zero-shift
+        relaxation is skipped.  Otherwise, the results are saved for other
+        calculations to use.  If None (default), results are not shared.
     
     Returns
     -------
@@ -349,23 +368,58 @@ def stackingfault(lammps_command, system, potential,
           associated with the relaxed system before applying the faultshift.
         - **'dumpfile_sf'** (*str*) - The name of the LAMMMPS dump file
           associated with the relaxed system after applying the faultshift.
+        - **'reference_key'** (*str or None*) - The reference cache key of
+          the zero-shift system results if they were loaded from the cache instead
+          of being simulated, otherwise None.
     """
     
-    # Evaluate the system without shifting along the fault plane
-    zeroshift = stackingfaultpoint(lammps_command, system, potential,
-                                   mpi_command=mpi_command,
-                                   cutboxvector=cutboxvector,
-                                   faultpos=faultpos,
-                                   etol=etol, ftol=ftol, maxiter=maxiter,
-                                   maxeval=maxeval, dmax=dmax,
-                                   faultshift=[0.0, 0.0, 0.0])
+    # Get dump file extension
+    dump_ext = iprPy.tools.dump_extension(dump_format)
+    
+    # Look for shared zero-shift reference results
+    reference = None
+    if reference_cache is not None:
+        reference_key = iprPy.tools.system_reference_key(
+            'stacking_fault_static', lammps_command, potential, system,
+            cutboxvector=cutboxvector, faultpos=faultpos, etol=etol,
+            ftol=ftol, maxiter=maxiter, maxeval=maxeval, dmax=dmax)
+        reference = iprPy.tools.load_reference(reference_cache, reference_key)
+    
+    # Use shared zero-shift reference results
+    if reference is not None:
+        values, files = reference
+        E_total_0 = values['E_total_0']
+        disp_0 = values['disp_0']
+        A_fault = values['A_fault']
+        iprPy.tools.use_reference_dump(files[values['dumpfile_0']],
+                                       'zeroshift' + dump_ext, system.symbols)
     
-    # Extract terms
-    E_total_0 = zeroshift['E_total']
-    disp_0 = zeroshift['disp']
-    A_fault = zeroshift['A_fault']
-    shutil.move('log.lammps', 'zeroshift-log.lammps')
-    shutil.move(zeroshift['dumpfile'], 'zeroshift.dump')
+    else:
+        # Evaluate the system without shifting along the fault plane
+        zeroshift = stackingfaultpoint(lammps_command, system, potential,
+                                       mpi_command=mpi_command,
+                                       cutboxvector=cutboxvector,
+                                       faultpos=faultpos,
+                                       etol=etol, ftol=ftol, maxiter=maxiter,
+                                       maxeval=maxeval, dmax=dmax,
+                                       faultshift=[0.0, 0.0, 0.0],
+                                       dump_format=dump_format)
+        
+        # Extract terms
+        E_total_0 = zeroshift['E_total']
+        disp_0 = zeroshift['disp']
+        A_fault = zeroshift['A_fault']
+        shutil.move('log.lammps', 'zeroshift-log.lammps')
+        shutil.move(zeroshift['dumpfile'], 'zeroshift' + dump_ext)
+        
+        # Share zero-shift reference results
+        if reference_cache is not None:
+            iprPy.tools.save_reference(reference_cache, reference_key,
+                                       {'E_total_0': float(E_total_0),
+                                        'disp_0': float(disp_0),
+                                        'A_fault': float(A_fault),
+                                        'dumpfile_0': 'zeroshift' + dump_ext},
+                                       files=['zeroshift' + dump_ext])
     
     # Evaluate the system after shifting along the fault plane
     shifted = stackingfaultpoint(lammps_command, system, potential,
@@ -373,14 +427,15 @@ def stackingfault(lammps_command, system, potential,
                                  cutboxvector=cutboxvector,
                                  faultpos=faultpos, etol=etol, ftol=ftol,
                                  maxiter=maxiter, maxeval=maxeval, dmax=dmax,
-                                 faultshift=faultshift)
+                                 faultshift=faultshift,
+                                 dump_format=dump_format)
     
     # Extract terms
     E_total_sf = shifted['E_total']
     disp_sf = shifted['disp']
     shutil.move('log.lammps', 'shifted-log.lammps')
-    shutil.move(shifted['dumpfile'], 'shifted.dump')
-
+    shutil.move(shifted['dumpfile'], 'shifted' + dump_ext)
+    
     # Compute the stacking fault energy
     E_gsf = (E_total_sf - E_total_0) / A_fault
     
@@ -396,8 +451,12 @@ def stackingfault(lammps_command, system, potential,
     results['disp_0'] = disp_0
     results['disp_sf'] = disp_sf
     results['A_fault'] = A_fault
-    results['dumpfile_0'] = 'zeroshift.dump'
-    results['dumpfile_sf'] = 'shifted.dump'
+    results['dumpfile_0'] = 'zeroshift' + dump_ext
+    results['dumpfile_sf'] = 'shifted' + dump_ext
+    if reference is not None:
+        results['reference_key'] = reference_key
+    else:
+        results['reference_key'] = None
     
     return results
 
@@ -434,6 +493,8 @@ def process_input(input_dict, UUID=None, build=True):
     input_dict['sizemults'] = input_dict.get('sizemults', '3 3 3')
     input_dict['forcetolerance'] = input_dict.get('forcetolerance',
                                                   '1.0e-6 eV/angstrom')
+    input_dict['dump_format'] = input_dict.get('dump_format', 'text')
+    input_dict['reference_cache'] = input_dict.get('reference_cache', None)
     
     # These are calculation-specific default booleans
     # None for this calculation
@@ -36,6 +36,9 @@ class SurfaceEnergyStatic(Calculation):
                 'pressure_unit',
                 'energy_unit',
                 'force_unit',
+                'dump_format',
+                'reference_cache',
+                'use_parent_E_coh',
                ]
     
     @property
@@ -49,7 +49,10 @@ def main(*args):
                                   maxiter = input_dict['maxiterations'],
                                   maxeval = input_dict['maxevaluations'],
                                   dmax = input_dict['maxatommotion'],
-                                  cutboxvector = input_dict['surface_cutboxvector'])
+                                  cutboxvector = input_dict['surface_cutboxvector'],
+                                  dump_format = input_dict['dump_format'],
+                                  E_coh = input_dict['parent_E_coh'],
+                                  reference_cache = input_dict['reference_cache'])
     
     # Save data model of results
     script = os.path.splitext(os.path.basename(__file__))[0]
@@ -63,10 +66,12 @@ def main(*args):
 def surface_energy(lammps_command, system, potential,
                    mpi_command=None, etol=0.0, ftol=0.0, maxiter=10000,
                    maxeval=100000, dmax=uc.set_in_units(0.01, 'angstrom'),
-                   cutboxvector='c'):
+                   cutboxvector='c', dump_format='text', E_coh=None,
+                   reference_cache=None):
     """
     Evaluates surface formation energies by slicing along one periodic
-    boundary of a bulk system.
+    boundary of a bulk system.  The bulk reference energy can be given, or
+    shared between calculations through a reference cache directory.
     
     Parameters
     ----------
@@ -98,6 +103,20 @@ def surface_energy(lammps_command, system, potential,
     cutboxvector : str, optional
         Indicates which of the three system box vectors, 'a', 'b', or 'c', to
         cut with a non-periodic boundary (default is 'c').
+    dump_format : str, optional
+        The format of the saved dump files: 'text' for LAMMPS text dump files
+        or 'binary' for LAMMPS binary dump files (default is 'text').
+    E_coh : float or None, optional
+        A trusted cohesive energy of the bulk system, such as from a relaxed
+        parent crystal.  If given, the bulk system is not relaxed and the
+        bulk reference energy is E_coh times the number of atoms.  If None
+        (default), the bulk system is relaxed.
+    reference_cache : str or None, optional
+        The path to a directory where the relaxed bulk results are shared.
+        If the results for the same potential, system and run parameters have
+        been saved there, the bulk relaxation is skipped.  Otherwise, the
+        results are saved for other calculations to use.  If None (default),
+        results are not shared.  Not used if E_coh is given.
     
     Returns
     -------
@@ -116,6 +135,9 @@ def surface_energy(lammps_command, system, potential,
         - **'E_coh'** (*float*) - The cohesive energy of the relaxed bulk
           system.
         - **'E_surf_f'** (*float*) - The computed surface formation energy.
+        - **'reference_key'** (*str or None*) - The reference cache key of
+          the perfect system results if they were loaded from the cache instead
+          of being simulated, otherwise None.
     
     Raises
     ------
@@ -123,17 +145,52 @@ def surface_energy(lammps_command, system, potential,
         For invalid cutboxvectors
     """
     
-    # Evaluate perfect system
+    # Set up perfect system
     system.pbc = [True, True, True]
-    perfect = relax_system(lammps_command, system, potential,
-                           mpi_command=mpi_command, etol=etol, ftol=ftol,
-                           maxiter=maxiter, maxeval=maxeval, dmax=dmax)
+    dumpfile_base = 'perfect' + iprPy.tools.dump_extension(dump_format)
+    
+    # Look for shared perfect system reference results
+    reference = None
+    if E_coh is None and reference_cache is not None:
+        
+        # Wrap atoms so the key matches the system relax_system evaluates
+        system.wrap()
+        reference_key = iprPy.tools.system_reference_key(
+            'surface_energy_static', lammps_command, potential, system,
+            etol=etol, ftol=ftol, maxiter=maxiter, maxeval=maxeval, dmax=dmax)
+        reference = iprPy.tools.load_reference(reference_cache, reference_key)
+    
+    # Use the trusted cohesive energy without relaxing the perfect system
+    if E_coh is not None:
+        system.wrap()
+        iprPy.tools.save_dump(system, dumpfile_base)
+        E_total_base = E_coh * system.natoms
+    
+    # Use shared perfect system reference results
+    elif reference is not None:
+        values, files = reference
+        E_total_base = values['E_total_base']
+        iprPy.tools.use_reference_dump(files[values['dumpfile_base']],
+                                       dumpfile_base, system.symbols)
     
-    # Extract results from perfect system
-    dumpfile_base = 'perfect.dump'
-    shutil.move(perfect['finaldumpfile'], dumpfile_base)
-    shutil.move('log.lammps', 'perfect-log.lammps')
-    E_total_base = perfect['potentialenergy']
+    else:
+        # Evaluate perfect system
+        perfect = relax_system(lammps_command, system, potential,
+                               mpi_command=mpi_command, etol=etol, ftol=ftol,
+                               maxiter=maxiter, maxeval=maxeval, dmax=dmax,
+                               dump_format=dump_format)
+        
+        # Extract results from perfect system
+        shutil.move(perfect['finaldumpfile'], dumpfile_base)
+        shutil.move('log.lammps', 'perfect-log.lammps')
+        E_total_base = perfect['potentialenergy']
+        
+        # Share perfect system reference results
+        if reference_cache is not None:
+            iprPy.tools.save_reference(reference_cache, reference_key,
+                                       {'E_total_base': float(E_total_base),
+                                        'dumpfile_base': dumpfile_base},
+                                       files=[dumpfile_base])
     
     # Set up defect system
     # A_surf is area of parallelogram defined by the two box vectors not along
@@ -156,10 +213,11 @@ def surface_energy(lammps_command, system, potential,
     # Evaluate system with free surface
     surface = relax_system(lammps_command, system, potential,
                            mpi_command=mpi_command, etol=etol, ftol=ftol,
-                           maxiter=maxiter, maxeval=maxeval, dmax=dmax)
+                           maxiter=maxiter, maxeval=maxeval, dmax=dmax,
+                           dump_format=dump_format)
     
     # Extract results from system with free surface
-    dumpfile_surf = 'surface.dump'
+    dumpfile_surf = 'surface' + iprPy.tools.dump_extension(dump_format)
     shutil.move(surface['finaldumpfile'], dumpfile_surf)
     shutil.move('log.lammps', 'surface-log.lammps')
     E_total_surf = surface['potentialenergy']
@@ -177,12 +235,17 @@ def surface_energy(lammps_command, system, potential,
     results_dict['A_surf'] = A_surf
     results_dict['E_coh'] = E_total_base / system.natoms
     results_dict['E_surf_f'] = E_surf_f
+    if reference is not None:
+        results_dict['reference_key'] = reference_key
+    else:
+        results_dict['reference_key'] = None
     
     return results_dict
 
 def relax_system(lammps_command, system, potential,
                  mpi_command=None, etol=0.0, ftol=0.0, maxiter=10000,
-                 maxeval=100000, dmax=uc.set_in_units(0.01, 'angstrom')):
+                 maxeval=100000, dmax=uc.set_in_units(0.01, 'angstrom'),
+                 dump_format='text'):
     """
     Sets up and runs the min.in LAMMPS script for performing an energy/force
     minimization to relax a system.
@@ -214,6 +277,9 @@ def relax_system(lammps_command, system, potential,
         The maximum distance in length units that any atom is allowed to relax
         in any direction during a single minimization iteration (default is
         0.01 Angstroms).
+    dump_format : str, optional
+        The format of the dump files: 'text' for LAMMPS text dump files or
+        'binary' for LAMMPS binary dump files (default is 'text').
     
     Returns
     -------
@@ -236,9 +302,9 @@ def relax_system(lammps_command, system, potential,
     
     # Get lammps units
     lammps_units = lmp.style.unit(potential.units)
-      
+    
     #Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.checkversion(lammps_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -256,6 +322,7 @@ def relax_system(lammps_command, system, potential,
     lammps_variables['maxiter'] = maxiter
     lammps_variables['maxeval'] = maxeval
     lammps_variables['dmax'] = uc.get_in_units(dmax, lammps_units['length'])
+    lammps_variables['dump_extension'] = iprPy.tools.dump_extension(dump_format)
     
     # Set dump_modify format based on dump_modify_version
     if lammps_date < datetime.date(2016, 8, 3):
@@ -280,8 +347,9 @@ def relax_system(lammps_command, system, potential,
     results = {}
     results['logfile'] = 'log.lammps'
     results['initialdatafile'] = 'system.dat'
-    results['initialdumpfile'] = 'atom.0'
-    results['finaldumpfile'] = 'atom.%i' % thermo.Step.values[-1]
+    results['initialdumpfile'] = 'atom.0' + lammps_variables['dump_extension']
+    results['finaldumpfile'] = ('atom.%i' % thermo.Step.values[-1]
+                                + lammps_variables['dump_extension'])
     results['potentialenergy'] = uc.set_in_units(thermo.PotEng.values[-1],
                                                  lammps_units['energy'])
     
@@ -320,9 +388,11 @@ def process_input(input_dict, UUID=None, build=True):
     input_dict['sizemults'] = input_dict.get('sizemults', '3 3 3')
     input_dict['forcetolerance'] = input_dict.get('forcetolerance',
                                                   '1.0e-6 eV/angstrom')
+    input_dict['dump_format'] = input_dict.get('dump_format', 'text')
+    input_dict['reference_cache'] = input_dict.get('reference_cache', None)
     
     # These are calculation-specific default booleans
-    # None for this calculation
+    input_dict['use_parent_E_coh'] = iprPy.input.boolean(input_dict.get('use_parent_E_coh', False))
     
     # These are calculation-specific default integers
     # None for this calculation
@@ -350,6 +420,71 @@ def process_input(input_dict, UUID=None, build=True):
     
     # Construct initialsystem by manipulating ucell system
     iprPy.input.interpret('atomman_systemmanipulate', input_dict, build=build)
+    
+    # Get the cohesive energy of the parent crystal if trusted
+    input_dict['parent_E_coh'] = None
+    if build is True and input_dict['use_parent_E_coh'] is True:
+        input_dict['parent_E_coh'] = parent_E_coh(input_dict)
+
+def parent_E_coh(input_dict):
+    """
+    Gets the cohesive energy from the record of a relaxed parent crystal
+    that the system was loaded from.  The value is only used if the system
+    is the parent's relaxed final-system, the parent is a finished static
+    or box relaxation record that relaxed to zero pressure and used the same
+    potential, and the box was not rescaled.
+    
+    Parameters
+    ----------
+    input_dict :  dict
+        Dictionary containing the processed calculation input parameters.
+    
+    Returns
+    -------
+    float or None
+        The parent's cohesive energy, or None if not available.
+    """
+    if (input_dict['load_style'] != 'system_model'
+        or input_dict['box_parameters'] is not None):
+        return None
+    
+    # Check that the parent's relaxed system was loaded
+    load_options = {}
+    if input_dict['load_options']:
+        load_options = iprPy.input.termtodict(input_dict['load_options'],
+                                              ['key', 'index', 'data_set',
+                                               'pbc', 'atom_style', 'units',
+                                               'prop_info'])
+    if (load_options.get('key', None) != 'final-system'
+        or int(load_options.get('index', 0)) != 0):
+        return None
+    
+    load_file = input_dict.get('load_content', None)
+    if load_file is None:
+        load_file = input_dict['load_file']
+    model = DM(load_file)
+    
+    # Check that the parent is a relaxed crystal record
+    if len(model) != 1:
+        return None
+    root = list(model.keys())[0]
+    if root not in ('calculation-relax-static', 'calculation-relax-box'):
+        return None
+    calc = model[root]
+    
+    # Check that the parent used the same potential and finished
+    if calc['potential-LAMMPS']['key'] != input_dict['potential'].key:
+        return None
+    if 'cohesive-energy' not in calc:
+        return None
+    
+    # Check that the parent was relaxed to zero pressure
+    for term in ['pressure-xx', 'pressure-yy', 'pressure-zz',
+                 'pressure-xy', 'pressure-xz', 'pressure-yz']:
+        if uc.value_unit(calc['phase-state'][term]) != 0.0:
+            return None
+    
+    return uc.value_unit(calc['cohesive-energy'])
 
 if __name__ == '__main__':
     main(*sys.argv[1:])
\ No newline at end of file
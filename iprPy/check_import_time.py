@@ -0,0 +1,55 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import sys
+import json
+import subprocess
+
+__all__ = ['check_import_time']
+
+# Script that times importing iprPy and lists the large packages it imported
+script = """
+import sys, time, json
+start = time.time()
+import iprPy
+end = time.time()
+print(json.dumps({'time': end - start,
+                  'modules': [m for m in %r if m in sys.modules]}))
+"""
+
+# Large packages that are only needed by some styles
+heavy_modules = ['atomman', 'pandas', 'scipy', 'spglib', 'matplotlib',
+                 'requests', 'mdcs', 'cdcs']
+
+def check_import_time(repeats=5):
+    """
+    Benchmarks the cold-start time of importing iprPy by importing it in new
+    Python interpreters, and prints the times along with which large
+    packages were imported with it.  Styles are only imported when first
+    used, so importing iprPy itself should stay fast.
+    
+    Parameters
+    ----------
+    repeats : int, optional
+        The number of times to import iprPy.  (Default is 5.)
+    
+    Returns
+    -------
+    list of float
+        The import times in seconds.
+    """
+    py_exe = sys.executable
+    if py_exe is None:
+        py_exe = 'python'
+    
+    times = []
+    for i in range(repeats):
+        output = subprocess.check_output([py_exe, '-c', script % heavy_modules])
+        result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+        times.append(result['time'])
+    
+    print('import iprPy times (s):', ' '.join(['%.3f' % t for t in times]))
+    print('min: %.3f  median: %.3f' % (min(times), sorted(times)[len(times) // 2]))
+    print('large packages imported:', ', '.join(result['modules']))
+    
+    return times
@@ -18,9 +18,15 @@ __all__ = ['check_modules']
 
 def check_modules():
     """
-    Prints lists of the calculation, record, and database styles that were
-    successfully and unsuccessfully loaded when iprPy was initialized.
+    Imports all input, calculation, record, and database styles, and prints
+    lists of the styles that were successfully and unsuccessfully loaded.
+    Styles are otherwise only imported when first used.
     """
+    # Import all styles
+    for loaded in [input_interpret_loaded, input_buildcombos_loaded,
+                   record_loaded, calculation_loaded, database_loaded]:
+        loaded.importall()
+    
     print('input.interpret styles that passed import:')
     for style in input_interpret_loaded.keys():
         print('-', style)
@@ -7,14 +7,11 @@ import glob
 import shutil
 import tempfile
 
-# https://pandas.pydata.org/
-import pandas as pd
-
 # https://github.com/usnistgov/DataModelDict
 from DataModelDict import DataModelDict as DM
 
 # iprPy imports
-from .. import rootdir
+from .. import rootdir, load_record
 from ..record import loaded as record_loaded
 from ..tools import screen_input
 from .prepare import prepare
@@ -69,6 +66,14 @@ class Database(object):
         """str: The database's host."""
         return self.__host
     
+    @property
+    def reference_cache(self):
+        """
+        str or None: The directory where calculations can share reference
+        results, or None if not supported by the database style.
+        """
+        return None
+    
     def get_records(self, name=None, style=None, query=None, return_df=False,
                     **kwargs):
         """
@@ -182,6 +187,39 @@ class Database(object):
         """
         raise AttributeError('add_record not defined for Database style')
     
+    def add_records(self, records, skip_existing=False):
+        """
+        Adds multiple new records to the database.  Database styles that
+        support it override this to check for existing records and write the
+        records in bulk.  Otherwise, add_record is called for each record.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The new records to add to the database.
+        skip_existing : bool, optional
+            If False (default), a ValueError is issued if any of the records
+            already exist.  If True, records that already exist are skipped.
+        
+        Returns
+        ------
+        list of iprPy.Record
+            The records that were added.
+        
+        Raises
+        ------
+        ValueError
+            If skip_existing is False and a matching record already exists.
+        """
+        newrecords = []
+        for record in records:
+            try:
+                newrecords.append(self.add_record(record=record))
+            except ValueError:
+                if not skip_existing:
+                    raise
+        return newrecords
+    
     def update_record(self, record=None, name=None, style=None, content=None):
         """
         Replaces an existing record with a new record of matching name and
@@ -268,7 +306,8 @@ class Database(object):
         """
         raise AttributeError('get_tar not defined for Database style')
     
-    def add_tar(self, record=None, name=None, style=None, root_dir=None):
+    def add_tar(self, record=None, name=None, style=None, root_dir=None,
+                exclude=None):
         """
         Archives and stores a folder associated with a record.  Issues an
         error if exactly one matching record is not found in the database, or
@@ -289,6 +328,9 @@ class Database(object):
             Specifies the root directory for finding the directory to archive.
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)
+        exclude : list of str, optional
+            fnmatch-style patterns of files and directories not to archive,
+            such as large intermediate dump files.
         
         Raises
         ------
@@ -297,7 +339,8 @@ class Database(object):
         """
         raise AttributeError('add_tar not defined for Database style')
     
-    def update_tar(self, record=None, name=None, style=None, root_dir=None):
+    def update_tar(self, record=None, name=None, style=None, root_dir=None,
+                   exclude=None):
         """
         Replaces an existing tar archive for a record with a new one.  Issues
         an error if exactly one matching record is not found in the database.
@@ -316,6 +359,8 @@ class Database(object):
         root_dir : str, optional
             Specifies the root directory for finding the directory to archive.
             The directory to archive is at <root_dir>/<name>.
+        exclude : list of str, optional
+            fnmatch-style patterns of files and directories not to archive.
         
         Raises
         ------
@@ -367,24 +412,28 @@ class Database(object):
             if os.path.isdir(dir):
                 record_style = os.path.basename(dir)
                 
-                # Loop over all records of one style
+                # Load all records of one style
+                records = []
                 for record_file in glob.iglob(os.path.join(dir, '*')):
                     if os.path.splitext(record_file)[1].lower() in ['.xml', '.json']:
                         record_name = os.path.splitext(os.path.basename(record_file))[0]
-                        
-                        # Add record if needed
                         try:
-                            self.add_record(content=record_file, style=record_style,
-                                             name=record_name)
+                            records.append(load_record(record_style,
+                                                       record_name,
+                                                       record_file))
+                        except:
+                            pass
+                
+                # Add records if needed
+                self.add_records(records, skip_existing=True)
+                
+                # Add records' tars if needed
+                for record in records:
+                    if os.path.isdir(os.path.join(dir, record.name)):
+                        try:
+                            self.add_tar(root_dir=dir, name=record.name)
                         except:
                             pass
-                        
-                        # Add a record's tar if needed
-                        if os.path.isdir(os.path.splitext(record_file)[0]):
-                            try:
-                                self.add_tar(root_dir=dir, name=record_name)
-                            except:
-                                pass
     
     def check_records(self, record_style=None):
         """
@@ -433,6 +482,9 @@ class Database(object):
             styles will be listed and the user prompted to pick one.
         """
         
+        # https://pandas.pydata.org/
+        import pandas as pd
+        
         if record_style is None:
             record_style = self.select_record_style()
         
@@ -621,8 +673,16 @@ class Database(object):
                     parents.extend(self.get_parent_records(parent))
         return parents
     
-    def prepare(self, run_directory, calculation, **kwargs):
-        prepare(self, run_directory, calculation, **kwargs)
+    def prepare(self, run_directory, calculation, input_script=None,
+                nprocs=1, **kwargs):
+        prepare(self, run_directory, calculation, input_script=input_script,
+                nprocs=nprocs, **kwargs)
     
-    def runner(self, run_directory, orphan_directory=None, hold_directory=None):
-        runner(self, run_directory, orphan_directory=None, hold_directory=None)
\ No newline at end of file
+    def runner(self, run_directory, orphan_directory=None, hold_directory=None,
+               bid_delay=0.1, max_bid_delay=10.0, slots=1, poll_delay=0.1,
+               archive_exclude=None, forkserver=False):
+        runner(self, run_directory, orphan_directory=orphan_directory,
+               hold_directory=hold_directory, bid_delay=bid_delay,
+               max_bid_delay=max_bid_delay, slots=slots,
+               poll_delay=poll_delay, archive_exclude=archive_exclude,
+               forkserver=forkserver)
\ No newline at end of file
@@ -1,8 +1,11 @@
 """
 Attributes
 ----------
-loaded : dict
-    Dictionary of the derived classes
+loaded : iprPy.tools.dynamic_import.LazyLoaded
+    Mapping of the style names to the derived classes.  Each style is only
+    imported when first accessed.
+failed : dict
+    The error messages of the styles that failed to import.
 databases_dict : dict
     Dictionary of the database styles that successfully loaded. The
     dictionary keys are the database style names, and the values are the
@@ -11,11 +14,11 @@ databases_dict : dict
 # Standard Python libraries
 from __future__ import division, absolute_import, print_function
 
-from ..tools import dynamic_import
+from ..tools import lazy_import
 from .Database import Database
 
-ignorelist = ['Database', 'prepare', 'runner', 'settings']
-loaded, failed = dynamic_import(__file__, __name__, ignorelist=ignorelist)
+ignorelist = ['Database', 'archive', 'prepare', 'runner', 'settings']
+loaded, failed = lazy_import(__file__, __name__, ignorelist=ignorelist)
 
 from .settings import *
 from .settings import __all__ as settings_all
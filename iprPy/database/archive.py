@@ -0,0 +1,543 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import os
+import io
+import gzip
+import json
+import zlib
+import fnmatch
+import tarfile
+import tempfile
+import threading
+from collections import deque, OrderedDict
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+# https://github.com/indygreg/python-zstandard
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# iprPy imports
+from ..tools import set_default_mode
+
+# File extensions for the supported compression codecs
+extensions = {'gz': '.tar.gz', 'zst': '.tar.zst'}
+
+# Default compression levels for the supported compression codecs
+compresslevels = {'gz': 6, 'zst': 3}
+
+# Magic number at the start of zstd compressed files
+zstd_magic = b'\x28\xb5\x2f\xfd'
+
+# File extension added to archive file names for their member indexes
+index_extension = '.index'
+
+# Compression thread pool shared by all BlockWriters in the process
+pool = None
+pool_pid = None
+pool_lock = threading.Lock()
+
+def check_codec(codec):
+    """
+    Checks that a compression codec is supported and available.
+    
+    Parameters
+    ----------
+    codec : str
+        The compression codec: 'gz' or 'zst'.
+    
+    Raises
+    ------
+    ValueError
+        If codec is not supported.
+    ImportError
+        If codec is 'zst' and the zstandard module is not found.
+    """
+    if codec not in extensions:
+        raise ValueError('Unsupported archive codec ' + str(codec))
+    if codec == 'zst' and zstandard is None:
+        raise ImportError('zstandard module not found')
+
+def compress(data, codec, compresslevel):
+    """
+    Compresses data as a single, self-contained gzip member or zstd frame.
+    Concatenated members/frames are themselves valid gzip/zstd files.
+    
+    Parameters
+    ----------
+    data : bytes
+        The data to compress.
+    codec : str
+        The compression codec: 'gz' or 'zst'.
+    compresslevel : int
+        The compression level.
+    
+    Returns
+    -------
+    bytes
+        The compressed data.
+    """
+    if codec == 'gz':
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    else:
+        return zstandard.ZstdCompressor(level=compresslevel).compress(data)
+
+def shared_pool():
+    """
+    Returns the compression thread pool shared by all BlockWriters in the
+    current process, which has one thread per cpu.  The pool is created on
+    first use, and again in forked child processes.
+    
+    Returns
+    -------
+    multiprocessing.pool.ThreadPool
+        The shared thread pool.
+    """
+    global pool, pool_pid
+    with pool_lock:
+        if pool is None or pool_pid != os.getpid():
+            pool = ThreadPool(cpu_count())
+            pool_pid = os.getpid()
+        return pool
+
+class BlockWriter(object):
+    """
+    File-like object that splits the data written to it into blocks that are
+    compressed independently by the shared pool of threads, and writes the
+    compressed blocks in order to an output file.  As each block can be
+    decompressed on
+    its own, reading can start at the beginning of any block.
+    """
+    def __init__(self, f, codec='gz', compresslevel=None, nthreads=None,
+                 blocksize=4194304):
+        """
+        Initializes a BlockWriter.
+        
+        Parameters
+        ----------
+        f : file-like object
+            The binary output file to write the compressed blocks to.
+        codec : str, optional
+            The compression codec: 'gz' (default) or 'zst'.
+        compresslevel : int, optional
+            The compression level.  Default value depends on the codec.
+        nthreads : int, optional
+            Limits the writer to 2*nthreads blocks queued in the shared
+            compression thread pool at a time.  A value of 1 compresses
+            blocks in the calling thread instead.  Default value is the number
+            of cpus.
+        blocksize : int, optional
+            The size in bytes of uncompressed data in each block (default is
+            4 MiB).
+        """
+        check_codec(codec)
+        if compresslevel is None:
+            compresslevel = compresslevels[codec]
+        if nthreads is None:
+            nthreads = cpu_count()
+        
+        self.__f = f
+        self.__codec = codec
+        self.__compresslevel = int(compresslevel)
+        self.__nthreads = max(int(nthreads), 1)
+        self.__blocksize = blocksize
+        self.__buffer = []
+        self.__buffersize = 0
+        self.__position = 0
+        self.__nblocks = 0
+        self.__written = 0
+        self.__offsets = []
+        self.__jobs = deque()
+        self.__pool = None
+        if self.__nthreads > 1:
+            self.__pool = shared_pool()
+    
+    @property
+    def offsets(self):
+        """list of int: The compressed file offsets of the written blocks."""
+        return self.__offsets
+    
+    def tell(self):
+        """Returns the number of uncompressed bytes written."""
+        return self.__position
+    
+    def write(self, data):
+        """Adds data, compressing a block whenever blocksize is reached."""
+        self.__buffer.append(bytes(data))
+        self.__buffersize += len(data)
+        self.__position += len(data)
+        if self.__buffersize >= self.__blocksize:
+            self.flush()
+    
+    def mark(self):
+        """
+        Ends the current block so that the next data written starts a new
+        block.
+        
+        Returns
+        -------
+        int
+            The number of the new block.  Once written, its compressed file
+            offset is offsets[number].
+        """
+        self.flush()
+        return self.__nblocks
+    
+    def __writeblock(self, block):
+        """Writes a compressed block to the output file."""
+        self.__offsets.append(self.__written)
+        self.__f.write(block)
+        self.__written += len(block)
+    
+    def flush(self):
+        """Ends the current block, sending it to be compressed."""
+        if self.__buffersize == 0:
+            return
+        data = b''.join(self.__buffer)
+        self.__buffer = []
+        self.__buffersize = 0
+        self.__nblocks += 1
+        
+        if self.__pool is None:
+            self.__writeblock(compress(data, self.__codec, self.__compresslevel))
+        else:
+            self.__jobs.append(self.__pool.apply_async(compress,
+                               (data, self.__codec, self.__compresslevel)))
+            
+            # Limit the number of blocks held in memory
+            while len(self.__jobs) > 2 * self.__nthreads:
+                self.__writeblock(self.__jobs.popleft().get())
+    
+    def close(self):
+        """Compresses any remaining data and writes all blocks."""
+        try:
+            self.flush()
+            while len(self.__jobs) > 0:
+                self.__writeblock(self.__jobs.popleft().get())
+        finally:
+            self.__jobs.clear()
+
+def make_archive(archive_file, root_dir=None, base_dir=None, codec='gz',
+                 compresslevel=None, nthreads=None, exclude=None, index=False):
+    """
+    Archives a directory as a compressed tar file.  Unlike
+    shutil.make_archive, files are streamed into the archive one at a time,
+    the archive is compressed in blocks by parallel threads, and files can be
+    excluded.  The archive is written to a temporary file that is renamed
+    once complete so that partial archives are never seen.  Each member
+    starts a new compressed block, allowing members to be read without
+    decompressing the members before them if an index is saved.
+    
+    Parameters
+    ----------
+    archive_file : str
+        The path of the archive file to create.
+    root_dir : str, optional
+        The root directory containing base_dir (default is the current
+        working directory).
+    base_dir : str, optional
+        The directory in root_dir to archive.  Paths in the archive start
+        with base_dir.  (Default is '.', i.e. all of root_dir.)
+    codec : str, optional
+        The compression codec: 'gz' (default) for gzip, or 'zst' for
+        zstandard, which requires the zstandard module.
+    compresslevel : int, optional
+        The compression level.  Default value is 6 for 'gz' and 3 for 'zst'.
+    nthreads : int, optional
+        The number of compression threads to use from the shared thread
+        pool.  Default value is the number of cpus.
+    exclude : list of str, optional
+        fnmatch-style patterns of files and directories not to archive.
+        Patterns are compared to both the names and the paths relative to
+        base_dir.
+    index : bool, optional
+        If True, an index of the compressed offsets of the members is saved
+        to archive_file + '.index' for use by open_archive.  Default value is
+        False.
+    
+    Raises
+    ------
+    ValueError
+        If codec is not supported.
+    ImportError
+        If codec is 'zst' and the zstandard module is not found.
+    """
+    check_codec(codec)
+    if root_dir is None:
+        root_dir = os.getcwd()
+    if base_dir is None:
+        base_dir = '.'
+    if exclude is None:
+        exclude = []
+    
+    def excluded(relpath):
+        name = os.path.basename(relpath)
+        for pattern in exclude:
+            if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relpath, pattern):
+                return True
+        return False
+    
+    # Write to a temporary file in the same directory
+    archive_dir = os.path.dirname(os.path.abspath(archive_file))
+    fd, tempname = tempfile.mkstemp(dir=archive_dir, suffix='.tmp',
+                                    prefix='.' + os.path.basename(archive_file))
+    indextempname = None
+    try:
+        members = []
+        with os.fdopen(fd, 'wb') as f:
+            writer = BlockWriter(f, codec=codec, compresslevel=compresslevel,
+                                 nthreads=nthreads)
+            try:
+                tar = tarfile.open(fileobj=writer, mode='w',
+                                   format=tarfile.PAX_FORMAT)
+                
+                def add(path, relpath):
+                    tarinfo = tar.gettarinfo(path,
+                                             os.path.normpath(os.path.join(base_dir, relpath)))
+                    members.append([tarinfo.name, writer.mark()])
+                    if tarinfo.isreg():
+                        with open(path, 'rb') as member:
+                            tar.addfile(tarinfo, member)
+                    else:
+                        tar.addfile(tarinfo)
+                
+                # Walk base_dir, adding directories before their contents
+                start = os.path.join(root_dir, base_dir)
+                for dirpath, dirnames, filenames in os.walk(start):
+                    reldir = os.path.relpath(dirpath, start)
+                    if reldir == '.':
+                        reldir = ''
+                    dirnames[:] = sorted([d for d in dirnames if not
+                                          excluded(os.path.join(reldir, d))])
+                    add(dirpath, reldir)
+                    for filename in sorted(filenames):
+                        relpath = os.path.join(reldir, filename)
+                        if not excluded(relpath):
+                            add(os.path.join(dirpath, filename), relpath)
+                tar.close()
+            finally:
+                writer.close()
+        
+        # Save the member index, with the archive size to identify stale indexes
+        if index:
+            for member in members:
+                member[1] = writer.offsets[member[1]]
+            fd, indextempname = tempfile.mkstemp(dir=archive_dir, suffix='.tmp',
+                                                 prefix='.' + os.path.basename(archive_file))
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'size': os.path.getsize(tempname),
+                           'members': members}, f)
+            set_default_mode(indextempname)
+            os.rename(indextempname, archive_file + index_extension)
+        set_default_mode(tempname)
+        os.rename(tempname, archive_file)
+    except:
+        for name in [tempname, indextempname]:
+            if name is not None and os.path.isfile(name):
+                os.remove(name)
+        raise
+
+def open_archive(archive):
+    """
+    Opens a compressed tar archive created by make_archive, or any gzip
+    compressed tar archive.
+    
+    Parameters
+    ----------
+    archive : str or bytes
+        The path to the archive file, or the archive's contents.
+    
+    Returns
+    -------
+    tarfile.TarFile or IndexedArchive
+        The open archive.  An IndexedArchive is returned for archive files
+        that have a valid member index.
+    
+    Raises
+    ------
+    ImportError
+        If the archive is zstd compressed and the zstandard module is not
+        found.
+    """
+    # Use the member index if it matches the archive file
+    if not isinstance(archive, bytes):
+        index = load_index(archive)
+        if index is not None:
+            return IndexedArchive(archive, index)
+    
+    # Read zstd compressed archives into memory
+    if isinstance(archive, bytes):
+        head = archive[:4]
+    else:
+        with open(archive, 'rb') as f:
+            head = f.read(4)
+    if head == zstd_magic:
+        check_codec('zst')
+        if not isinstance(archive, bytes):
+            with open(archive, 'rb') as f:
+                archive = f.read()
+        reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(archive),
+                                                            read_across_frames=True)
+        return tarfile.open(fileobj=io.BytesIO(reader.read()), mode='r:')
+    
+    # Open gzip compressed archives directly
+    elif isinstance(archive, bytes):
+        return tarfile.open(fileobj=io.BytesIO(archive))
+    else:
+        return tarfile.open(archive)
+
+def find_archive(path):
+    """
+    Finds an existing archive file for a path with any of the supported
+    codec extensions.
+    
+    Parameters
+    ----------
+    path : str
+        The archive file path without the extension.
+    
+    Returns
+    -------
+    str or None
+        The path to the archive file, or None if no archive exists.
+    """
+    for codec in sorted(extensions):
+        if os.path.isfile(path + extensions[codec]):
+            return path + extensions[codec]
+    return None
+
+def delete_archive(archive_file):
+    """
+    Deletes an archive file along with its member index, if any.
+    
+    Parameters
+    ----------
+    archive_file : str
+        The path to the archive file.
+    """
+    if os.path.isfile(archive_file + index_extension):
+        os.remove(archive_file + index_extension)
+    os.remove(archive_file)
+
+def load_index(archive_file):
+    """
+    Loads the member index saved for an archive file by make_archive.
+    
+    Parameters
+    ----------
+    archive_file : str
+        The path to the archive file.
+    
+    Returns
+    -------
+    collections.OrderedDict or None
+        The compressed file offsets of the archive's members, or None if no
+        index exists or the index does not match the archive file.
+    """
+    try:
+        with open(archive_file + index_extension) as f:
+            index = json.load(f)
+        if index['size'] != os.path.getsize(archive_file):
+            return None
+        return OrderedDict([tuple(member) for member in index['members']])
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return None
+
+class IndexedArchive(object):
+    """
+    Compressed tar archive that uses a member index to read single members
+    without decompressing the rest of the archive.  All tarfile.TarFile
+    methods other than extractfile and getnames open and read the whole
+    archive.
+    """
+    def __init__(self, archive_file, index):
+        """
+        Initializes an IndexedArchive.
+        
+        Parameters
+        ----------
+        archive_file : str
+            The path to the archive file.
+        index : collections.OrderedDict
+            The compressed file offsets of the archive's members, as returned
+            by load_index.
+        """
+        self.__archive_file = archive_file
+        self.__index = index
+        self.__tar = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    def __getattr__(self, name):
+        # Pass other attributes to the fully opened archive
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if self.__tar is None:
+            with open(self.__archive_file, 'rb') as f:
+                self.__tar = open_archive(f.read())
+        return getattr(self.__tar, name)
+    
+    def getnames(self):
+        """Returns the archive's member names from the index."""
+        return list(self.__index.keys())
+    
+    def extractfile(self, member):
+        """
+        Reads a single member of the archive, starting decompression at the
+        member's compressed offset.
+        
+        Parameters
+        ----------
+        member : str or tarfile.TarInfo
+            The member's name or TarInfo.
+        
+        Returns
+        -------
+        io.BytesIO or None
+            The member's contents, or None if the member is not a regular
+            file.
+        
+        Raises
+        ------
+        KeyError
+            If the member is not found.
+        """
+        if isinstance(member, tarfile.TarInfo):
+            member = member.name
+        offset = self.__index[member]
+        
+        with open(self.__archive_file, 'rb') as f:
+            f.seek(offset)
+            
+            # Decompress across blocks starting at offset
+            if f.read(4) == zstd_magic:
+                check_codec('zst')
+                f.seek(offset)
+                stream = zstandard.ZstdDecompressor().stream_reader(f,
+                                                  read_across_frames=True)
+            else:
+                f.seek(offset)
+                stream = gzip.GzipFile(fileobj=f, mode='rb')
+            
+            # Read only the member's header and data
+            tar = tarfile.open(fileobj=stream, mode='r|')
+            tarinfo = tar.next()
+            if tarinfo is None or tarinfo.name != member:
+                raise KeyError('Archive index does not match member ' + member)
+            if not tarinfo.isreg():
+                return None
+            return io.BytesIO(tar.extractfile(tarinfo).read())
+    
+    def close(self):
+        """Closes the fully opened archive, if any."""
+        if self.__tar is not None:
+            self.__tar.close()
+            self.__tar = None
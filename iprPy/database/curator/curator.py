@@ -2,9 +2,6 @@
 from __future__ import (absolute_import, print_function,
                         division, unicode_literals)
 import os
-import shutil
-import tarfile
-from io import BytesIO
 
 from .mdcs import MDCS
 
@@ -19,12 +16,12 @@ from DataModelDict import DataModelDict as DM
 
 # iprPy imports
 from ...tools import iaslist
-from .. import Database
+from .. import Database, archive
 from ... import load_record
 
 __all__ = ['initialize', 'iget_records', 'get_records', 'get_record',
-           'add_record', 'update_record', 'delete_record', 'add_tar',
-           'get_tar']
+           'add_record', 'add_records', 'update_record', 'delete_record',
+           'add_tar', 'get_tar']
 
 class Curator(Database):
     
@@ -248,11 +245,68 @@ class Curator(Database):
         
         return record
     
+    def add_records(self, records, skip_existing=False):
+        """
+        Adds multiple new records to the database.  The existing records of
+        each style are found with one select request, and the records are then
+        uploaded without checking each one separately.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The new records to add to the database.
+        skip_existing : bool, optional
+            If False (default), a ValueError is issued and no records are
+            added if any of the records already exist.  If True, records that
+            already exist are skipped.
+        
+        Returns
+        ------
+        list of iprPy.Record
+            The records that were added.
+        
+        Raises
+        ------
+        ValueError
+            If skip_existing is False and a matching record already exists.
+        """
+        
+        # Find templates and names of existing records for all styles
+        templates = {}
+        existing = {}
+        newrecords = []
+        for record in records:
+            if record.style not in templates:
+                templates[record.style] = self.mdcs.template_select_one(record.style)
+                data = self.mdcs.select(template=templates[record.style])
+                if len(data) > 0:
+                    existing[record.style] = set(data.title)
+                else:
+                    existing[record.style] = set()
+            
+            # Verify that there isn't already a record with a matching name
+            if record.name in existing[record.style]:
+                if skip_existing:
+                    continue
+                raise ValueError('Record ' + record.name + ' already exists')
+            existing[record.style].add(record.name)
+            newrecords.append(record)
+        
+        # Upload records to database
+        for record in newrecords:
+            self.mdcs.curate(record.content.xml(), record.name,
+                             templates[record.style], check=False)
+        
+        return newrecords
+    
     def update_record(self, record=None, style=None, name=None, content=None):
         """
         Replaces an existing record with a new record of matching name and 
-        style, but new content.  Will issue an error if exactly one 
-        matching record is not found in the databse.
+        style, but new content.  Will issue an error if no matching record is
+        found in the databse.  MDCS has no update request, so the new record
+        is uploaded before the old record is deleted so that the record always
+        exists.  If an earlier update failed to delete the old record, all
+        older copies are deleted so that only the new record remains.
         
         Parameters
         ----------
@@ -284,31 +338,42 @@ class Curator(Database):
             If style and/or name content given with record.
         """
         
-        # Create Record object if not given
+        # Check kwargs
         if record is None:
             if content is None:
                 raise TypeError('no new content given')
-            oldrecord = self.get_record(name=name, style=style)
-            record = load_record(oldrecord.style, oldrecord.name, content)
         
         # Issue a ValueError for competing kwargs
         elif style is not None or name is not None:
             raise ValueError('kwargs style and name cannot be given with kwarg record')
         
-        # Replace content in record object
-        elif content is not None:
-            oldrecord = record
-            record = load_record(oldrecord.style, oldrecord.name, content)
-            
-        # Find oldrecord matching record
         else:
-            oldrecord = self.get_record(name=record.name, style=record.style)
+            name = record.name
+            style = record.style
         
-        # Delete oldrecord
-        self.delete_record(record=oldrecord)
+        # Find the old record with a single select request
+        if style is None:
+            data = self.mdcs.select(title=name)
+        else:
+            data = self.mdcs.select(title=name, template=style)
+        if len(data) == 0:
+            raise ValueError('Cannot find matching record ' + str(name))
+        elif len(set(data.schema)) > 1:
+            raise ValueError('Multiple matching records found')
+        template = self.mdcs.template_select_one(id=data.iloc[0].schema)
+        
+        # Create Record object if not given or replace its content
+        if record is None:
+            record = load_record(template.title, name, content)
+        elif content is not None:
+            record = load_record(record.style, record.name, content)
         
-        # Add new record
-        self.add_record(record=record)
+        # Upload the new record before deleting the old one and any
+        # duplicates left by earlier failed updates
+        self.mdcs.curate(record.content.xml(), record.name, template,
+                         check=False)
+        for i in data.index:
+            self.mdcs.delete(data.loc[i])
         
         return record
     
@@ -348,7 +413,8 @@ class Curator(Database):
         # Delete record
         self.mdcs.delete(record.name)
     
-    def add_tar(self, record=None, name=None, style=None, root_dir=None):
+    def add_tar(self, record=None, name=None, style=None, root_dir=None,
+                exclude=None):
         """
         Archives and stores a folder associated with a record.  Issues an
         error if exactly one matching record is not found in the database, or
@@ -371,6 +437,9 @@ class Curator(Database):
             Specifies the root directory for finding the directory to archive.
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)
+        exclude : list of str, optional
+            fnmatch-style patterns of files and directories not to archive,
+            such as large intermediate dump files.
         
         Raises
         ------
@@ -396,8 +465,8 @@ class Curator(Database):
         #    raise ValueError('Record already has an archive')
         
         # Make archive
-        shutil.make_archive(record.name, 'gztar', root_dir=root_dir,
-                            base_dir=record.name)
+        archive.make_archive(record.name + '.tar.gz', root_dir=root_dir,
+                             base_dir=record.name, exclude=exclude)
         
         # Upload archive
         tries = 0
@@ -472,4 +541,4 @@ class Curator(Database):
         if raw is True:
             return tardata
         else:
-            return tarfile.open(fileobj = BytesIO(tardata))
\ No newline at end of file
+            return archive.open_archive(tardata)
\ No newline at end of file
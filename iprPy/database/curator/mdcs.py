@@ -459,7 +459,7 @@ class MDCS(object):
         r.raise_for_status()
         return pd.DataFrame(r.json(object_pairs_hook=OrderedDict))
     
-    def curate(self, content, title, template):
+    def curate(self, content, title, template, check=True):
         """
         Curates (uploads) a record to the MDCS instance.
         
@@ -475,6 +475,10 @@ class MDCS(object):
             against the template's id, title, and filename.  If dict, allows
             multiple template parameters to be specified in matching correct
             template.
+        check : bool, optional
+            If True (default), the database is searched first to check that a
+            matching record has not already been curated.  Can be set to False
+            if this has already been checked, such as for bulk uploads.
         """
         
         # Handle template
@@ -486,9 +490,10 @@ class MDCS(object):
             template = self.template_select_one(template)
         
         # Check if matching record already curated
-        records = self.select(title=title, template=template)
-        if len(records) > 0:
-            raise ValueError('Record with matching title and template already curated')
+        if check:
+            records = self.select(title=title, template=template)
+            if len(records) > 0:
+                raise ValueError('Record with matching title and template already curated')
         
         # Handle content
         content = DM(content).xml()
@@ -3,8 +3,10 @@ from __future__ import (absolute_import, print_function,
                         division, unicode_literals)
 import os
 import glob
-import shutil
-import tarfile
+import json
+import sqlite3
+import tempfile
+import time
 
 # http://www.numpy.org/
 import numpy as np
@@ -13,21 +15,46 @@ import numpy as np
 import pandas as pd
 
 # iprPy imports
-from ...tools import aslist, iaslist
-from .. import Database
+from ...tools import aslist, iaslist, set_default_mode
+from .. import Database, archive
 from ... import load_record
 
 class Local(Database):
     
-    def __init__(self, host):
+    def __init__(self, host, codec='gz', compresslevel=None, nthreads=None):
         """
-        Initializes a connection to a local database.
+        Initializes a connection to a local database.  Record files are
+        indexed in an SQLite file in the host directory.  SQLite's file
+        locking is unreliable on some network filesystems, such as NFS, so
+        hosts on shared filesystems should not be accessed by multiple
+        machines at the same time.
         
         Parameters
         ----------
         host : str
             The host name (local directory path) for the database.
+        codec : str, optional
+            The compression codec to use for new tar archives: 'gz' (default)
+            for gzip, or 'zst' for zstandard, which requires the zstandard
+            module.  Existing archives of either codec can always be read.
+        compresslevel : int, optional
+            The compression level to use for new tar archives.  Default value
+            is 6 for 'gz' and 3 for 'zst'.
+        nthreads : int, optional
+            The number of threads from the shared compression thread pool to
+            use for compressing new tar archives.  Default value is the number
+            of cpus.
         """
+        # Check and save archive settings
+        archive.check_codec(codec)
+        self.__codec = codec
+        if compresslevel is not None:
+            compresslevel = int(compresslevel)
+        self.__compresslevel = compresslevel
+        if nthreads is not None:
+            nthreads = int(nthreads)
+        self.__nthreads = nthreads
+        
         # Get absolute path to host
         host = os.path.abspath(host)
         
@@ -38,6 +65,145 @@ class Local(Database):
         # Pass host to Database initializer
         Database.__init__(self, host)
     
+    @property
+    def index_file(self):
+        """str: The path to the sidecar file indexing the stored records."""
+        return os.path.join(self.host, '.record_index.sqlite')
+    
+    @property
+    def reference_cache(self):
+        """str: The directory where calculations can share reference results."""
+        return os.path.join(self.host, '.reference_cache')
+    
+    def __index_connect(self):
+        """
+        Opens a connection to the record index, creating the index tables if
+        needed.
+        """
+        conn = sqlite3.connect(self.index_file, timeout=60)
+        conn.execute('CREATE TABLE IF NOT EXISTS records ('
+                     'style TEXT, name TEXT, mtime REAL, size INTEGER, '
+                     'row TEXT, PRIMARY KEY (style, name))')
+        conn.execute('CREATE TABLE IF NOT EXISTS styles ('
+                     'style TEXT PRIMARY KEY, mtime REAL)')
+        return conn
+    
+    def __index_set(self, conn, record, rfile):
+        """
+        Saves the flat dictionary representation of a record to the index
+        along with the record file's modification time and size.
+        """
+        stat = os.stat(rfile)
+        row = json.dumps(record._todict_cached(full=False, flat=True),
+                         default=lambda x: x.item() if isinstance(x, np.generic) else str(x))
+        conn.execute('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)',
+                     (record.style, record.name, stat.st_mtime, stat.st_size,
+                      row))
+        return json.loads(row)
+    
+    def __index_sync(self, conn, style, style_dir):
+        """
+        Synchronizes the index entries of one record style with the record
+        files in its directory.  Only record files that are new or have been
+        modified since last indexed are parsed.
+        """
+        
+        # Get currently indexed values
+        indexed = {}
+        for rname, mtime, size in conn.execute(
+                'SELECT name, mtime, size FROM records WHERE style = ?',
+                (style,)):
+            indexed[rname] = (mtime, size)
+        
+        # Iterate through all record files of the style
+        for rfile in glob.iglob(os.path.join(style_dir, '*.xml')):
+            rname = os.path.splitext(os.path.basename(rfile))[0]
+            stat = os.stat(rfile)
+            
+            # Load as Record object and index if new or changed
+            index = indexed.pop(rname, None)
+            if (index is None or index[0] != stat.st_mtime
+                or index[1] != stat.st_size):
+                record = load_record(style, rname, rfile)
+                self.__index_set(conn, record, rfile)
+        
+        # Remove index entries for deleted record files
+        conn.executemany('DELETE FROM records WHERE style = ? AND name = ?',
+                         [(style, rname) for rname in indexed])
+    
+    def index_records(self, name=None, style=None, force=False):
+        """
+        Synchronizes the record index with the stored record files and returns
+        the indexed entries matching name and style.  A style's record files
+        are only checked if its directory's modification time has changed
+        since last indexed, which happens whenever records are added, updated
+        or deleted through the database or files are added to or removed from
+        the directory.  Of those, only record files that are new or have been
+        modified since last indexed are parsed.  Record files edited in place
+        do not change the directory's modification time, so changes made to
+        them outside of the database are only picked up with force=True.
+        
+        Parameters
+        ----------
+        name : str, optional
+            The record name or id to limit the search by.
+        style : str, optional
+            The record style to limit the search by.
+        force : bool, optional
+            If True, the record files of all matching styles are checked even
+            if their directories are unchanged.  Needed if record files have
+            been edited in place outside of the database.  (Default is False.)
+        
+        Returns
+        -------
+        list of tuple
+            (style, name, record file path, flat record dict) for each
+            matching record.
+        """
+        
+        # Set default search parameters
+        if style is None:
+            style = ['*']
+        if name is None:
+            name = ['*']
+        
+        entries = []
+        conn = self.__index_connect()
+        try:
+            with conn:
+                for s in iaslist(style):
+                    for style_dir in sorted(glob.glob(os.path.join(self.host, s))):
+                        if not os.path.isdir(style_dir):
+                            continue
+                        rstyle = os.path.basename(style_dir)
+                        
+                        # Check the style's record files if its directory changed
+                        mtime = os.path.getmtime(style_dir)
+                        indexed = conn.execute('SELECT mtime FROM styles WHERE '
+                                               'style = ?', (rstyle,)).fetchone()
+                        if force or indexed is None or indexed[0] != mtime:
+                            self.__index_sync(conn, rstyle, style_dir)
+                            
+                            # Recheck next time if the directory could still
+                            # change within the filesystem's time resolution
+                            if time.time() - mtime < 2:
+                                mtime = None
+                            conn.execute('INSERT OR REPLACE INTO styles VALUES '
+                                         '(?, ?)', (rstyle, mtime))
+                        
+                        # Get indexed entries matching name values
+                        for n in iaslist(name):
+                            for rname, row in conn.execute(
+                                    'SELECT name, row FROM records WHERE style = ? '
+                                    'AND name GLOB ? ORDER BY name', (rstyle, n)):
+                                rfile = os.path.join(style_dir, rname + '.xml')
+                                entries.append((rstyle, rname, rfile,
+                                                json.loads(row)))
+        finally:
+            conn.close()
+        
+        return entries
+    
     def get_records(self, name=None, style=None, query=None, return_df=False,
                     **kwargs):
         """
@@ -52,50 +218,42 @@ class Local(Database):
         query : str, optional
             A query str for identifying records.  Not supported by this style.
         return_df : bool, optional
-            
+        
         Returns
         ------
         list of iprPy.Records
             All records from the database matching the given parameters.
         """
         
-        # Set default search parameters
-        if style is None:
-            style = ['*']
-        if name is None:
-            name = ['*']
         if query is not None:
             raise ValueError('query not supported by this style')
         
-        df = []
-        records = []
-        # Iterate through all files matching style, name values
-        for s in iaslist(style):
-            for n in iaslist(name):
-                for rfile in glob.iglob(os.path.join(self.host, s, n+'.xml')):
-                    rstyle = os.path.basename(os.path.dirname(rfile))
-                    rname = os.path.splitext(os.path.basename(rfile))[0]
-                    
-                    # Load as Record object
-                    record = load_record(rstyle, rname, rfile)
-                    records.append(record)
-                    df.append(record.todict(full=False, flat=True))
-        records = np.array(records)
-        df = pd.DataFrame(df)
+        # Filter indexed entries
+        entries = self.index_records(name=name, style=style)
+        df = pd.DataFrame([entry[3] for entry in entries])
         
         if len(df) > 0:
             for key in kwargs:
                 df = df[df[key].isin(aslist(kwargs[key]))]
         
+        # Build lazy Records for matching entries only
+        records = []
+        for i in df.index.tolist():
+            rstyle, rname, rfile, row = entries[i]
+            records.append(load_record(rstyle, rname, rfile, lazy=True,
+                                       summary=row))
+        
         if return_df:
-            return list(records[df.index.tolist()]), df.reset_index()
+            return records, df.reset_index()
         else:
-            return list(records[df.index.tolist()])
+            return records
     
     def get_records_df(self, name=None, style=None, query=None, full=True,
                        flat=False, **kwargs):
         """
-        Produces a list of all matching records in the database.
+        Produces a list of all matching records in the database.  The flat,
+        input-only representation (full=False, flat=True) is taken directly
+        from the record index.
         
         Parameters
         ----------
@@ -103,40 +261,45 @@ class Local(Database):
             The record name or id to limit the search by.
         style : str, optional
             The record style to limit the search by.
-            
+        
         Returns
         ------
         list of iprPy.Records
             All records from the database matching the given parameters.
         """
         
-        # Set default search parameters
-        if style is None:
-            style = ['*']
-        if name is None:
-            name = ['*']
         if query is not None:
             raise ValueError('query not supported by this style')
         
-        df = []
-        # Iterate through all files matching style, name values
-        for s in iaslist(style):
-            for n in iaslist(name):
-                for rfile in glob.iglob(os.path.join(self.host, s, n+'.xml')):
-                    rstyle = os.path.basename(os.path.dirname(rfile))
-                    rname = os.path.splitext(os.path.basename(rfile))[0]
-                    
-                    # Open record file and yield an iprPy.Record object
-                    record = load_record(rstyle, rname, rfile)
-                    df.append(record.todict(full=full, flat=flat))
-        df = pd.DataFrame(df)
+        # Filter indexed entries
+        entries = self.index_records(name=name, style=style)
+        df = pd.DataFrame([entry[3] for entry in entries])
         
+        # Filter by the indexed terms before loading any records
+        filtered = set()
         if len(df) > 0:
             for key in kwargs:
-                df = df[df[key].isin(aslist(kwargs[key]))]
+                if key in df or (full is False and flat is True):
+                    df = df[df[key].isin(aslist(kwargs[key]))]
+                    filtered.add(key)
+        
+        # Load matching records for other representations
+        if full is not False or flat is not True:
+            newdf = []
+            for i in df.index.tolist():
+                rstyle, rname, rfile = entries[i][:3]
+                record = load_record(rstyle, rname, rfile)
+                newdf.append(record.todict(full=full, flat=flat))
+            df = pd.DataFrame(newdf)
+            
+            # Filter by the remaining terms
+            if len(df) > 0:
+                for key in kwargs:
+                    if key not in filtered:
+                        df = df[df[key].isin(aslist(kwargs[key]))]
         
         return df
-
+    
     def get_record(self, name=None, style=None, query=None, **kwargs):
         """
         Returns a single matching record from the database.
@@ -147,7 +310,7 @@ class Local(Database):
             The record name or id to limit the search by.
         style : str, optional
             The record style to limit the search by.
-            
+        
         Returns
         ------
         iprPy.Record
@@ -169,7 +332,7 @@ class Local(Database):
             raise ValueError('Cannot find matching record '+ name + ' (' +style + ')')
         else:
             raise ValueError('Multiple matching records found')
-
+    
     def add_record(self, record=None, style=None, name=None, content=None):
         """
         Adds a new record to the database.
@@ -188,7 +351,7 @@ class Local(Database):
         content : str, optional
             The xml content of the new record.  Required if record is not
             given.
-            
+        
         Returns
         ------
         iprPy.Record
@@ -210,25 +373,80 @@ class Local(Database):
         elif style is not None or name is not None or content is not None:
             raise ValueError('kwargs style, name, and content cannot be given with kwarg record')
         
-        # Verify that there isn't already a record with a matching name
-        if len(self.get_records(name=record.name, style=record.style)) > 0:
-            raise ValueError('Record ' + record.name + ' already exists')
+        return self.add_records([record])[0]
+    
+    def add_records(self, records, skip_existing=False):
+        """
+        Adds multiple new records to the database.  Existing records are
+        checked once for the whole batch, and all records are added to the
+        record index in a single transaction.
         
-        # Make record style directory if needed
-        if not os.path.isdir(os.path.join(self.host, record.style)):
-            os.mkdir(os.path.join(self.host, record.style))
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The new records to add to the database.
+        skip_existing : bool, optional
+            If False (default), a ValueError is issued and no records are
+            added if any of the records already exist.  If True, records that
+            already exist are skipped.
         
-        # Save content to an .xml file
-        xml_file = os.path.join(self.host, record.style, record.name+'.xml')
-        with open(xml_file, 'w') as f:
-            f.write(record.content.xml())
+        Returns
+        ------
+        list of iprPy.Record
+            The records that were added.
         
-        return record
-
+        Raises
+        ------
+        ValueError
+            If skip_existing is False and a matching record already exists.
+        """
+        
+        # Find names of existing records for all styles
+        existing = {}
+        newrecords = []
+        for record in records:
+            if record.style not in existing:
+                style_dir = os.path.join(self.host, record.style)
+                if os.path.isdir(style_dir):
+                    existing[record.style] = set(os.listdir(style_dir))
+                else:
+                    existing[record.style] = set()
+            
+            # Verify that there isn't already a record with a matching name
+            if record.name + '.xml' in existing[record.style]:
+                if skip_existing:
+                    continue
+                raise ValueError('Record ' + record.name + ' already exists')
+            existing[record.style].add(record.name + '.xml')
+            newrecords.append(record)
+        
+        conn = self.__index_connect()
+        try:
+            with conn:
+                for record in newrecords:
+                    
+                    # Make record style directory if needed
+                    style_dir = os.path.join(self.host, record.style)
+                    if not os.path.isdir(style_dir):
+                        os.mkdir(style_dir)
+                    
+                    # Save content to an .xml file
+                    xml_file = os.path.join(style_dir, record.name+'.xml')
+                    with open(xml_file, 'w') as f:
+                        f.write(record.content.xml())
+                    
+                    # Add record to the index
+                    self.__index_set(conn, record, xml_file)
+        finally:
+            conn.close()
+        
+        return newrecords
+    
     def update_record(self, record=None, style=None, name=None, content=None):
         """
         Replaces an existing record with a new record of matching name and
-        style, but new content.
+        style, but new content.  The record file is replaced in place by
+        renaming a temporary file so that the record always exists.
         
         Parameters
         ----------
@@ -262,30 +480,68 @@ class Local(Database):
         if record is None:
             if content is None:
                 raise TypeError('no new content given')
-            oldrecord = self.get_record(name=name, style=style)
-            record = load_record(oldrecord.style, oldrecord.name, content)
+            xml_file = self.__record_file(name=name, style=style)
+            record = load_record(os.path.basename(os.path.dirname(xml_file)),
+                                 os.path.splitext(os.path.basename(xml_file))[0],
+                                 content)
         
         # Issue a ValueError for competing kwargs
         elif style is not None or name is not None:
             raise ValueError('kwargs style and name cannot be given with kwarg record')
         
-        # Replace content in record object
-        elif content is not None:
-            oldrecord = record
-            record = load_record(oldrecord.style, oldrecord.name, content)
-            
-        # Find oldrecord matching record
         else:
-            oldrecord = self.get_record(name=record.name, style=record.style)
-        
-        # Delete oldrecord
-        self.delete_record(record=oldrecord)
-        
-        # Add new record
-        self.add_record(record=record)
+            xml_file = self.__record_file(name=record.name, style=record.style)
+            
+            # Replace content in record object
+            if content is not None:
+                record = load_record(record.style, record.name, content)
+        
+        # Save content to a temporary file and replace the record file
+        fd, tempname = tempfile.mkstemp(dir=os.path.dirname(xml_file),
+                                        prefix='.' + record.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(record.content.xml())
+            set_default_mode(tempname)
+            os.rename(tempname, xml_file)
+        except:
+            if os.path.isfile(tempname):
+                os.remove(tempname)
+            raise
+        
+        # Update record in the index
+        conn = self.__index_connect()
+        try:
+            with conn:
+                self.__index_set(conn, record, xml_file)
+        finally:
+            conn.close()
         
         return record
     
+    def __record_file(self, name=None, style=None):
+        """
+        Finds the file of a single existing record without loading any
+        records.
+        """
+        if name is not None and style is not None:
+            rfiles = [os.path.join(self.host, style, name+'.xml')]
+            if not os.path.isfile(rfiles[0]):
+                rfiles = []
+        else:
+            if name is None:
+                name = '*'
+            if style is None:
+                style = '*'
+            rfiles = glob.glob(os.path.join(self.host, style, name+'.xml'))
+        
+        if len(rfiles) == 1:
+            return rfiles[0]
+        elif len(rfiles) == 0:
+            raise ValueError('Cannot find matching record '+ name + ' (' +style + ')')
+        else:
+            raise ValueError('Multiple matching records found')
+    
     def delete_record(self, record=None, name=None, style=None):
         """
         Permanently deletes a record from the database.  Will issue an error 
@@ -324,8 +580,18 @@ class Local(Database):
         
         # Delete record file
         os.remove(record_path+'.xml')
-
-    def add_tar(self, record=None, name=None, style=None, root_dir=None):
+        
+        # Remove record from the index
+        conn = self.__index_connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM records WHERE style = ? AND name = ?',
+                             (record.style, record.name))
+        finally:
+            conn.close()
+    
+    def add_tar(self, record=None, name=None, style=None, root_dir=None,
+                exclude=None):
         """
         Archives and stores a folder associated with a record.  Issues an
         error if exactly one matching record is not found in the database, or
@@ -346,6 +612,9 @@ class Local(Database):
             Specifies the root directory for finding the directory to archive.
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)
+        exclude : list of str, optional
+            fnmatch-style patterns of files and directories not to archive,
+            such as large intermediate dump files.
         
         Raises
         ------
@@ -370,12 +639,16 @@ class Local(Database):
         record_path = os.path.join(self.host, record.style, record.name)
         
         # Check if an archive already exists
-        if os.path.isfile(record_path+'.tar.gz'):
+        if archive.find_archive(record_path) is not None:
             raise ValueError('Record already has an archive')
         
         # Make archive
-        shutil.make_archive(record_path, 'gztar', root_dir=root_dir,
-                            base_dir=record.name)
+        archive.make_archive(record_path + archive.extensions[self.__codec],
+                             root_dir=root_dir, base_dir=record.name,
+                             codec=self.__codec,
+                             compresslevel=self.__compresslevel,
+                             nthreads=self.__nthreads, exclude=exclude,
+                             index=True)
     
     def get_tar(self, record=None, name=None, style=None, raw=False):
         """
@@ -397,9 +670,11 @@ class Local(Database):
         
         Returns
         -------
-        tarfile or str
+        tarfile, iprPy.database.archive.IndexedArchive or str
             The tar archive as an open tarfile if raw=False, or as a binary str if
-            raw=True.
+            raw=True.  Archives with a member index are opened as an
+            IndexedArchive, whose extractfile() reads only the requested
+            member.
         
         Raises
         ------
@@ -422,13 +697,18 @@ class Local(Database):
         # Build path to record
         record_path = os.path.join(self.host, record.style, record.name)
         
+        # Find the archive file
+        archive_file = archive.find_archive(record_path)
+        if archive_file is None:
+            raise ValueError('Record has no archive')
+        
         # Return content
         if raw is True:
-            with open(record_path, 'rb') as f:
+            with open(archive_file, 'rb') as f:
                 return f.read()
         else:
-            return tarfile.open(record_path+'.tar.gz')
-
+            return archive.open_archive(archive_file)
+    
     def delete_tar(self, record=None, name=None, style=None):
         """
         Deletes a tar file from the database.  Issues an error if exactly one
@@ -466,11 +746,13 @@ class Local(Database):
         # Build path to tar file
         record_path = os.path.join(self.host, record.style, record.name)
         
-        # Delete record if it exists
-        if os.path.isfile(record_path+'.tar.gz'):
-            os.remove(record_path+'.tar.gz')
-
-    def update_tar(self, record=None, name=None, style=None, root_dir=None):
+        # Delete archive if it exists
+        archive_file = archive.find_archive(record_path)
+        if archive_file is not None:
+            archive.delete_archive(archive_file)
+    
+    def update_tar(self, record=None, name=None, style=None, root_dir=None,
+                   exclude=None):
         """
         Replaces an existing tar archive for a record with a new one.  Issues
         an error if exactly one matching record is not found in the database.
@@ -489,10 +771,13 @@ class Local(Database):
         root_dir : str, optional
             Specifies the root directory for finding the directory to archive.
             The directory to archive is at <root_dir>/<name>.
+        exclude : list of str, optional
+            fnmatch-style patterns of files and directories not to archive.
         """
         
         # Delete the existing tar archive stored in the database
         self.delete_tar(record=record, name=name)
         
         # Add the new tar archive
-        self.add_tar(record=record, name=name, style=style, root_dir=root_dir)
\ No newline at end of file
+        self.add_tar(record=record, name=name, style=style, root_dir=root_dir,
+                     exclude=exclude)
\ No newline at end of file
@@ -4,14 +4,25 @@ from __future__ import (absolute_import, print_function,
 import os
 import uuid
 import shutil
+import stat
+import tempfile
+from collections import OrderedDict
 from copy import deepcopy
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
 
 # iprPy imports
 from ..tools import aslist, filltemplate
-from .. import load_record
+from .. import load_record, load_calculation
 from ..input import buildcombos, parse
 
-def prepare(database, run_directory, calculation, input_script=None, **kwargs):
+# The content cache used by build_candidate and build_folder in the current
+# process
+content_cache = None
+
+def prepare(database, run_directory, calculation, input_script=None,
+            nprocs=1, chunksize=1000, **kwargs):
     """
     Function for preparing any iprPy calculation for high-throughput execution.
     Input parameters for preparing can either be given within an input script
@@ -29,11 +40,22 @@ def prepare(database, run_directory, calculation, input_script=None, **kwargs):
     input_script : str or file-like object, optional
         The file, path to file, or contents of an input script containing
         parameters for preparing the calculation.  Cannot be given with kwargs.
+    nprocs : int, optional
+        The number of worker processes to use for building the calculation
+        records and folders.  Records are always added to the database by
+        the calling process.  (Default is 1, which does everything serially.)
+    chunksize : int, optional
+        The number of combinations to build, check and add to the database
+        at a time.  Limits how many candidate records are held in memory.
+        (Default is 1000.)
     **kwargs : str or list
         Input parameters for preparing the calculation.  Values must be strings
         or list of strings if allowed by the calculation.
     """
     
+    # https://pandas.pydata.org/
+    import pandas as pd
+    
     # Parse input_script to kwargs if given
     if input_script is not None:
         if len(kwargs) == 0:
@@ -108,6 +130,12 @@ def prepare(database, run_directory, calculation, input_script=None, **kwargs):
     # Fill in missing values
     for key in calculation.singularkeys:
         kwargs[key] = kwargs.get(key, '')
+    
+    # Share reference results between calculations through the database
+    if ('reference_cache' in calculation.singularkeys
+        and kwargs['reference_cache'] == ''
+        and database.reference_cache is not None):
+        kwargs['reference_cache'] = database.reference_cache
     for keyset in calculation.multikeys:
         for key in keyset:
             if len(kwargs[key]) == 0:
@@ -118,81 +146,324 @@ def prepare(database, run_directory, calculation, input_script=None, **kwargs):
     for key in calculation.singularkeys:
         calculation_dict[key] = kwargs[key]
     
-    # Iterate over multidict combinations
-    for subdict in itermultidict(calculation.multikeys, **kwargs):
-        calculation_dict.update(subdict)
-        
-        # Create calc_key
-        calc_key = str(uuid.uuid4())
+    # Stream the calculation_dict for each multidict combination
+    calculation_dicts = (merge_dicts(calculation_dict, subdict) for subdict
+                         in itermultidict(calculation.multikeys, **kwargs))
+    
+    if nprocs > 1:
+        pool = Pool(nprocs, initializer=init_content_cache,
+                    initargs=(database,))
+        mapper = partial(pool.imap, chunksize=16)
+    else:
+        pool = None
+        mapper = map
+        init_content_cache(database)
+    
+    artifact_directory = None
+    try:
+        # Create directory for sharing extracted potential artifacts
+        artifact_directory = tempfile.mkdtemp(prefix='iprPy-prepare-')
         
-        # Build input_dict from calculation_dict
-        input_dict = {}
-        for key in calculation_dict:
-            if calculation_dict[key] != '':
-                input_dict[key] = deepcopy(calculation_dict[key])
+        new_record = load_record(style=calculation.record_style)
+        while True:
+            # Build incomplete records for the next chunk of combinations
+            chunk = list(islice(calculation_dicts, chunksize))
+            if len(chunk) == 0:
+                break
+            candidates = []
+            for candidate in mapper(partial(build_candidate, database,
+                                            calculation.style), chunk):
+                if candidate is not None:
+                    candidates.append(candidate)
+            if len(candidates) == 0:
+                continue
+            
+            # Check the chunk's candidate records against existing records
+            candidate_df = pd.DataFrame([candidate[2] for candidate in candidates])
+            isnew = new_record.isnew_batch(candidate_df, record_df=record_df)
+            
+            # Add new records to database in bulk
+            new_records = []
+            folders = []
+            for (calc_key, content, summary, folder_dict, calc_dict), new in zip(candidates, isnew):
+                if new:
+                    new_records.append(load_record(calculation.record_style,
+                                                   calc_key, content,
+                                                   summary=summary))
+                    folders.append((calc_key, folder_dict, calc_dict))
+            database.add_records(new_records)
             
-            if key[-8:] == '_content':
-                terms = input_dict[key].split()
-                
-                if terms[0] == 'file':
-                    with open(terms[1], 'rb') as f:
-                        input_dict[key] = f.read()
-                
-                elif terms[0] == 'record':
-                    crecord = database.get_record(name=terms[1])
-                    input_dict[key] = crecord.content.json(indent=4)
-                
-                elif terms[0] == 'tar':
-                    tar = database.get_tar(name=terms[1])
-                    f = tar.extractfile(terms[1] + '/' + ' '.join(terms[2:]))
-                    input_dict[key] = f.read()
-                    f.close()
-                    tar.close()
+            # Generate calculation folders
+            for calc_key in mapper(partial(build_folder, database,
+                                           calculation.style, run_directory,
+                                           artifact_directory), folders):
+                pass
+    
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        else:
+            init_content_cache(None)
+        if artifact_directory is not None:
+            shutil.rmtree(artifact_directory, ignore_errors=True)
+
+class ContentCache(object):
+    """
+    Least recently used cache of resolved 'file', 'record' and 'tar'
+    content terms.
+    """
+    
+    def __init__(self, database, maxsize=256):
+        """
+        Initializes a ContentCache.
         
-        # Build incomplete record
-        calculation.process_input(input_dict, calc_key, build=False)
+        Parameters
+        ----------
+        database : iprPy.database.Database
+            The database to retrieve 'record' and 'tar' content from.
+        maxsize : int, optional
+            The maximum number of content values to keep.  (Default is 256.)
+        """
+        self.database = database
+        self.maxsize = maxsize
+        self.__cache = OrderedDict()
+    
+    def get(self, value):
+        """
+        Resolves a content term.
         
-        new_record = load_record(style=calculation.record_style, name=calc_key)
-        new_record.buildcontent('calc_' + calculation.style, input_dict)
+        Parameters
+        ----------
+        value : str
+            The content term: 'file <path>', 'record <name>', or
+            'tar <name> <member>'.
         
-        # Check if record is valid and new
-        if new_record.isvalid() and new_record.isnew(record_df=record_df):
-            
-            # Add record to database
-            database.add_record(record=new_record)
-            
-            # Generate calculation folder
-            calc_directory = os.path.join(run_directory, calc_key)
-            os.makedirs(calc_directory)
-            
-            # Save inputfile to calculation folder
-            inputfile = filltemplate(calculation.template, calculation_dict, '<', '>')
-            with open(os.path.join(calc_directory, 'calc_' + calculation.style + '.in'), 'w') as f:
-                f.write(inputfile)
-            
-            # Add calculation files to calculation folder
-            for calc_file in calculation.files:
-                shutil.copy(calc_file, calc_directory)
+        Returns
+        -------
+        str or bytes
+            The resolved content, or value as is if it is not a content
+            term.
+        """
+        terms = value.split()
+        
+        # Return other values as is
+        if len(terms) < 2 or terms[0] not in ['file', 'record', 'tar']:
+            return value
+        key = (terms[0], terms[1], ' '.join(terms[2:]))
+        
+        # Move cached content to the end
+        try:
+            content = self.__cache.pop(key)
+        
+        except KeyError:
+            if terms[0] == 'file':
+                with open(terms[1], 'rb') as f:
+                    content = f.read()
             
-            # Save content keys to file keys
-            for key_file in input_dict:
-                if key_file[-5:] == '_file':
-                    key_content = key_file.replace('_file', '_content')
-                    dirpath = os.path.dirname(os.path.join(calc_directory, input_dict[key_file]))
-                    if not os.path.isdir(dirpath):
-                        os.makedirs(dirpath)
-                    try:
-                        with open(os.path.join(calc_directory, input_dict[key_file]), 'w') as f:
-                            f.write(input_dict[key_content])
-                    except:
-                        with open(os.path.join(calc_directory, input_dict[key_file]), 'wb') as f:
-                            f.write(input_dict[key_content])
+            elif terms[0] == 'record':
+                crecord = self.database.get_record(name=terms[1])
+                content = crecord.content.json(indent=4)
             
-            # Copy potential artifacts
-            if 'potential_dir' in input_dict:
-                tar = database.get_tar(name=input_dict['potential_dir'])
-                tar.extractall(calc_directory)
+            elif terms[0] == 'tar':
+                tar = self.database.get_tar(name=terms[1])
+                f = tar.extractfile(terms[1] + '/' + ' '.join(terms[2:]))
+                content = f.read()
+                f.close()
                 tar.close()
+            
+            # Drop least recently used content
+            if len(self.__cache) >= self.maxsize:
+                self.__cache.popitem(last=False)
+        
+        self.__cache[key] = content
+        return content
+
+def init_content_cache(database, maxsize=256):
+    """
+    Sets the content cache used by build_candidate and build_folder in the
+    current process.
+    
+    Parameters
+    ----------
+    database : iprPy.database.Database or None
+        The database to retrieve 'record' and 'tar' content from.  If None,
+        the content cache is removed.
+    maxsize : int, optional
+        The maximum number of content values to keep.  (Default is 256.)
+    """
+    global content_cache
+    if database is None:
+        content_cache = None
+    else:
+        content_cache = ContentCache(database, maxsize=maxsize)
+
+def build_candidate(database, calculation_style, calculation_dict):
+    """
+    Builds the incomplete record for one combination of prepare inputs.
+    
+    Parameters
+    ----------
+    database : iprPy.database.Database
+        The database that will host the record.
+    calculation_style : str
+        The calculation style being prepared.
+    calculation_dict : dict
+        The str values of all calculation keys for the combination.
+    
+    Returns
+    -------
+    tuple or None
+        None if the record is not valid.  Otherwise, the calculation key,
+        the record content, the record's todict(full=False, flat=True)
+        representation, the input terms needed for building the calculation
+        folder, and calculation_dict.
+    """
+    calculation = load_calculation(calculation_style)
+    
+    # Create calc_key
+    calc_key = str(uuid.uuid4())
+    
+    # Build input_dict from calculation_dict
+    input_dict = {}
+    for key in calculation_dict:
+        if calculation_dict[key] != '':
+            input_dict[key] = deepcopy(calculation_dict[key])
+        
+        if key[-8:] == '_content':
+            input_dict[key] = content_cache.get(input_dict[key])
+    
+    # Build incomplete record
+    calculation.process_input(input_dict, calc_key, build=False)
+    
+    new_record = load_record(style=calculation.record_style, name=calc_key)
+    new_record.buildcontent('calc_' + calculation.style, input_dict)
+    
+    if not new_record.isvalid():
+        return None
+    
+    # Keep only the terms needed to build the calculation folder.  Content
+    # terms are passed as their unresolved keys rather than the content.
+    folder_dict = {}
+    for key in input_dict:
+        if key[-8:] == '_content':
+            folder_dict[key] = calculation_dict[key]
+        elif key[-5:] == '_file' or key == 'potential_dir':
+            folder_dict[key] = input_dict[key]
+    
+    return (calc_key, new_record.content,
+            new_record.todict(full=False, flat=True), folder_dict,
+            calculation_dict)
+
+def build_folder(database, calculation_style, run_directory,
+                 artifact_directory, folder):
+    """
+    Generates the calculation folder for one prepared calculation.
+    
+    Parameters
+    ----------
+    database : iprPy.database.Database
+        The database to retrieve potential artifacts from.
+    calculation_style : str
+        The calculation style being prepared.
+    run_directory : str
+        The path to the directory where the folder is created.
+    artifact_directory : str
+        The path to the directory where potential artifacts are extracted
+        once and shared with all calculation folders.
+    folder : tuple
+        The calculation key, the input terms needed for building the folder,
+        and the str values of all calculation keys.
+    
+    Returns
+    -------
+    str
+        The calculation key.
+    """
+    calculation = load_calculation(calculation_style)
+    calc_key, input_dict, calculation_dict = folder
+    
+    # Generate calculation folder
+    calc_directory = os.path.join(run_directory, calc_key)
+    os.makedirs(calc_directory)
+    
+    # Save inputfile to calculation folder
+    inputfile = filltemplate(calculation.template, calculation_dict, '<', '>')
+    with open(os.path.join(calc_directory, 'calc_' + calculation.style + '.in'), 'w') as f:
+        f.write(inputfile)
+    
+    # Add calculation files to calculation folder
+    for calc_file in calculation.files:
+        shutil.copy(calc_file, calc_directory)
+    
+    # Save content keys to file keys
+    for key_file in input_dict:
+        if key_file[-5:] == '_file':
+            key_content = key_file.replace('_file', '_content')
+            content = content_cache.get(input_dict[key_content])
+            dirpath = os.path.dirname(os.path.join(calc_directory, input_dict[key_file]))
+            if not os.path.isdir(dirpath):
+                os.makedirs(dirpath)
+            try:
+                with open(os.path.join(calc_directory, input_dict[key_file]), 'w') as f:
+                    f.write(content)
+            except:
+                with open(os.path.join(calc_directory, input_dict[key_file]), 'wb') as f:
+                    f.write(content)
+    
+    # Link potential artifacts
+    if 'potential_dir' in input_dict:
+        potential_dir = input_dict['potential_dir']
+        artifact_dir = os.path.join(artifact_directory, potential_dir)
+        
+        # Extract artifacts if not done already by any process
+        if not os.path.isdir(artifact_dir):
+            tempdir = tempfile.mkdtemp(dir=artifact_directory)
+            tar = database.get_tar(name=potential_dir)
+            tar.extractall(tempdir)
+            tar.close()
+            try:
+                os.rename(os.path.join(tempdir, potential_dir), artifact_dir)
+            except OSError:
+                pass
+            shutil.rmtree(tempdir)
+        
+        linktree(artifact_dir, os.path.join(calc_directory, potential_dir))
+    
+    return calc_key
+
+def linktree(src, dst):
+    """
+    Recreates a directory tree by hard linking all files, or copying them if
+    hard links are not supported.  Hard linked files share their contents
+    with src and every other linked tree, so they are made read-only to
+    keep one calculation from changing the files used by the others.
+    Calculations that need to modify a potential artifact must copy it
+    first.
+    
+    Parameters
+    ----------
+    src : str
+        The path to the directory to link files from.
+    dst : str
+        The path to the directory to create.
+    """
+    readonly = ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+    for root, dirs, files in os.walk(src):
+        dstroot = os.path.normpath(os.path.join(dst, os.path.relpath(root, src)))
+        if not os.path.isdir(dstroot):
+            os.makedirs(dstroot)
+        for fname in files:
+            srcfile = os.path.join(root, fname)
+            try:
+                os.link(srcfile, os.path.join(dstroot, fname))
+            except (AttributeError, OSError):
+                shutil.copy2(srcfile, dstroot)
+            else:
+                # Linked files share one mode, so this covers all links
+                mode = os.stat(srcfile).st_mode
+                if mode & readonly != mode:
+                    os.chmod(srcfile, mode & readonly)
 
 def itermultidict(multikeys, **kwargs):
     
@@ -3,23 +3,44 @@ from __future__ import (absolute_import, print_function,
                         division, unicode_literals)
 import os
 import sys
+import socket
 import subprocess
+import runpy
+import traceback
+import select
+import signal
+import json
 import random
 import shutil
 import time
 import glob
 import datetime
-import requests
+import tempfile
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 
 # https://github.com/usnistgov/DataModelDict
 from DataModelDict import DataModelDict as DM
 
 # iprPy imports
 from .. import rootdir
+from . import archive
 
-def runner(dbase, run_directory, orphan_directory=None, hold_directory=None):
+def runner(dbase, run_directory, orphan_directory=None, hold_directory=None,
+           bid_delay=0.1, max_bid_delay=10.0, slots=1, poll_delay=0.1,
+           archive_exclude=None, forkserver=False):
     """
-    High-throughput calculation runner.
+    High-throughput calculation runner.  Up to slots calculations are run
+    concurrently as subprocesses.  Updating the finished calculations'
+    records and archives in the database is done by a background thread so
+    that new calculations can be started right away.  If the runner stops
+    due to an error, the calculations still running are finished first.  If
+    it is interrupted or cannot finish calculations, they are terminated and
+    their bids are released so that they can be run again.
     
     Parameters
     ----------
@@ -36,12 +57,38 @@ def runner(dbase, run_directory, orphan_directory=None, hold_directory=None):
         The path for the hold directory where tar archives that failed to be
         uploaded are moved to.  If None (default) then will use 'hold' at the
         same level as the run_directory.
+    bid_delay : float, optional
+        The number of seconds to wait after the first failed bid.  The wait
+        time doubles with each consecutive failed bid.  (Default is 0.1.)
+    max_bid_delay : float, optional
+        The maximum number of seconds to wait after a failed bid.  (Default
+        is 10.0.)
+    slots : int, optional
+        The number of calculations to run at the same time.  (Default is 1.)
+    poll_delay : float, optional
+        The number of seconds to wait between checks on running calculations
+        when all slots are in use.  (Default is 0.1.)
+    archive_exclude : list of str, optional
+        fnmatch-style patterns of files and directories in the calculation
+        folders not to include in the archives added to the database, such as
+        large intermediate dump files.  (Default is to archive everything.)
+    forkserver : bool, optional
+        If True, each calculation is run in a process forked from a worker
+        that has already imported iprPy and its dependencies, rather than in
+        a new Python interpreter.  This avoids the import time of each
+        calculation, which is significant for fast calculations.  Requires
+        Python 3 on a system that supports fork.  (Default is False.)
     """
     # Get path to Python executable running this script
     py_exe = sys.executable
     if py_exe is None:
         py_exe = 'python'
     
+    # Start the preloaded fork server
+    server = None
+    if forkserver:
+        server = ForkServer(py_exe)
+    
     # Get absolute path to run_directory
     run_directory = os.path.abspath(run_directory)
     
@@ -64,7 +111,7 @@ def runner(dbase, run_directory, orphan_directory=None, hold_directory=None):
     if orphan_directory is None:
         orphan_directory = os.path.join(os.path.dirname(run_directory),
                                         'orphan')
-        
+    
     # Set default orphan_directory
     if hold_directory is None:
         hold_directory = os.path.join(os.path.dirname(run_directory), 'hold')
@@ -75,6 +122,22 @@ def runner(dbase, run_directory, orphan_directory=None, hold_directory=None):
         # Change to the run directory
         os.chdir(run_directory)
         
+        # Start the background thread that finishes calculations
+        log_lock = threading.Lock()
+        finished = queue.Queue()
+        completed = queue.Queue()
+        errors = queue.Queue()
+        finisher = threading.Thread(target=finishcalcs,
+                                    args=(dbase, run_directory,
+                                          hold_directory, archive_exclude,
+                                          finished, completed, errors, log,
+                                          log_lock))
+        finisher.daemon = True
+        finisher.start()
+        
+        # Build the dependency graph of the calculations
+        graph = DependencyGraph(run_directory)
+        
         # Initialize bidfailcount counter
         bidfailcount = 0
         
@@ -82,225 +145,983 @@ def runner(dbase, run_directory, orphan_directory=None, hold_directory=None):
         print('Runner started with pid', pid)
         sys.stdout.flush()
         
-        # flist is the running list of calculations
-        flist = os.listdir(run_directory)
-        while len(flist) > 0:
-            
-            # Pick a random calculation from the list
-            index = random.randint(0, len(flist)-1)
-            sim = flist[index]
-            
-            # Submit a bid and check if it succeeded
-            if bid(sim):
-                
-                # Reset bidfailcount
-                bidfailcount = 0
+        # running and finishing track the calculations in progress
+        running = {}
+        finishing = set()
+        
+        # deferred tracks the calculations that could not be claimed
+        deferred = set()
+        
+        # finishable is set to False if the finisher thread cannot finish
+        # the calculations still running when the runner stops
+        finishable = True
+        try:
+            while True:
                 
-                # Move to simulation directory
-                os.chdir(sim)
-                log.write('%s\n' % sim)
+                # Raise fatal errors from the finisher thread
+                if not errors.empty():
+                    finishable = False
+                    raise errors.get()
+                if not finisher.is_alive():
+                    finishable = False
+                    raise RuntimeError('runner finisher thread stopped unexpectedly')
                 
-                # Check that the calculation has calc_*.py, calc_*.in and
-                # record in the database
-                try:
-                    record = dbase.get_record(name=sim)
-                    calc_py = get_file('calc_*.py')
-                    calc_in = get_file('calc_*.in')
+                # Pass completed calculations to the finisher thread
+                for sim in list(running.keys()):
+                    if running[sim]['run'].poll() is not None:
+                        finishing.add(sim)
+                        finished.put(running.pop(sim))
                 
-                # Pass ConnectionErrors forward killing runner
-                except requests.ConnectionError as e:
-                    raise requests.ConnectionError(e)
+                # Remove calculations finished by the finisher thread
+                while True:
+                    try:
+                        sim = completed.get_nowait()
+                    except queue.Empty:
+                        break
+                    finishing.discard(sim)
+                    graph.remove(sim)
                 
-                # If not complete, zip and move to the orphan directory
-                except:
-                    log.write('Incomplete simulation: moved to orphan directory\n\n')
-                    os.chdir(run_directory)
-                    if not os.path.isdir(orphan_directory):
-                        os.makedirs(orphan_directory)
-                    shutil.make_archive(os.path.join(orphan_directory, sim),
-                                        'gztar', root_dir=run_directory,
-                                        base_dir=sim)
-                    removecalc(os.path.join(run_directory, sim))
-                    flist = os.listdir(run_directory)
+                # Wait for an open slot
+                if len(running) >= slots:
+                    time.sleep(poll_delay)
                     continue
                 
-                # Check if any files in the calculation folder are incomplete
-                # records
-                error_flag = False
-                ready_flag = True
+                # Get the next calculation with all parents finished
+                sim = graph.next()
+                if sim is None:
+                    graph.scan(exclude=set(running) | finishing | deferred,
+                               force=bidfailcount > 0)
+                    sim = graph.next()
                 
-                for fname in glob.iglob('*'):
-                    parent_sim, ext = os.path.splitext(os.path.basename(fname))
-                    if ext in ('.json', '.xml'):
-                        parent = DM(fname)
-                        try:
-                            status = parent.find('status')
-                            
-                            # Check parent record in database to see if it has completed
-                            if status == 'not calculated':
-                                parent_record = dbase.get_record(name=parent_sim)
-                                try:
-                                    status = parent_record.content.find('status')
-                                    
-                                    # Mark flag if still incomplete
-                                    if status == 'not calculated':
-                                        ready_flag = False
-                                        break
-                                    
-                                    # Skip if parent calculation failed
-                                    elif status == 'error':
-                                        with open(os.path.basename(fname), 'w') as f:
-                                            parent_record.content.json(fp=f, indent=4)
-                                        error_flag = True
-                                        error_message = 'parent calculation issued an error'
-                                        break
-                                    
-                                    # Ignore if unknown status
-                                    else:
-                                        raise ValueError('unknown status')
-                                        
-                                # Copy parent record to calculation folder if it is now complete
-                                except:
-                                    with open(os.path.basename(fname), 'w') as f:
-                                        parent_record.content.json(fp=f, indent=4)
-                                    log.write('parent %s copied to sim folder\n' % parent_sim)
-                            
-                            # skip if parent calculation failed
-                            elif status == 'error':
-                                error_flag = True
-                                error_message = 'parent calculation issued an error'
-                                break
-                        except:
-                            continue
-                
-                # Handle calculations that have unfinished parents
-                if not ready_flag:
-                    bid_files = glob.glob('*.bid')
-                    os.chdir(run_directory)
-                    for bid_file in bid_files:
-                        os.remove(os.path.join(sim, bid_file))
-                    flist = [parent_sim]
-                    log.write('parent %s not ready\n\n' % parent_sim)
+                # Handle no calculations being ready
+                if sim is None:
+                    
+                    # Keep checking running calculations
+                    if len(running) > 0 or len(finishing) > 0:
+                        time.sleep(poll_delay)
+                        continue
+                    
+                    # Stop if no calculations are left
+                    if len(graph) == 0:
+                        break
+                    bidfailcount += 1
+                    
+                    # Stop unproductive worker after 10 consecutive bid fails
+                    if bidfailcount > 10:
+                        print("Didn't find an open simulation")
+                        break
+                    
+                    # Back off before trying again
+                    time.sleep(min(bid_delay * 2 ** (bidfailcount - 1),
+                                   max_bid_delay))
+                    deferred.clear()
                     continue
                 
-                # Run the calculation
-                try:
-                    assert not error_flag, error_message
-                    run = subprocess.Popen([py_exe, calc_py, calc_in, sim],
-                                           stderr=subprocess.PIPE)
-                    error_message = run.stderr.read()
+                # Submit a bid and check if it succeeded
+                if bid(sim):
                     
-                    # Load results.json
+                    # Start the calculation, releasing the bid if it fails
                     try:
-                        model = DM('results.json')
-                    
-                    # Throw errors if no results.json
+                        job = startcalc(dbase, run_directory, orphan_directory,
+                                        py_exe, sim, server=server)
                     except:
-                        error_flag = True
-                    assert not error_flag, error_message
-                    log.write('sim calculated successfully\n')
+                        releasebid(sim)
+                        raise
+                    if 'run' in job:
+                        running[sim] = job
+                    elif 'model' in job:
+                        finishing.add(sim)
+                        finished.put(job)
+                    else:
+                        writelog(log, log_lock, job['log'])
+                    
+                    # Defer calculations with parents outside run_directory
+                    if 'parent' in job:
+                        deferred.add(sim)
+                    else:
+                        bidfailcount = 0
+                        if 'run' not in job and 'model' not in job:
+                            graph.remove(sim)
                 
-                # Catch any errors and build results.json
-                except:
-                    model = record.content
-                    keys = list(model.keys())
-                    record_type = keys[0]
-                    model[record_type]['status'] = 'error'
-                    model[record_type]['error'] = str(sys.exc_info()[1])
-                    with open('results.json', 'w') as f:
-                        model.json(fp=f, indent=4)
-                    log.write('error: %s\n' % model[record_type]['error'])
+                # Drop calculations removed by other runners
+                elif not os.path.isdir(sim):
+                    graph.remove(sim)
                 
-                # Read in results.json
-                #model = DM('results.json')
+                # Defer calculations claimed by other runners
+                else:
+                    deferred.add(sim)
+        
+        # Stop running calculations if the runner is interrupted
+        except (KeyboardInterrupt, SystemExit):
+            finishable = False
+            raise
+        
+        finally:
+            try:
+                # Wait for running calculations to finish after errors
+                while finishable and len(running) > 0:
+                    for sim in list(running.keys()):
+                        if running[sim]['run'].poll() is not None:
+                            finishing.add(sim)
+                            finished.put(running.pop(sim))
+                    time.sleep(poll_delay)
+            
+            finally:
+                # Stop all other calculations and release their bids so
+                # that they can be run again
+                for sim in list(running.keys()):
+                    stopcalc(running.pop(sim), poll_delay)
+                    releasebid(sim)
                 
-                # Update record
-                tries = 0
-                while tries < 10:
+                # Let finisher complete all remaining calculations
+                finished.put(None)
+                finisher.join()
+                
+                # Stop the fork server
+                if server is not None:
+                    server.close()
+        
+        print('No simulations left to run')
+        os.chdir(original_dir)
+
+def startcalc(dbase, run_directory, orphan_directory, py_exe, sim,
+              server=None):
+    """
+    Checks a claimed calculation and its parents, and starts it running if
+    it is ready.
+    
+    Parameters
+    ----------
+    dbase : iprPy.Database
+        The database to interact with.
+    run_directory : str
+        The path to the directory where the calculation instances to run are
+        located.
+    orphan_directory : str
+        The path for the orphan directory where incomplete calculations are
+        moved.
+    py_exe : str
+        The Python executable to run the calculation with.
+    sim : str
+        The name of the claimed calculation.
+    server : ForkServer, optional
+        If given, the calculation is run in a process forked from this fork
+        server instead of with py_exe.
+    
+    Returns
+    -------
+    dict
+        The job information.  The 'log' list collects log messages.  'run'
+        is the running subprocess, 'model' is the error results if the
+        calculation failed without running, and 'parent' is the name of an
+        unfinished parent calculation.
+    """
+    # http://docs.python-requests.org
+    import requests
+    
+    sim_dir = os.path.join(run_directory, sim)
+    job = {'sim': sim, 'log': ['%s\n' % sim]}
+    
+    # Check that the calculation has calc_*.py, calc_*.in and record in the
+    # database
+    try:
+        record = dbase.get_record(name=sim)
+        calc_py = os.path.basename(get_file(os.path.join(sim_dir, 'calc_*.py')))
+        calc_in = os.path.basename(get_file(os.path.join(sim_dir, 'calc_*.in')))
+    
+    # Pass ConnectionErrors forward killing runner
+    except requests.ConnectionError as e:
+        raise requests.ConnectionError(e)
+    
+    # If not complete, zip and move to the orphan directory
+    except:
+        job['log'].append('Incomplete simulation: moved to orphan directory\n\n')
+        if not os.path.isdir(orphan_directory):
+            os.makedirs(orphan_directory)
+        archive.make_archive(os.path.join(orphan_directory, sim+'.tar.gz'),
+                             root_dir=run_directory, base_dir=sim)
+        removecalc(sim_dir)
+        return job
+    job['record'] = record
+    
+    # Check if any files in the calculation folder are incomplete
+    # records
+    error_flag = False
+    ready_flag = True
+    
+    for fname in glob.iglob(os.path.join(sim_dir, '*')):
+        parent_sim, ext = os.path.splitext(os.path.basename(fname))
+        if ext in ('.json', '.xml'):
+            parent = DM(fname)
+            try:
+                status = parent.find('status')
+                
+                # Check parent record in database to see if it has completed
+                if status == 'not calculated':
+                    parent_record = dbase.get_record(name=parent_sim)
                     try:
-                        dbase.update_record(content=model, name=sim)
-                        break
+                        status = parent_record.content.find('status')
+                        
+                        # Mark flag if still incomplete
+                        if status == 'not calculated':
+                            ready_flag = False
+                            break
+                        
+                        # Skip if parent calculation failed
+                        elif status == 'error':
+                            with open(fname, 'w') as f:
+                                parent_record.content.json(fp=f, indent=4)
+                            error_flag = True
+                            error_message = 'parent calculation issued an error'
+                            break
+                        
+                        # Ignore if unknown status
+                        else:
+                            raise ValueError('unknown status')
+                    
+                    # Copy parent record to calculation folder if it is now complete
                     except:
-                        tries += 1
-                if tries == 10:
-                    os.chdir(run_directory)
-                    log.write('failed to update record\n')
-                else:
-                    # Archive calculation and add to database or hold_directory
+                        with open(fname, 'w') as f:
+                            parent_record.content.json(fp=f, indent=4)
+                        job['log'].append('parent %s copied to sim folder\n' % parent_sim)
+                
+                # skip if parent calculation failed
+                elif status == 'error':
+                    error_flag = True
+                    error_message = 'parent calculation issued an error'
+                    break
+            except:
+                continue
+    
+    # Handle calculations that have unfinished parents
+    if not ready_flag:
+        for bid_file in glob.glob(os.path.join(sim_dir, '*.bid')):
+            os.remove(bid_file)
+        job['parent'] = parent_sim
+        job['log'].append('parent %s not ready\n\n' % parent_sim)
+    
+    # Build error results for calculations with failed parents
+    elif error_flag:
+        job['model'] = errormodel(record, error_message)
+    
+    # Run the calculation in a new Python interpreter
+    elif server is None:
+        job['stderr'] = tempfile.TemporaryFile()
+        job['run'] = subprocess.Popen([py_exe, calc_py, calc_in, sim],
+                                      stderr=job['stderr'], cwd=sim_dir)
+    
+    # Run the calculation in a process forked from the fork server
+    else:
+        job['stderr'] = tempfile.NamedTemporaryFile()
+        job['run'] = server.start(sim_dir, calc_py, calc_in, sim,
+                                  job['stderr'].name)
+    
+    return job
+
+def stopcalc(job, poll_delay=0.1):
+    """
+    Terminates a running calculation and waits for it to stop.
+    
+    Parameters
+    ----------
+    job : dict
+        The job information returned by startcalc() for a running
+        calculation.
+    poll_delay : float, optional
+        The number of seconds to wait between checks on the calculation.
+        (Default is 0.1.)
+    """
+    try:
+        if job['run'].poll() is None:
+            job['run'].terminate()
+        while job['run'].poll() is None:
+            time.sleep(poll_delay)
+    except Exception:
+        pass
+    job['stderr'].close()
+
+class ForkServer(object):
+    """
+    Runs calculations in processes forked from a worker Python process that
+    has already imported iprPy and its dependencies.  Each calculation still
+    gets its own fresh process, but does not pay the import time of a new
+    Python interpreter.
+    """
+    def __init__(self, py_exe):
+        """
+        Starts the worker process.
+        
+        Parameters
+        ----------
+        py_exe : str
+            The Python executable to run the worker with.
+        
+        Raises
+        ------
+        ValueError
+            If not running Python 3 or os.fork is not supported.
+        """
+        if sys.version_info[0] < 3:
+            raise ValueError('forkserver requires Python 3')
+        if not hasattr(os, 'fork'):
+            raise ValueError('forkserver requires a system that supports fork')
+        
+        # Exit codes are sent back through a separate pipe so that the
+        # calculations can still write to stdout
+        read_fd, write_fd = os.pipe()
+        try:
+            self.__process = subprocess.Popen([py_exe, '-c',
+                                               'from iprPy.database.runner import serveforks; serveforks(%i)' % write_fd],
+                                              stdin=subprocess.PIPE,
+                                              pass_fds=[write_fd])
+        finally:
+            os.close(write_fd)
+        self.__reply = os.fdopen(read_fd, 'rb', 0)
+        self.__buffer = b''
+        self.__count = 0
+        self.__exitcodes = {}
+    
+    def start(self, sim_dir, calc_py, calc_in, sim, stderr_file):
+        """
+        Starts a calculation.
+        
+        Parameters
+        ----------
+        sim_dir : str
+            The path to the calculation folder.
+        calc_py : str
+            The name of the calculation's Python script.
+        calc_in : str
+            The name of the calculation's input file.
+        sim : str
+            The name of the calculation.
+        stderr_file : str
+            Path to the file where the calculation's stderr is written.
+        
+        Returns
+        -------
+        ForkedCalc
+            The running calculation.
+        """
+        self.__count += 1
+        request = json.dumps([self.__count, sim_dir, calc_py, calc_in, sim,
+                              stderr_file])
+        self.__process.stdin.write(request.encode('utf-8') + b'\n')
+        self.__process.stdin.flush()
+        return ForkedCalc(self, self.__count)
+    
+    def exitcode(self, jobid):
+        """
+        Checks if a calculation has finished.
+        
+        Parameters
+        ----------
+        jobid : int
+            The calculation's id number from start().
+        
+        Returns
+        -------
+        int or None
+            The exit code, or None if still running.
+        """
+        # Read all available replies
+        while (self.__reply is not None
+               and len(select.select([self.__reply], [], [], 0)[0]) > 0):
+            data = self.__reply.read(65536)
+            
+            # Fail all remaining calculations if the worker stopped
+            if len(data) == 0:
+                self.__reply.close()
+                self.__reply = None
+                break
+            
+            self.__buffer += data
+            while b'\n' in self.__buffer:
+                line, self.__buffer = self.__buffer.split(b'\n', 1)
+                replyid, code = line.split()
+                self.__exitcodes[int(replyid)] = int(code)
+        
+        if self.__reply is None:
+            return self.__exitcodes.get(jobid, -1)
+        else:
+            return self.__exitcodes.get(jobid, None)
+    
+    def terminate(self, jobid):
+        """
+        Terminates a running calculation.
+        
+        Parameters
+        ----------
+        jobid : int
+            The calculation's id number from start().
+        """
+        request = json.dumps(['terminate', jobid])
+        self.__process.stdin.write(request.encode('utf-8') + b'\n')
+        self.__process.stdin.flush()
+    
+    def close(self):
+        """Stops the worker process once its calculations finish."""
+        self.__process.stdin.close()
+        self.__process.wait()
+        if self.__reply is not None:
+            self.__reply.close()
+            self.__reply = None
+
+class ForkedCalc(object):
+    """
+    A calculation started by ForkServer, with the same poll() interface as a
+    subprocess.
+    """
+    def __init__(self, server, jobid):
+        """
+        Parameters
+        ----------
+        server : ForkServer
+            The fork server running the calculation.
+        jobid : int
+            The calculation's id number.
+        """
+        self.__server = server
+        self.__jobid = jobid
+    
+    def poll(self):
+        """
+        Checks if the calculation has finished.
+        
+        Returns
+        -------
+        int or None
+            The exit code, or None if still running.
+        """
+        return self.__server.exitcode(self.__jobid)
+    
+    def terminate(self):
+        """Terminates the calculation."""
+        self.__server.terminate(self.__jobid)
+
+def serveforks(reply_fd, poll_delay=0.1):
+    """
+    Main loop of the fork server worker process started by ForkServer.
+    Calculation requests are read from stdin, each is run in a forked
+    child process, and the exit codes are written to reply_fd.  Stops when
+    stdin is closed and all calculations have finished.
+    
+    Parameters
+    ----------
+    reply_fd : int
+        The file descriptor to write exit codes to.
+    poll_delay : float, optional
+        The number of seconds to wait between checks on running
+        calculations.  (Default is 0.1.)
+    """
+    # Preload iprPy, its styles and their dependencies
+    import iprPy
+    for loaded in [iprPy.input.interpret_functions.loaded,
+                   iprPy.record.loaded, iprPy.calculation.loaded]:
+        loaded.importall()
+    
+    request_fd = sys.stdin.fileno()
+    buffer = b''
+    reading = True
+    jobs = {}
+    while reading or len(jobs) > 0:
+        
+        # Start requested calculations
+        if reading and len(select.select([request_fd], [], [], poll_delay)[0]) > 0:
+            data = os.read(request_fd, 65536)
+            if len(data) == 0:
+                reading = False
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                request = json.loads(line.decode('utf-8'))
+                
+                # Terminate a running calculation
+                if request[0] == 'terminate':
+                    for pid in jobs:
+                        if jobs[pid] == request[1]:
+                            os.kill(pid, signal.SIGTERM)
+                    continue
+                
+                pid = os.fork()
+                if pid == 0:
+                    
+                    # The child must always exit here, otherwise it would
+                    # continue serving requests alongside the worker
+                    code = 1
                     try:
-                        dbase.add_tar(root_dir=run_directory, name=sim)
+                        os.close(reply_fd)
+                        code = runforked(*request[1:])
                     except:
-                        log.write('failed to upload archive\n')
-                        if not os.path.isdir(hold_directory):
-                            os.makedirs(hold_directory)
-                        shutil.move(sim+'.tar.gz', hold_directory)
-                    os.chdir(run_directory)
-                    removecalc(os.path.join(run_directory, sim))
-                log.write('\n')
+                        try:
+                            traceback.print_exc()
+                            sys.stderr.flush()
+                        except:
+                            pass
+                    finally:
+                        os._exit(code)
+                jobs[pid] = request[0]
+        elif not reading:
+            time.sleep(poll_delay)
+        
+        # Report finished calculations
+        while len(jobs) > 0:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            if os.WIFSIGNALED(status):
+                code = -os.WTERMSIG(status)
+            else:
+                code = os.WEXITSTATUS(status)
+            os.write(reply_fd, ('%i %i\n' % (jobs.pop(pid), code)).encode('utf-8'))
+
+def runforked(sim_dir, calc_py, calc_in, sim, stderr_file):
+    """
+    Runs a calculation script inside a forked process the same way that it
+    is run as a new Python interpreter: in the calculation folder, as the
+    __main__ module and with the same command line arguments.
+    
+    Parameters
+    ----------
+    sim_dir : str
+        The path to the calculation folder.
+    calc_py : str
+        The name of the calculation's Python script.
+    calc_in : str
+        The name of the calculation's input file.
+    sim : str
+        The name of the calculation.
+    stderr_file : str
+        Path to the file where the calculation's stderr is written.
+    
+    Returns
+    -------
+    int
+        The exit code.
+    """
+    # Redirect stdin and stderr
+    with open(os.devnull, 'rb') as f:
+        os.dup2(f.fileno(), 0)
+    with open(stderr_file, 'wb') as f:
+        os.dup2(f.fileno(), 2)
+    
+    # Set up the script's environment
+    os.chdir(sim_dir)
+    sys.path.insert(0, sim_dir)
+    sys.argv = [calc_py, calc_in, sim]
+    
+    # Give each calculation its own random state
+    random.seed()
+    if 'numpy' in sys.modules:
+        sys.modules['numpy'].random.seed()
+    
+    # Run the script, handling exits like the Python interpreter
+    try:
+        runpy.run_path(calc_py, run_name='__main__')
+        code = 0
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except:
+        etype, value, tb = sys.exc_info()
+        while tb is not None and tb.tb_frame.f_code.co_filename != calc_py:
+            tb = tb.tb_next
+        traceback.print_exception(etype, value, tb)
+        code = 1
+    
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return code
+
+def finishcalcs(dbase, run_directory, hold_directory, archive_exclude,
+                finished, completed, errors, log, log_lock):
+    """
+    Finishes calculations passed through a queue until None is received.
+    Each calculation's record is updated with the results and the
+    calculation folder is archived in the database.  Errors in finishing a
+    calculation are logged and do not stop the finishing of others.
+    
+    Parameters
+    ----------
+    dbase : iprPy.Database
+        The database to interact with.
+    run_directory : str
+        The path to the directory where the calculation instances to run are
+        located.
+    hold_directory : str
+        The path for the hold directory where tar archives that failed to be
+        uploaded are moved to.
+    archive_exclude : list of str or None
+        fnmatch-style patterns of files and directories not to archive.
+    finished : queue.Queue
+        The queue of job dicts returned by startcalc().
+    completed : queue.Queue
+        The names of the calculations that have been finished are put here.
+    errors : queue.Queue
+        Fatal errors, i.e. lost database connections, are put here for the
+        runner to raise.
+    log : file-like object
+        The runner log file.
+    log_lock : threading.Lock
+        Lock for writing to log.
+    """
+    # http://docs.python-requests.org
+    import requests
+    
+    while True:
+        job = finished.get()
+        if job is None:
+            break
+        sim = job['sim']
+        
+        try:
+            finishcalc(dbase, run_directory, hold_directory, archive_exclude,
+                       job)
+        
+        # Log errors and keep finishing other calculations
+        except Exception as e:
+            job['log'].append('failed to finish %s:\n%s\n'
+                              % (sim, traceback.format_exc()))
             
-            # Else if bid(sim) failed
+            # Pass ConnectionErrors forward killing runner
+            if isinstance(e, requests.ConnectionError):
+                errors.put(e)
+        
+        finally:
+            try:
+                writelog(log, log_lock, job['log'])
+            except Exception:
+                pass
+            completed.put(sim)
+
+def finishcalc(dbase, run_directory, hold_directory, archive_exclude, job):
+    """
+    Updates a calculation's record with the results and archives the
+    calculation folder in the database.
+    
+    Parameters
+    ----------
+    dbase : iprPy.Database
+        The database to interact with.
+    run_directory : str
+        The path to the directory where the calculation instances to run are
+        located.
+    hold_directory : str
+        The path for the hold directory where tar archives that failed to be
+        uploaded are moved to.  If no archive was made, the calculation
+        folder itself is moved there instead.
+    archive_exclude : list of str or None
+        fnmatch-style patterns of files and directories not to archive.
+    job : dict
+        The job information returned by startcalc().  Log messages are
+        added to job['log'].
+    """
+    sim = job['sim']
+    if 'model' in job:
+        model = job['model']
+    else:
+        # Read stderr of the completed calculation
+        job['stderr'].seek(0)
+        error_message = job['stderr'].read()
+        job['stderr'].close()
+        
+        # Load results.json
+        try:
+            model = DM(os.path.join(run_directory, sim, 'results.json'))
+            job['log'].append('sim calculated successfully\n')
+        
+        # Build error results if no results.json
+        except:
+            model = errormodel(job['record'], error_message)
+    
+    if 'error' in list(model.values())[0]:
+        job['log'].append('error: %s\n' % list(model.values())[0]['error'])
+        with open(os.path.join(run_directory, sim, 'results.json'), 'w') as f:
+            model.json(fp=f, indent=4)
+    
+    # Update record
+    tries = 0
+    while tries < 10:
+        try:
+            dbase.update_record(content=model, name=sim)
+            break
+        except:
+            tries += 1
+    if tries == 10:
+        job['log'].append('failed to update record\n')
+    else:
+        # Archive calculation and add to database or hold_directory
+        try:
+            dbase.add_tar(root_dir=run_directory, name=sim,
+                          exclude=archive_exclude)
+        except:
+            job['log'].append('failed to upload archive\n')
+            if not os.path.isdir(hold_directory):
+                os.makedirs(hold_directory)
+            
+            # Hold the archive if it was made, otherwise the whole folder
+            tar_file = os.path.join(run_directory, sim+'.tar.gz')
+            if os.path.isfile(tar_file):
+                shutil.move(tar_file, hold_directory)
             else:
-                bidfailcount += 1
-                
-                # Stop unproductive worker after 10 consecutive bid fails
-                if bidfailcount > 10:
-                    print("Didn't find an open simulation")
-                    break
-                
-                # Pause for 10 seconds before trying again
-                time.sleep(10)
+                shutil.move(os.path.join(run_directory, sim),
+                            os.path.join(hold_directory, sim))
+                job['log'].append('calculation folder moved to hold\n')
+                job['log'].append('\n')
+                return
+        removecalc(os.path.join(run_directory, sim))
+    job['log'].append('\n')
+
+def errormodel(record, error_message):
+    """
+    Builds results content for a calculation that issued an error.
+    
+    Parameters
+    ----------
+    record : iprPy.Record
+        The calculation's record.
+    error_message : str
+        The error message.
+    
+    Returns
+    -------
+    DataModelDict
+        The record's content with status set to 'error'.
+    """
+    model = record.content
+    keys = list(model.keys())
+    record_type = keys[0]
+    model[record_type]['status'] = 'error'
+    model[record_type]['error'] = str(error_message)
+    return model
+
+def writelog(log, log_lock, messages):
+    """
+    Writes all log messages of a calculation together to the log file.
+    
+    Parameters
+    ----------
+    log : file-like object
+        The runner log file.
+    log_lock : threading.Lock
+        Lock for writing to log.
+    messages : list of str
+        The log messages.
+    """
+    with log_lock:
+        log.write(''.join(messages))
+        log.flush()
+        os.fsync(log.fileno())
+
+class DependencyGraph(object):
+    """
+    Tracks the calculations in a run directory and which of them are waiting
+    on parent calculations that are also in the run directory.  The run
+    directory is only listed again when its contents have changed, and only
+    new calculation folders are inspected.
+    """
+    def __init__(self, run_directory):
+        """
+        Initializes and scans the run directory.
+        
+        Parameters
+        ----------
+        run_directory : str
+            The path to the directory where the calculation instances to run
+            are located.
+        """
+        self.__run_directory = run_directory
+        self.__mtime = None
+        
+        # parents and children of each calculation in the run directory
+        self.__parents = {}
+        self.__children = {}
+        
+        # waiting lists calculations by the unfinished parents they need
+        self.__waiting = {}
+        
+        # ready calculations are handed out in order
+        self.__ready = set()
+        self.__order = []
+        
+        self.scan()
+    
+    def __len__(self):
+        return len(self.__parents)
+    
+    def scan(self, exclude=None, force=False):
+        """
+        Updates the graph with calculations added to or removed from the run
+        directory, and resets the ready list.
+        
+        Parameters
+        ----------
+        exclude : set, optional
+            Names of calculations not to include in the ready list, i.e.
+            those already being handled by this runner.
+        force : bool, optional
+            If True, the run directory will be listed even if its
+            modification time is unchanged.  (Default is False.)
+        """
+        if exclude is None:
+            exclude = set()
+        
+        # List the run directory only if it changed
+        mtime = os.path.getmtime(self.__run_directory)
+        if force or mtime != self.__mtime:
+            self.__mtime = mtime
+            sims = set(os.listdir(self.__run_directory))
             
-            # Regenerate flist and flush log file
-            flist = os.listdir(run_directory)
-            log.flush()
-            os.fsync(log.fileno())
-        print('No simulations left to run')
-        os.chdir(original_dir)
+            for sim in list(self.__parents.keys()):
+                if sim not in sims:
+                    self.remove(sim)
+            for sim in sims:
+                if sim not in self.__parents:
+                    self.add(sim)
+        
+        # Reset the ready list with all unblocked calculations
+        self.__ready = set([sim for sim in self.__parents
+                            if len(self.__waiting[sim]) == 0
+                            and sim not in exclude])
+        self.__order = list(self.__ready)
+        random.shuffle(self.__order)
+    
+    def add(self, sim):
+        """
+        Adds a calculation to the graph.
+        
+        Parameters
+        ----------
+        sim : str
+            The name of the calculation.
+        """
+        sim_dir = os.path.join(self.__run_directory, sim)
+        if not os.path.isdir(sim_dir):
+            return
+        
+        # Parent records are the .json and .xml files other than results
+        parents = set()
+        try:
+            for fname in os.listdir(sim_dir):
+                parent_sim, ext = os.path.splitext(fname)
+                if ext in ('.json', '.xml') and parent_sim != 'results':
+                    parents.add(parent_sim)
+        except OSError:
+            return
+        
+        self.__parents[sim] = parents
+        self.__waiting[sim] = set()
+        for parent_sim in parents:
+            self.__children.setdefault(parent_sim, set()).add(sim)
+            if parent_sim in self.__parents:
+                self.__waiting[sim].add(parent_sim)
+        
+        # Block children already in the graph
+        for child in self.__children.get(sim, ()):
+            if child in self.__parents:
+                self.__waiting[child].add(sim)
+                self.__ready.discard(child)
+    
+    def remove(self, sim):
+        """
+        Removes a finished calculation from the graph, and moves any children
+        with no other unfinished parents to the ready list.
+        
+        Parameters
+        ----------
+        sim : str
+            The name of the calculation.
+        """
+        if sim not in self.__parents:
+            return
+        
+        for parent_sim in self.__parents.pop(sim):
+            children = self.__children.get(parent_sim)
+            if children is not None:
+                children.discard(sim)
+                if len(children) == 0:
+                    del self.__children[parent_sim]
+        del self.__waiting[sim]
+        self.__ready.discard(sim)
+        
+        # Unblock children
+        for child in self.__children.get(sim, ()):
+            if child in self.__parents:
+                self.__waiting[child].discard(sim)
+                if len(self.__waiting[child]) == 0:
+                    self.__ready.add(child)
+                    self.__order.append(child)
+    
+    def next(self):
+        """
+        Takes the next calculation from the ready list.
+        
+        Returns
+        -------
+        str or None
+            The name of a calculation that has no unfinished parents in the
+            run directory, or None if no calculations are ready.
+        """
+        while len(self.__order) > 0:
+            sim = self.__order.pop()
+            if sim in self.__ready:
+                self.__ready.discard(sim)
+                return sim
+        return None
 
 def bid(sim):
     """
     Bids for the chance to run a calculation instance. Used to help avoid
-    runner collisions.
+    runner collisions.  A bid is placed by exclusively creating a runner.bid
+    file in the calculation folder, which only one runner can succeed at
+    even across hosts that share the file system.
     
     Parameters
     ----------
     sim : str
         The path to the calculation to try bidding on.
-        
+    
     Returns
     -------
     bool
         True if bidding is successful, False if bidding fails.
     """
     try:
-        # Wait to make sure sim is not being deleted
-        time.sleep(1)
-        
         # Check if bid already exists
         for fname in os.listdir(sim):
             if fname[-4:] == '.bid':
                 return False
         
-        # Place a bid
-        pid = os.getpid()
-        with open(os.path.join(sim, str(pid)+'.bid'), 'w') as f:
-            f.write('bid for pid: %i' % pid)
-        
-        # Wait to make sure all bids are in
-        time.sleep(1)
-        
-        # Check bids
-        bids = []
-        for fname in os.listdir(sim):
-            if fname[-4:] == '.bid':
-                bids.append(int(fname[:-4]))
-        if min(bids) == pid:
-            return True
-        else:
-            return False
+        # Place a bid: fails if another runner placed one first
+        fd = os.open(os.path.join(sim, 'runner.bid'),
+                     os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        with os.fdopen(fd, 'w') as f:
+            f.write('bid for host: %s pid: %i' % (socket.gethostname(),
+                                                  os.getpid()))
+        return True
     except:
         return False
 
+def releasebid(sim):
+    """
+    Removes this runner's bid from a calculation so that it can be claimed
+    again.
+    
+    Parameters
+    ----------
+    sim : str
+        The path to the calculation.
+    """
+    try:
+        os.remove(os.path.join(sim, 'runner.bid'))
+    except OSError:
+        pass
+
 def get_file(path):
     """
     Uniquely find a single file according to a wildcard string.
@@ -309,7 +1130,7 @@ def get_file(path):
     ----------
     path : str
         The str path with wildcards to use for identifying the file.
-        
+    
     Returns
     -------
     str
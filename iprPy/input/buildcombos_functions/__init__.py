@@ -1,8 +1,11 @@
 """
 Attributes
 ----------
-loaded : dict
-    Dictionary of the derived classes
+loaded : iprPy.tools.dynamic_import.LazyLoaded
+    Mapping of the style names to the derived classes.  Each style is only
+    imported when first accessed.
+failed : dict
+    The error messages of the styles that failed to import.
 databases_dict : dict
     Dictionary of the database styles that successfully loaded. The
     dictionary keys are the database style names, and the values are the
@@ -11,8 +14,8 @@ databases_dict : dict
 # Standard Python libraries
 from __future__ import division, absolute_import, print_function
 
-from ...tools import dynamic_import
+from ...tools import lazy_import
 
-loaded, failed = dynamic_import(__file__, __name__)
+loaded, failed = lazy_import(__file__, __name__)
 
 __all__ = ['failed', 'loaded']
\ No newline at end of file
@@ -72,12 +72,11 @@ def atomicreference(database, keys, lib_directory=None, elements=None, **kwargs)
                 for fname in glob.iglob(os.path.join(lib_directory, 'ref', symbol_str, name)):
                     load_file = os.path.basename(fname)
                     load_name, load_ext = os.path.splitext(load_file)
-                    with open(fname) as f:
-                        load_content = f.read()
                     
                     load_style = load_ext[1:]
                     if load_style in ['xml', 'json']: load_style = 'system_model'
                     elif load_style == 'dump': load_style = 'atom_dump'
+                    elif load_style == 'bin': load_style = 'atom_dump_binary'
                     elif load_style == 'dat': load_style = 'atom_data'
                     
                     for key in keys:
@@ -15,6 +15,7 @@ import atomman.unitconvert as uc
 
 # iprPy imports
 from .. import termtodict
+from ...tools import load_binary_dump
 
 __all__ = ['atomman_systemload']
 
@@ -95,7 +96,7 @@ def atomman_systemload(input_dict, build=True, **kwargs):
     if build is True:
         
         # Load ucell
-        ucell = am.load(load_style, load_file, **load_options_kwargs)
+        ucell = loadsystem(load_style, load_file, load_options_kwargs)
         
          # Replace symbols if given
         if symbols is not None:
@@ -139,7 +140,7 @@ def atomman_systemload(input_dict, build=True, **kwargs):
         # Try to get symbols by loading file
         if symbols is None:
             try:
-                ucell = am.load(load_style, load_file, **load_options_kwargs)
+                ucell = loadsystem(load_style, load_file, load_options_kwargs)
             except:
                 pass
             else:
@@ -182,4 +183,14 @@ def atomman_systemload(input_dict, build=True, **kwargs):
     input_dict[kwargs['box_parameters']] = box_parameters
     input_dict[kwargs['family']] = family
     input_dict[kwargs['ucell']] = ucell
-    input_dict[kwargs['symbols']] = symbols
\ No newline at end of file
+    input_dict[kwargs['symbols']] = symbols
+
+def loadsystem(load_style, load_file, load_options_kwargs):
+    """
+    Loads a system using atomman.load(), or iprPy.tools.load_binary_dump()
+    for the 'atom_dump_binary' style of LAMMPS binary dump files.
+    """
+    if load_style == 'atom_dump_binary':
+        return load_binary_dump(load_file)
+    else:
+        return am.load(load_style, load_file, **load_options_kwargs)
@@ -5,8 +5,8 @@ import os
 import shutil
 import tempfile
 
-# https://github.com/usnistgov/atomman
-import atomman.lammps as lmp
+# iprPy imports
+from ...tools import checkversion
 
 __all__ = ['lammps_commands']
 
@@ -49,7 +49,7 @@ def lammps_commands(input_dict, **kwargs):
     mpi_command = input_dict.get(kwargs['mpi_command'], None)
     
     # Retrieve lammps_version info
-    lammps_version = lmp.checkversion(lammps_command)
+    lammps_version = checkversion(lammps_command)
     
     # Save processed terms
     input_dict[kwargs['mpi_command']] = mpi_command
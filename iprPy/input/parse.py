@@ -2,8 +2,6 @@
 from __future__ import (absolute_import, print_function,
                         division, unicode_literals)
 
-from atomman.tools import uber_open_rmode
-                       
 # iprPy imports
 from ..tools import aslist
 from ..compatibility import stringtype
@@ -57,7 +55,8 @@ def parse(inscript, singularkeys=[], allsingular=False):
     
     params = {}
     
-    # Open inscript
+    # Open inscript: atomman is imported here to keep importing iprPy fast
+    from atomman.tools import uber_open_rmode
     with uber_open_rmode(inscript) as infile:
         
         # Iterate over all lines in infile
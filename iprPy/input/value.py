@@ -2,9 +2,6 @@
 from __future__ import (absolute_import, print_function,
                         division, unicode_literals)
 
-# https://github.com/usnistgov/atomman
-import atomman.unitconvert as uc
-
 __all__ = ['value']
 
 def value(input_dict, key, default_unit=None, default_term=None):
@@ -48,4 +45,6 @@ def value(input_dict, key, default_unit=None, default_term=None):
         value = float(term)
         unit = default_unit
     
+    # atomman is imported here to keep importing iprPy fast
+    import atomman.unitconvert as uc
     return uc.set_in_units(value, unit)
\ No newline at end of file
@@ -2,14 +2,12 @@
 from __future__ import (absolute_import, print_function,
                         division, unicode_literals)
 import os
+import re
 import sys
 
 # http://www.numpy.org/
 import numpy as np
 
-# https://pandas.pydata.org/
-import pandas as pd
-
 # https://github.com/usnistgov/DataModelDict
 from DataModelDict import DataModelDict as DM
 
@@ -21,7 +19,7 @@ class Record(object):
     iprPy.records submodule.
     """
     
-    def __init__(self, name=None, content=None):
+    def __init__(self, name=None, content=None, lazy=False, summary=None):
         """
         Initializes a Record object for a given style.
         
@@ -31,6 +29,14 @@ class Record(object):
             The unique name to assign to the record.
         content : str, file-like object, DataModelDict
             The content of the record as an XML formatted str.
+        lazy : bool, optional
+            If True, content given as a str or file path is not parsed until
+            it is first accessed. (Default is False.)
+        summary : dict, optional
+            The record's todict(full=False, flat=True) representation, if
+            already known.  If given, the database and comparison methods use
+            a copy of summary in place of todict(full=False, flat=True)
+            without accessing content.
         """
         # Get module information for current class
         self_module = sys.modules[self.__module__]
@@ -40,7 +46,9 @@ class Record(object):
             raise TypeError("Don't use Record itself, only use derived classes")
         
         self.name = name
+        self.__lazy = lazy
         self.content = content
+        self.__summary = summary
     
     def __str__(self):
         """
@@ -81,28 +89,77 @@ class Record(object):
     def contentroot(self):
         """str: The root element of the content"""
         raise AttributeError('contentroot not defined for Record style')
-        
+    
     @property
     def content(self):
         """
         DataModelDict: The record's content.
         """
+        # Parse lazy content on first access
+        if self.__rawcontent is not None:
+            self.__content = self.__parse(self.__rawcontent)
+            self.__rawcontent = None
+        
         if self.__content is not None:
+            # Content may be changed by the caller, so drop the summary
+            self.__summary = None
             return self.__content
         else:
             raise AttributeError('content not set')
     
     @content.setter
     def content(self, value):
+        self.__summary = None
+        self.__rawcontent = None
         if value is not None:
-            value = DM(value)
-            if len(value.keys()) == 1 and self.contentroot in value:
-                self.__content = DM(value)
+            if self.__lazy and not isinstance(value, DM):
+                # Read file-like objects now, but save parsing for later
+                try:
+                    value = value.read()
+                except AttributeError:
+                    pass
+                self.__checkroot(value)
+                self.__rawcontent = value
+                self.__content = None
             else:
-                raise ValueError('Invalid root element for content')
+                self.__content = self.__parse(value)
         else:
             self.__content = None
     
+    def __parse(self, value):
+        """
+        Converts content to a DataModelDict and checks its root element.
+        """
+        value = DM(value)
+        if len(value.keys()) == 1 and self.contentroot in value:
+            return DM(value)
+        else:
+            raise ValueError('Invalid root element for content')
+    
+    def __checkroot(self, value):
+        """
+        Checks the root element of unparsed content by only looking at the
+        start of the XML or JSON content or file.
+        """
+        if isinstance(value, bytes):
+            head = value[:1024].decode('utf-8', 'ignore')
+        else:
+            head = value[:1024]
+        
+        # Read the start of the file if value is a file path
+        if head.lstrip()[:1] not in ('<', '{') and os.path.isfile(value):
+            with open(value, 'rb') as f:
+                head = f.read(1024).decode('utf-8', 'ignore')
+        
+        # Find the first element name after any declarations and comments
+        match = re.match(r'\s*(?:(?:<\?.*?\?>|<!--.*?-->)\s*)*<([^\s/>!?]+)',
+                         head, re.DOTALL)
+        if match is None:
+            match = re.match(r'\s*\{\s*"((?:[^"\\]|\\.)*)"', head)
+        
+        if match is not None and match.group(1) != self.contentroot:
+            raise ValueError('Invalid root element for content')
+    
     @property
     def schema(self):
         """
@@ -138,7 +195,7 @@ class Record(object):
             Dictionary of all input parameter terms.
         results_dict : dict, optional
             Dictionary containing any results produced by the calculation.
-            
+        
         Returns
         -------
         DataModelDict
@@ -180,6 +237,30 @@ class Record(object):
         """
         raise AttributeError('todict not defined for Record style')
     
+    def _todict_cached(self, full=True, flat=False):
+        """
+        Calls todict(), except that todict(full=False, flat=True) returns a
+        copy of the record's summary without accessing the content if the
+        record was given one.  Used internally wherever the input-only flat
+        representation of many records is needed.
+        
+        Parameters
+        ----------
+        full : bool, optional
+            Passed to todict() (Default is True).
+        flat : bool, optional
+            Passed to todict() (Default is False).
+        
+        Returns
+        -------
+        dict
+            A dictionary representation of the record's content.
+        """
+        if full is False and flat is True and self.__summary is not None:
+            return dict(self.__summary)
+        else:
+            return self.todict(full=full, flat=flat)
+    
     def isvalid(self):
         """
         Looks at the values of elements in the record to determine if the
@@ -241,6 +322,9 @@ class Record(object):
             given.
         """
         
+        # https://pandas.pydata.org/
+        import pandas as pd
+        
         # Convert database to record_list
         if database is not None:
             if record_df is not None:
@@ -257,7 +341,7 @@ class Record(object):
             
             record_df = []
             for r in record_list:
-                record_df.append(r.todict(full=False, flat=True))
+                record_df.append(r._todict_cached(full=False, flat=True))
             record_df = pd.DataFrame(record_df)
         
         # Return True if no records in record_df
@@ -271,7 +355,7 @@ class Record(object):
             fterms = self.compare_fterms
         
         # Convert record to dictionary
-        record_dict = self.todict(full=False, flat=True)
+        record_dict = self._todict_cached(full=False, flat=True)
         
         # Define slice for comparison testing
         test_df = record_df
@@ -300,7 +384,7 @@ class Record(object):
             if fterm in record_dict and pd.notnull(record_dict[fterm]):
                 test_df = test_df[np.isclose(test_df[fterm],
                                   record_dict[fterm])]
-       
+            
             # Return True if no matching records remain
             if len(test_df) == 0:
                 return True
@@ -308,6 +392,148 @@ class Record(object):
         # Return False indicating that there are matches
         return False
     
+    def isnew_batch(self, candidate_df, record_df=None, record_list=None,
+                    database=None, terms=None, fterms=None):
+        """
+        Checks multiple candidate records of the record's style versus a
+        database, list of records, or DataFrame of records all at once.  The
+        results are the same as calling isnew() for each candidate, but the
+        terms are compared with a single hash join for each pattern of
+        non-NaN candidate terms, and fterms are only compared within the
+        joined groups.
+        
+        Parameters
+        ----------
+        candidate_df : pandas.DataFrame
+            DataFrame of the candidate records to check.  candidate_df must be
+            built by converting records to dictionaries using
+            Record.todict(full=False, flat=True), then converting the list of
+            dictionaries to a DataFrame.
+        record_df : pandas.DataFrame, optional
+            DataFrame to compare candidates againts.  record_df must be built
+            in the same way as candidate_df.  Either record_df, record_list or
+            database must be given.
+        record_list : list of iprPy.Records, optional
+            List of Records to compare against.  Either record_df, record_list
+            or database must be given.
+        database : iprPy.Database, optional
+            Database containing records of record.style to compare against.
+            All records of record.style contained in the database will be
+            checked.  Either record_df, record_list or database must be given.
+        terms : list of str, optional
+            The keys of the dictionary produced by Record.todict(full=False,
+            flat=True) to check for equivalency, i.e. use == comparisons for
+            terms with str and int values. If not given, will use the record
+            style's compare_terms.
+        fterms : list of str, optional
+            The keys of the dictionary produced by Record.todict(full=False,
+            flat=True) to check for approximately equal values, i.e. use
+            numpy.isclose() for terms with float values.  As with isnew(),
+            numpy.isclose() is used with its default tolerances.  If not
+            given, will use the record style's compare_fterms.
+        
+        Returns
+        -------
+        numpy.ndarray of bool
+            True for each row of candidate_df that has no matching records.
+        
+        Raises
+        ------
+        ValueError
+            If more than one of record_df, record_list, and database are 
+            given.
+        """
+        
+        # https://pandas.pydata.org/
+        import pandas as pd
+        
+        # Convert database to record_df
+        if database is not None:
+            if record_df is not None:
+                raise ValueError('record_df and database cannot both be provided')
+            if record_list is not None:
+                raise ValueError('record_list and database cannot both be provided')
+            
+            record_df = database.get_records_df(style=self.style, full=False,
+                                                flat=True)
+        
+        # Convert record_list to record_df
+        if record_list is not None:
+            if record_df is not None:
+                raise ValueError('record_df and record_list cannot both be provided')
+            
+            record_df = []
+            for r in record_list:
+                record_df.append(r._todict_cached(full=False, flat=True))
+            record_df = pd.DataFrame(record_df)
+        
+        candidate_df = candidate_df.reset_index(drop=True)
+        isnew = np.ones(len(candidate_df), dtype=bool)
+        
+        # Return all True if no records in record_df
+        if len(record_df) == 0 or len(candidate_df) == 0:
+            return isnew
+        record_df = record_df.reset_index(drop=True)
+        
+        # Get default terms and fterms lists
+        if terms is None:
+            terms = self.compare_terms
+        if fterms is None:
+            fterms = self.compare_fterms
+        
+        # Build comparison columns for terms
+        cand_df = pd.DataFrame(index=candidate_df.index)
+        test_df = pd.DataFrame(index=record_df.index)
+        keys = []
+        for term in terms:
+            # Compare total size multipliers (high-low)
+            if term in ['a_mult', 'b_mult', 'c_mult']:
+                cand_df[term] = candidate_df[term+'2'] - candidate_df[term+'1']
+                test_df[term] = record_df[term+'2'] - record_df[term+'1']
+            elif term in candidate_df:
+                cand_df[term] = candidate_df[term]
+                test_df[term] = record_df[term]
+            else:
+                continue
+            
+            # Use object dtype so that joins follow == comparisons
+            cand_df[term] = cand_df[term].astype(object)
+            test_df[term] = test_df[term].astype(object)
+            keys.append(term)
+        
+        # Build comparison columns for fterms
+        fkeys = []
+        for fterm in fterms:
+            if fterm in candidate_df:
+                cand_df[fterm] = candidate_df[fterm]
+                test_df[fterm] = record_df[fterm]
+                fkeys.append(fterm)
+        
+        cand_df['candidate'] = cand_df.index
+        cand_df['join'] = test_df['join'] = 0
+        
+        # Only compare candidate terms that are not NaN
+        notnull = cand_df[keys].notnull().values
+        patterns = [tuple(row) for row in notnull]
+        for pattern in set(patterns):
+            ikeys = [key for key, use in zip(keys, pattern) if use]
+            group = cand_df[[p == pattern for p in patterns]]
+            
+            # Join candidates and records with equal terms
+            pairs = pd.merge(group, test_df, on=['join'] + ikeys,
+                             suffixes=('', '_record'))
+            
+            # Compare non-NaN float terms
+            match = np.ones(len(pairs), dtype=bool)
+            for fterm in fkeys:
+                cvalue = pairs[fterm].values.astype(float)
+                rvalue = pairs[fterm + '_record'].values.astype(float)
+                match &= np.isnan(cvalue) | np.isclose(rvalue, cvalue)
+            
+            isnew[pairs['candidate'].values[match].astype(int)] = False
+        
+        return isnew
+    
     def match_df(self, record_df=None, record_list=None, database=None,
               terms=None, fterms=None, atol=0.0, rtol=1e-8):
         """
@@ -356,6 +582,9 @@ class Record(object):
             given.
         """
         
+        # https://pandas.pydata.org/
+        import pandas as pd
+        
         # Convert database to record_list
         if database is not None:
             if record_df is not None:
@@ -372,9 +601,9 @@ class Record(object):
             
             record_df = []
             for r in record_list:
-                record_df.append(r.todict(full=False, flat=True))
+                record_df.append(r._todict_cached(full=False, flat=True))
             record_df = pd.DataFrame(record_df)
-            
+        
         # Return True if no records in record_df
         if len(record_df) == 0:
             return True
@@ -386,8 +615,8 @@ class Record(object):
             fterms = self.compare_fterms
         
         # Convert record to dictionary
-        record_dict = self.todict(full=False, flat=True)
-
+        record_dict = self._todict_cached(full=False, flat=True)
+        
         # Define slice for comparison testing
         test_df = record_df
         
@@ -1,8 +1,11 @@
 """
 Attributes
 ----------
-loaded : dict
-    Dictionary of the derived classes
+loaded : iprPy.tools.dynamic_import.LazyLoaded
+    Mapping of the style names to the derived classes.  Each style is only
+    imported when first accessed.
+failed : dict
+    The error messages of the styles that failed to import.
 databases_dict : dict
     Dictionary of the database styles that successfully loaded. The
     dictionary keys are the database style names, and the values are the
@@ -11,13 +14,14 @@ databases_dict : dict
 # Standard Python libraries
 from __future__ import division, absolute_import, print_function
 
-from ..tools import dynamic_import
+from ..tools import lazy_import
 from .Record import Record
 
 ignorelist = ['Record']
-loaded, failed = dynamic_import(__file__, __name__, ignorelist=ignorelist)
+loaded, failed = lazy_import(__file__, __name__, ignorelist=ignorelist)
 
-def load_record(style, name=None, content=None):
-    return loaded[style](name=name, content=content)
+def load_record(style, name=None, content=None, lazy=False, summary=None):
+    return loaded[style](name=name, content=content, lazy=lazy,
+                         summary=summary)
 
 __all__ = ['Record', 'load_record', 'failed', 'loaded']
\ No newline at end of file
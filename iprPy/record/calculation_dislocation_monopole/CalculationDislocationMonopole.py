@@ -19,7 +19,7 @@ import atomman.unitconvert as uc
 # iprPy imports
 from ... import __version__ as iprPy_version
 from .. import Record
-from ...tools import aslist
+from ...tools import aslist, dump_style
 
 class CalculationDislocationMonopole(Record):
     
@@ -187,13 +187,13 @@ class CalculationDislocationMonopole(Record):
             calc['base-system'] = DM()
             calc['base-system']['artifact'] = DM()
             calc['base-system']['artifact']['file'] = results_dict['dumpfile_base']
-            calc['base-system']['artifact']['format'] = 'atom_dump'
+            calc['base-system']['artifact']['format'] = dump_style(results_dict['dumpfile_base'])
             calc['base-system']['symbols'] = results_dict['symbols_base']
             
             calc['defect-system'] = DM()
             calc['defect-system']['artifact'] = DM()
             calc['defect-system']['artifact']['file'] = results_dict['dumpfile_disl']
-            calc['defect-system']['artifact']['format'] = 'atom_dump'
+            calc['defect-system']['artifact']['format'] = dump_style(results_dict['dumpfile_disl'])
             calc['defect-system']['symbols'] = results_dict['symbols_disl']
             calc['defect-system']['potential-energy'] = uc.model(results_dict['E_total_disl'], 
                                                                  input_dict['energy_unit'])
@@ -19,7 +19,7 @@ import atomman.unitconvert as uc
 # iprPy imports
 from ... import __version__ as iprPy_version
 from .. import Record
-from ...tools import aslist
+from ...tools import aslist, dump_style
 
 class CalculationRelaxBox(Record):
     
@@ -116,6 +116,7 @@ class CalculationRelaxBox(Record):
         run_params['size-multipliers']['c'] = list(input_dict['sizemults'][2])
         
         run_params['strain-range'] = input_dict['strainrange']
+        run_params['cij-update'] = input_dict['cij_update']
         
         # Copy over potential data model info
         calc['potential-LAMMPS'] = DM()
@@ -157,13 +158,13 @@ class CalculationRelaxBox(Record):
             calc['initial-system'] = DM()
             calc['initial-system']['artifact'] = DM()
             calc['initial-system']['artifact']['file'] = results_dict['dumpfile_initial']
-            calc['initial-system']['artifact']['format'] = 'atom_dump'
+            calc['initial-system']['artifact']['format'] = dump_style(results_dict['dumpfile_initial'])
             calc['initial-system']['symbols'] = results_dict['symbols_initial']
             
             calc['final-system'] = DM()
             calc['final-system']['artifact'] = DM()
             calc['final-system']['artifact']['file'] = results_dict['dumpfile_final']
-            calc['final-system']['artifact']['format'] = 'atom_dump'
+            calc['final-system']['artifact']['format'] = dump_style(results_dict['dumpfile_final'])
             calc['final-system']['symbols'] = results_dict['symbols_final']
             
             # Save measured box parameter info
@@ -202,6 +203,17 @@ class CalculationRelaxBox(Record):
             calc['cohesive-energy'] = uc.model(results_dict['E_coh'],
                                                input_dict['energy_unit'],
                                                results_dict.get('E_coh_std', None))
+            
+            # Save the relaxation cycle info
+            calc['relaxation'] = relax = DM()
+            relax['cycles'] = results_dict['cycles']
+            relax['cij-evaluations'] = results_dict['cij_evaluations']
+            for cij, walltime in zip(results_dict['cycle_cij'],
+                                     results_dict['cycle_times']):
+                cycle = DM()
+                cycle['evaluated-cij'] = cij
+                cycle['wall-time'] = uc.model(uc.set_in_units(walltime, 's'), 's')
+                relax.append('cycle', cycle)
         
         self.content = output
     
@@ -288,5 +300,13 @@ class CalculationRelaxBox(Record):
             params['measured_pressure_xy'] = uc.value_unit(calc['measured-phase-state']['pressure-xy'])
             params['measured_pressure_xz'] = uc.value_unit(calc['measured-phase-state']['pressure-xz'])
             params['measured_pressure_yz'] = uc.value_unit(calc['measured-phase-state']['pressure-yz'])
+            
+            # Relaxation cycle info is not in older records
+            if 'relaxation' in calc:
+                params['cycles'] = calc['relaxation']['cycles']
+                params['cij_evaluations'] = calc['relaxation']['cij-evaluations']
+                if flat is False:
+                    params['cycle_times'] = np.array([cycle['wall-time']['value']
+                                            for cycle in calc['relaxation'].aslist('cycle')])
         
         return params
\ No newline at end of file
@@ -19,7 +19,7 @@ import atomman.unitconvert as uc
 # iprPy imports
 from ... import __version__ as iprPy_version
 from .. import Record
-from ...tools import aslist
+from ...tools import aslist, dump_style
 
 class CalculationRelaxStatic(Record):
     
@@ -164,13 +164,13 @@ class CalculationRelaxStatic(Record):
             calc['initial-system'] = DM()
             calc['initial-system']['artifact'] = DM()
             calc['initial-system']['artifact']['file'] = results_dict['dumpfile_initial']
-            calc['initial-system']['artifact']['format'] = 'atom_dump'
+            calc['initial-system']['artifact']['format'] = dump_style(results_dict['dumpfile_initial'])
             calc['initial-system']['symbols'] = results_dict['symbols_initial']
             
             calc['final-system'] = DM()
             calc['final-system']['artifact'] = DM()
             calc['final-system']['artifact']['file'] = results_dict['dumpfile_final']
-            calc['final-system']['artifact']['format'] = 'atom_dump'
+            calc['final-system']['artifact']['format'] = dump_style(results_dict['dumpfile_final'])
             calc['final-system']['symbols'] = results_dict['symbols_final']
             
             # Save measured box parameter info
@@ -19,7 +19,7 @@ import atomman.unitconvert as uc
 # iprPy imports
 from ... import __version__ as iprPy_version
 from .. import Record
-from ...tools import aslist
+from ...tools import aslist, dump_style
 
 class CalculationSurfaceEnergyStatic(Record):
     
@@ -166,15 +166,17 @@ class CalculationSurfaceEnergyStatic(Record):
             calc['defect-free-system'] = DM()
             calc['defect-free-system']['artifact'] = DM()
             calc['defect-free-system']['artifact']['file'] = results_dict['dumpfile_base']
-            calc['defect-free-system']['artifact']['format'] = 'atom_dump'
+            calc['defect-free-system']['artifact']['format'] = dump_style(results_dict['dumpfile_base'])
             calc['defect-free-system']['symbols'] = input_dict['symbols']
             calc['defect-free-system']['potential-energy'] = uc.model(results_dict['E_total_base'], 
                                                                       input_dict['energy_unit'])
+            if results_dict.get('reference_key', None) is not None:
+                calc['defect-free-system']['reference-key'] = results_dict['reference_key']
             
             calc['defect-system'] = DM()
             calc['defect-system']['artifact'] = DM()
             calc['defect-system']['artifact']['file'] = results_dict['dumpfile_surf']
-            calc['defect-system']['artifact']['format'] = 'atom_dump'
+            calc['defect-system']['artifact']['format'] = dump_style(results_dict['dumpfile_surf'])
             calc['defect-system']['symbols'] = input_dict['symbols']
             calc['defect-system']['potential-energy'] = uc.model(results_dict['E_total_surf'],
                                                                  input_dict['energy_unit'])
@@ -0,0 +1,218 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import datetime
+
+# iprPy imports
+from .checkversion import checkversion
+
+# https://lammps.sandia.gov/doc/Python_library.html
+try:
+    from lammps import lammps
+except ImportError:
+    lammps = None
+
+class LammpsEngine(object):
+    """
+    Runs LAMMPS for calculations that perform many similar simulations.  By
+    default, each simulation is performed by calling lammps_command as a
+    separate subprocess.  In library mode, a single LAMMPS instance is
+    created using the LAMMPS Python module and is kept alive for all
+    simulations.  Note that library mode runs the LAMMPS build that the
+    Python module links to, which may differ from lammps_command, so the
+    version property should be recorded instead of lammps_command's version.
+    """
+    def __init__(self, lammps_command, mpi_command=None, library=False):
+        """
+        Initializes the engine.
+        
+        Parameters
+        ----------
+        lammps_command :str
+            Command for running LAMMPS.
+        mpi_command : str, optional
+            The MPI command for running LAMMPS in parallel.  If given, library
+            mode cannot be used.
+        library : bool, optional
+            If True, library mode is used.  If False (default), each
+            simulation is performed as a separate subprocess.
+        
+        Raises
+        ------
+        ValueError
+            If library is True and mpi_command is given.
+        ImportError
+            If library is True and the LAMMPS Python module is not found.
+        """
+        self.__lammps_command = lammps_command
+        self.__mpi_command = mpi_command
+        self.__lmp = None
+        self.__lammps_date = None
+        self.__lammps_version = None
+        
+        if library is True:
+            if mpi_command is not None:
+                raise ValueError('library mode cannot use mpi_command')
+            if lammps is None:
+                raise ImportError('LAMMPS Python module not found')
+            self.__lmp = lammps(cmdargs=['-screen', 'none', '-log', 'none'])
+            
+            # Get lammps version from the library
+            version = str(self.__lmp.version())
+            self.__lammps_date = datetime.date(int(version[:4]),
+                                               int(version[4:6]),
+                                               int(version[6:8]))
+            self.__lammps_version = '%i %s' % (self.__lammps_date.day,
+                                               self.__lammps_date.strftime('%b %Y'))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    @property
+    def library(self):
+        """bool: True if a live LAMMPS instance is being used."""
+        return self.__lmp is not None
+    
+    @property
+    def lammps_date(self):
+        """datetime.date: The date version of LAMMPS."""
+        if self.__lammps_date is None:
+            self.__lammps_date = checkversion(self.__lammps_command)['date']
+        return self.__lammps_date
+    
+    @property
+    def lammps_version(self):
+        """str: The version of LAMMPS that is actually run."""
+        if self.__lammps_version is None:
+            self.__lammps_version = checkversion(self.__lammps_command)['version']
+        return self.__lammps_version
+    
+    def run(self, script_name, logfile='log.lammps'):
+        """
+        Runs a LAMMPS input script.  In library mode, the live instance is
+        cleared first and the log is closed after the script so that it is
+        completely written before being parsed.  Any following commands are
+        not logged.
+        
+        Parameters
+        ----------
+        script_name : str
+            Path to the LAMMPS input script file to run.
+        logfile : str, optional
+            Path to the LAMMPS log file to write (default is 'log.lammps').
+        
+        Returns
+        -------
+        atomman.lammps.Log
+            The parsed LAMMPS log file.
+        """
+        # atomman is imported here to keep importing iprPy fast
+        import atomman.lammps as lmp
+        
+        if self.library:
+            self.__lmp.command('clear')
+            self.__lmp.command('log %s' % logfile)
+            self.__lmp.file(script_name)
+            self.__lmp.command('log none')
+            return lmp.Log(logfile)
+        else:
+            return lmp.run(self.__lammps_command, script_name,
+                           self.__mpi_command, logfile=logfile)
+    
+    def command(self, *commands):
+        """
+        Executes commands in the live LAMMPS instance.  Library mode only.
+        
+        Parameters
+        ----------
+        *commands : str
+            The LAMMPS commands to execute in order.
+        
+        Raises
+        ------
+        ValueError
+            If not in library mode.
+        """
+        if not self.library:
+            raise ValueError('commands require library mode')
+        for command in commands:
+            self.__lmp.command(command)
+    
+    def extract_variable(self, name):
+        """
+        Evaluates an equal-style variable in the live LAMMPS instance.
+        Library mode only.
+        
+        Parameters
+        ----------
+        name : str
+            The name of the variable.
+        
+        Returns
+        -------
+        float
+            The variable's value.
+        
+        Raises
+        ------
+        ValueError
+            If not in library mode.
+        """
+        if not self.library:
+            raise ValueError('extract_variable requires library mode')
+        return self.__lmp.extract_variable(name, None, 0)
+    
+    def change_box(self, system, units):
+        """
+        Changes the box of the live LAMMPS instance to match a system's box,
+        remapping the atom positions.  Library mode only.
+        
+        Parameters
+        ----------
+        system : atomman.System
+            The system with the new box.
+        units : str
+            The LAMMPS units style being used.
+        """
+        self.command(self.change_box_command(system, units))
+    
+    @staticmethod
+    def change_box_command(system, units):
+        """
+        Builds the LAMMPS change_box command that changes the box to match a
+        system's box, remapping the atom positions.
+        
+        Parameters
+        ----------
+        system : atomman.System
+            The system with the new box.
+        units : str
+            The LAMMPS units style being used.
+        
+        Returns
+        -------
+        str
+            The change_box command.
+        """
+        # atomman is imported here to keep importing iprPy fast
+        import atomman.lammps as lmp
+        import atomman.unitconvert as uc
+        
+        length_unit = lmp.style.unit(units)['length']
+        box = system.box
+        values = [uc.get_in_units(value, length_unit) for value in
+                  [box.xlo, box.xhi, box.ylo, box.yhi, box.zlo, box.zhi,
+                   box.xy, box.xz, box.yz]]
+        change = 'change_box all x final %.16e %.16e y final %.16e %.16e z final %.16e %.16e' % tuple(values[:6])
+        if box.xy != 0.0 or box.xz != 0.0 or box.yz != 0.0:
+            change += ' xy final %.16e xz final %.16e yz final %.16e' % tuple(values[6:])
+        return change + ' remap units box'
+    
+    def close(self):
+        """Closes the live LAMMPS instance, if any."""
+        if self.__lmp is not None:
+            self.__lmp.close()
+            self.__lmp = None
@@ -4,7 +4,20 @@ from __future__ import division, absolute_import, print_function
 from .aslist import aslist, iaslist
 from .filltemplate import filltemplate
 from .screen_input import screen_input
-from .dynamic_import import dynamic_import
+from .dynamic_import import dynamic_import, lazy_import
+from .filemode import set_default_mode
+from .checkversion import checkversion
+from .LammpsEngine import LammpsEngine
+from .lammpsdump import (dump_extension, dump_style, load_dump, save_dump,
+                         load_binary_dump, dump_binary)
+from .referencecache import (reference_key, potential_files_hash,
+                             system_reference_key, use_reference_dump,
+                             load_reference, save_reference)
 
-__all__ = ['aslist', 'iaslist', 'filltemplate', 'screen_input', 'dynamic_import']
+__all__ = ['aslist', 'iaslist', 'filltemplate', 'screen_input', 'dynamic_import',
+           'lazy_import', 'set_default_mode', 'checkversion', 'LammpsEngine', 'dump_extension',
+           'dump_style', 'load_dump', 'save_dump', 'load_binary_dump',
+           'dump_binary', 'reference_key', 'potential_files_hash',
+           'system_reference_key', 'use_reference_dump', 'load_reference',
+           'save_reference']
 __all__.sort()
\ No newline at end of file
@@ -0,0 +1,105 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import os
+import json
+import datetime
+import tempfile
+
+try:
+    from shutil import which
+except ImportError:
+    from distutils.spawn import find_executable as which
+
+# iprPy imports
+from .. import rootdir
+from .filemode import set_default_mode
+
+# Path to the on-disk cache of LAMMPS versions
+cachefile = os.path.join(rootdir, '.lammps_versions.json')
+
+# In-memory cache of LAMMPS versions
+versions = {}
+
+def checkversion(lammps_command):
+    """
+    Gets the version of a LAMMPS executable the same as
+    atomman.lammps.checkversion(), but caches the results in memory and in an
+    on-disk cache file so that LAMMPS only needs to be executed once for each
+    executable.  The cache entries are keyed by the executable's path,
+    modification time and size so that changed executables are checked
+    again.
+    
+    Parameters
+    ----------
+    lammps_command :str
+        Command for running LAMMPS.
+    
+    Returns
+    -------
+    dict
+        Dictionary consisting of keys:
+        
+        - **'version'** (*str*) - The LAMMPS version.
+        - **'date'** (*datetime.date*) - The date of the LAMMPS version.
+    """
+    # Identify the executable
+    exe = which(lammps_command)
+    if exe is None:
+        key = lammps_command
+    else:
+        exe = os.path.realpath(exe)
+        stat = os.stat(exe)
+        key = '%s:%r:%i' % (exe, stat.st_mtime, stat.st_size)
+    
+    # Check in-memory cache
+    try:
+        return dict(versions[key])
+    except KeyError:
+        pass
+    
+    # Check on-disk cache
+    cache = loadcache()
+    if exe is not None and key in cache:
+        version = cache[key]
+        versions[key] = {'version': version['version'],
+                         'date': datetime.datetime.strptime(version['date'],
+                                                            '%Y-%m-%d').date()}
+        return dict(versions[key])
+    
+    # Run LAMMPS: atomman is imported here to keep importing iprPy fast
+    import atomman.lammps as lmp
+    versions[key] = lmp.checkversion(lammps_command)
+    
+    # Add to on-disk cache
+    if exe is not None:
+        cache = loadcache()
+        cache[key] = {'version': versions[key]['version'],
+                      'date': versions[key]['date'].isoformat()}
+        savecache(cache)
+    
+    return dict(versions[key])
+
+def loadcache():
+    """Loads the on-disk LAMMPS version cache, returning {} if unreadable."""
+    try:
+        with open(cachefile) as f:
+            return json.load(f)
+    except:
+        return {}
+
+def savecache(cache):
+    """
+    Saves the on-disk LAMMPS version cache by writing and renaming a
+    temporary file so that readers never see partial contents.  Failing to
+    save is not an error, as the cache only avoids running LAMMPS.
+    """
+    try:
+        fd, tempname = tempfile.mkstemp(dir=os.path.dirname(cachefile),
+                                        prefix='.lammps_versions')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cache, f, indent=4)
+        set_default_mode(tempname)
+        os.rename(tempname, cachefile)
+    except:
+        pass
@@ -4,6 +4,10 @@ from __future__ import (absolute_import, print_function,
 import os
 import sys
 from importlib import import_module
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
 def dynamic_import(module_file, module_name, ignorelist=[]):
     """
@@ -12,6 +16,12 @@ def dynamic_import(module_file, module_name, ignorelist=[]):
     
     Parameters
     ----------
+    module_file : str
+        The __file__ of the package containing the submodules.
+    module_name : str
+        The __name__ of the package containing the submodules.
+    ignorelist : list of str, optional
+        Names of submodules that are not styles.
     
     Returns
     -------
@@ -19,13 +29,69 @@ def dynamic_import(module_file, module_name, ignorelist=[]):
         Contains the derived classes that were successfully loaded and
         accessible by style name (root submodule).
     failed : dict
-        
+        Contains the error messages of the styles that failed to import.
+    """
+    names = submodule_names(module_file, ignorelist=ignorelist)
+    loaded = {}
+    failed = {}
+    
+    for name in names:
+        try:
+            loaded[name] = import_style(name, module_name)
+        except:
+            failed[name] = '%s: %s' % sys.exc_info()[:2]
+    
+    return loaded, failed
+
+def lazy_import(module_file, module_name, ignorelist=[]):
+    """
+    Finds the submodules like dynamic_import, but only imports each one
+    when its class is first accessed.  This keeps importing iprPy fast, as
+    the dependencies of the styles that are not used are never imported.
+    
+    Parameters
+    ----------
+    module_file : str
+        The __file__ of the package containing the submodules.
+    module_name : str
+        The __name__ of the package containing the submodules.
+    ignorelist : list of str, optional
+        Names of submodules that are not styles.
+    
+    Returns
+    -------
+    loaded : LazyLoaded
+        Mapping of style names to the derived classes, which imports each
+        style on first access.
+    failed : dict
+        Contains the error messages of the styles that failed to import.
+        Filled in as styles are accessed.
+    """
+    names = submodule_names(module_file, ignorelist=ignorelist)
+    failed = {}
+    loaded = LazyLoaded(names, module_name, failed)
+    
+    return loaded, failed
+
+def submodule_names(module_file, ignorelist=[]):
+    """
+    Lists the names of the submodules of a package without importing them.
+    
+    Parameters
+    ----------
+    module_file : str
+        The __file__ of the package containing the submodules.
+    ignorelist : list of str, optional
+        Names of submodules to ignore.
+    
+    Returns
+    -------
+    list of str
+        The submodule names.
     """
     names = []
     dir = os.path.dirname(module_file)
     ignorelist = ['__init__', '__pycache__'] + ignorelist
-    loaded = {}
-    failed = {}
     
     for name in os.listdir(dir):
         if os.path.isdir(os.path.join(dir, name)):
@@ -39,15 +105,82 @@ def dynamic_import(module_file, module_name, ignorelist=[]):
                 if name not in ignorelist and name not in names:
                     names.append(name)
     
-    for name in names:
-        try:
-            module = import_module('.'+name, module_name)
-            all = getattr(module, '__all__')
-            if len(all) != 1:
-                raise AttributeError("module's __all__ must have only one attribute")
-        except:
-            failed[name] = '%s: %s' % sys.exc_info()[:2]
-        else:
-            loaded[name] = getattr(module, all[0])
+    return names
+
+def import_style(name, module_name):
+    """
+    Imports a style submodule and returns the class or function that it
+    defines.
+    
+    Parameters
+    ----------
+    name : str
+        The submodule's name.
+    module_name : str
+        The __name__ of the package containing the submodule.
+    
+    Returns
+    -------
+    object
+        The one attribute listed in the submodule's __all__.
+    
+    Raises
+    ------
+    AttributeError
+        If the submodule's __all__ does not have exactly one attribute.
+    """
+    module = import_module('.'+name, module_name)
+    all = getattr(module, '__all__')
+    if len(all) != 1:
+        raise AttributeError("module's __all__ must have only one attribute")
+    return getattr(module, all[0])
+
+class LazyLoaded(Mapping):
+    """
+    Mapping of style names to their classes that imports each style's
+    submodule the first time that the style is accessed.  Styles that fail
+    to import are moved to the failed dict and raise KeyErrors.
+    """
+    def __init__(self, names, module_name, failed):
+        """
+        Parameters
+        ----------
+        names : list of str
+            The names of the style submodules.
+        module_name : str
+            The __name__ of the package containing the submodules.
+        failed : dict
+            Dict where the error messages of styles that fail to import are
+            saved.
+        """
+        self.__names = list(names)
+        self.__module_name = module_name
+        self.__failed = failed
+        self.__loaded = {}
+    
+    def __getitem__(self, name):
+        if name not in self.__loaded:
+            if name not in self.__names or name in self.__failed:
+                raise KeyError(name)
+            try:
+                self.__loaded[name] = import_style(name, self.__module_name)
+            except:
+                self.__failed[name] = '%s: %s' % sys.exc_info()[:2]
+                raise KeyError(name)
+        return self.__loaded[name]
+    
+    def __iter__(self):
+        for name in self.__names:
+            if name not in self.__failed:
+                yield name
+    
+    def __len__(self):
+        return len([name for name in self])
     
-    return loaded, failed
\ No newline at end of file
+    def importall(self):
+        """Imports all styles that have not been accessed yet."""
+        for name in self.__names:
+            try:
+                self[name]
+            except KeyError:
+                pass
\ No newline at end of file
@@ -0,0 +1,22 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import os
+
+# Read the process umask once, as reading it requires briefly changing it
+umask = os.umask(0)
+os.umask(umask)
+
+def set_default_mode(path):
+    """
+    Gives a file the permissions that it would have if it was created with
+    open() rather than tempfile.mkstemp(), which only lets the owner read
+    and write.  Used for files that are written to a temporary name and
+    renamed into place in directories shared with other users.
+    
+    Parameters
+    ----------
+    path : str
+        The path to the file.
+    """
+    os.chmod(path, 0o666 & ~umask)
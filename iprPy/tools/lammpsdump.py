@@ -0,0 +1,281 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import io
+import struct
+
+# http://www.numpy.org/
+import numpy as np
+
+# Magic string identifying the newer LAMMPS binary dump formats
+magic_string = b'DUMPCUSTOM'
+
+def dump_extension(dump_format):
+    """
+    Gives the file extension for LAMMPS dump files of a dump format.  LAMMPS
+    writes binary dump files whenever the file name ends with '.bin'.
+    
+    Parameters
+    ----------
+    dump_format : str
+        The dump format: 'text' or 'binary'.
+    
+    Returns
+    -------
+    str
+        '.dump' for 'text' or '.bin' for 'binary'.
+    
+    Raises
+    ------
+    ValueError
+        If dump_format is not supported.
+    """
+    if dump_format == 'text':
+        return '.dump'
+    elif dump_format == 'binary':
+        return '.bin'
+    else:
+        raise ValueError('Unsupported dump_format ' + str(dump_format))
+
+def dump_style(fname):
+    """
+    Gives the artifact format of a dump file based on its extension.
+    
+    Parameters
+    ----------
+    fname : str
+        The dump file's name.
+    
+    Returns
+    -------
+    str
+        'atom_dump_binary' if fname ends with '.bin', otherwise 'atom_dump'.
+    """
+    if fname.endswith('.bin'):
+        return 'atom_dump_binary'
+    else:
+        return 'atom_dump'
+
+def load_dump(fname, symbols=None):
+    """
+    Loads a system from a text or binary LAMMPS dump file, identified by the
+    file name's extension.
+    
+    Parameters
+    ----------
+    fname : str
+        Path to the dump file.
+    symbols : str or list, optional
+        The atomic symbols to assign to the system's atom types.
+    
+    Returns
+    -------
+    atomman.System
+        The loaded system.
+    """
+    if dump_style(fname) == 'atom_dump_binary':
+        return load_binary_dump(fname, symbols=symbols)
+    else:
+        # atomman is imported here to keep importing iprPy fast
+        import atomman as am
+        return am.load('atom_dump', fname, symbols=symbols)
+
+def save_dump(system, fname):
+    """
+    Saves a system to a text or binary LAMMPS dump file, identified by the
+    file name's extension.
+    
+    Parameters
+    ----------
+    system : atomman.System
+        The system to save.
+    fname : str
+        Path to the dump file.
+    """
+    if dump_style(fname) == 'atom_dump_binary':
+        dump_binary(system, fname)
+    else:
+        system.dump('atom_dump', f=fname)
+
+def load_binary_dump(data, symbols=None, columns=None):
+    """
+    Loads a system from the last snapshot of a LAMMPS binary custom dump.
+    
+    Parameters
+    ----------
+    data : str or bytes
+        Path to the binary dump file, or its contents.
+    symbols : str or list, optional
+        The atomic symbols to assign to the system's atom types.
+    columns : list of str, optional
+        The names of the per-atom columns.  Only needed for files written by
+        LAMMPS versions that do not save the column names, for which the
+        default is ['id', 'type', 'x', 'y', 'z', 'c_peatom'].
+    
+    Returns
+    -------
+    atomman.System
+        The loaded system.  Atoms are sorted by id and the id values are kept
+        as the atom_id property, matching atomman's atom_dump load.
+    """
+    # Read the file's contents
+    if not isinstance(data, bytes):
+        with open(data, 'rb') as f:
+            data = f.read()
+    f = io.BytesIO(data)
+    
+    def read(fmt):
+        values = struct.unpack('=' + fmt, f.read(struct.calcsize('=' + fmt)))
+        if len(values) == 1:
+            return values[0]
+        return values
+    
+    snapshot = None
+    while f.tell() < len(data):
+        
+        # Check for the format magic string
+        ntimestep = read('q')
+        revision = 0
+        if ntimestep < 0:
+            if f.read(-ntimestep) != magic_string:
+                raise ValueError('Unsupported binary dump file')
+            endian, revision = read('2i')
+            if endian != 1:
+                raise ValueError('Binary dump file has different endianness')
+            ntimestep = read('q')
+        
+        # Read the header
+        natoms = read('q')
+        triclinic = read('i')
+        if triclinic > 1:
+            raise ValueError('General triclinic binary dumps are not supported')
+        boundary = read('6i')
+        bounds = np.array(read('6d'))
+        if triclinic == 1:
+            tilts = np.array(read('3d'))
+        else:
+            tilts = np.zeros(3)
+        size_one = read('i')
+        
+        # Newer formats include units, time and column names
+        names = columns
+        if revision > 0:
+            unit_len = read('i')
+            f.read(unit_len)
+            if read('c') != b'\x00':
+                read('d')
+            names = f.read(read('i')).decode('utf-8').split()
+        if names is None:
+            names = ['id', 'type', 'x', 'y', 'z', 'c_peatom']
+        if len(names) != size_one:
+            raise ValueError('Number of columns does not match the dump file')
+        
+        # Read the per-atom values from each processor's chunk
+        nchunk = read('i')
+        values = []
+        for i in range(nchunk):
+            n = read('i')
+            values.append(np.frombuffer(f.read(8 * n), dtype=np.float64))
+        values = np.concatenate(values).reshape((natoms, size_one))
+        
+        snapshot = (boundary, bounds, tilts, names, values)
+    
+    if snapshot is None:
+        raise ValueError('No snapshots found in binary dump file')
+    boundary, bounds, tilts, names, values = snapshot
+    
+    # Convert bounding box to box lo, hi values: atomman is imported here to
+    # keep importing iprPy fast
+    import atomman as am
+    xy, xz, yz = tilts
+    box = am.Box(xlo=bounds[0] - min(0.0, xy, xz, xy + xz),
+                 xhi=bounds[1] - max(0.0, xy, xz, xy + xz),
+                 ylo=bounds[2] - min(0.0, yz),
+                 yhi=bounds[3] - max(0.0, yz),
+                 zlo=bounds[4], zhi=bounds[5],
+                 xy=xy, xz=xz, yz=yz)
+    pbc = [boundary[0] == 0, boundary[2] == 0, boundary[4] == 0]
+    
+    # Sort atoms by id
+    values = values[np.argsort(values[:, names.index('id')])]
+    
+    # Build atoms, identifying the position columns
+    pos = None
+    scale = False
+    for posnames, posscale in [(['x', 'y', 'z'], False),
+                               (['xu', 'yu', 'zu'], False),
+                               (['xs', 'ys', 'zs'], True),
+                               (['xsu', 'ysu', 'zsu'], True)]:
+        if all([name in names for name in posnames]):
+            pos = values[:, [names.index(name) for name in posnames]]
+            scale = posscale
+            break
+    if pos is None:
+        raise ValueError('No atomic positions found in binary dump file')
+    atoms = am.Atoms(atype=values[:, names.index('type')].astype(int), pos=pos)
+    atoms.atom_id = values[:, names.index('id')].astype(int)
+    for i, name in enumerate(names):
+        if name not in ['id', 'type'] and name not in posnames:
+            setattr(atoms, name, values[:, i])
+    
+    return am.System(atoms=atoms, box=box, pbc=pbc, scale=scale,
+                     symbols=symbols)
+
+def dump_binary(system, fname):
+    """
+    Saves a system as a LAMMPS binary custom dump in the newer LAMMPS format
+    that includes column names.  The columns are id, type, x, y, z, and any
+    other per-atom scalar properties.
+    
+    Parameters
+    ----------
+    system : atomman.System
+        The system to save.
+    fname : str
+        Path to the dump file.
+    """
+    # Collect per-atom columns
+    names = ['id', 'type', 'x', 'y', 'z']
+    columns = [np.arange(1, system.natoms + 1), system.atoms.atype,
+               system.atoms.pos[:, 0], system.atoms.pos[:, 1],
+               system.atoms.pos[:, 2]]
+    for name in system.atoms.prop():
+        if name in ['atype', 'pos', 'atom_id']:
+            continue
+        value = np.asarray(system.atoms.view[name])
+        if value.shape == (system.natoms,):
+            names.append(name)
+            columns.append(value)
+    values = np.array(columns, dtype=np.float64).T
+    
+    # Find bounding box values
+    box = system.box
+    xy, xz, yz = box.xy, box.xz, box.yz
+    bounds = [box.xlo + min(0.0, xy, xz, xy + xz),
+              box.xhi + max(0.0, xy, xz, xy + xz),
+              box.ylo + min(0.0, yz), box.yhi + max(0.0, yz),
+              box.zlo, box.zhi]
+    boundary = []
+    for pbc in system.pbc:
+        if pbc:
+            boundary += [0, 0]
+        else:
+            boundary += [3, 3]
+    columnstr = ' '.join(names).encode('utf-8')
+    
+    with open(fname, 'wb') as f:
+        f.write(struct.pack('=q', -len(magic_string)))
+        f.write(magic_string)
+        f.write(struct.pack('=2i', 1, 2))
+        f.write(struct.pack('=2q', 0, system.natoms))
+        f.write(struct.pack('=i', 1))
+        f.write(struct.pack('=6i', *boundary))
+        f.write(struct.pack('=6d', *bounds))
+        f.write(struct.pack('=3d', xy, xz, yz))
+        f.write(struct.pack('=i', len(names)))
+        f.write(struct.pack('=i', 0))
+        f.write(struct.pack('=c', b'\x00'))
+        f.write(struct.pack('=i', len(columnstr)))
+        f.write(columnstr)
+        f.write(struct.pack('=2i', 1, values.size))
+        f.write(values.tobytes())
@@ -0,0 +1,219 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+# http://www.numpy.org/
+import numpy as np
+
+# iprPy imports
+from .filemode import set_default_mode
+from .checkversion import checkversion
+from .lammpsdump import load_dump, save_dump
+
+def reference_key(terms):
+    """
+    Builds a content-addressed key for a reference result from all input
+    terms that the result depends on.
+    
+    Parameters
+    ----------
+    terms : dict
+        The input terms.  Values can be str, int, float, bool, None, lists of
+        these, or numpy arrays.
+    
+    Returns
+    -------
+    str
+        The hex digest of the SHA-256 hash of the terms.
+    """
+    h = hashlib.sha256()
+    for name in sorted(terms):
+        value = terms[name]
+        h.update(name.encode('utf-8') + b'\x00')
+        if isinstance(value, np.ndarray):
+            value = np.ascontiguousarray(value)
+            h.update(('%s%r' % (value.dtype.str, value.shape)).encode('utf-8'))
+            h.update(value.tobytes())
+        else:
+            h.update(json.dumps(value, sort_keys=True).encode('utf-8'))
+        h.update(b'\x00')
+    return h.hexdigest()
+
+def potential_files_hash(pair_info):
+    """
+    Hashes the contents of the potential parameter files used by a set of
+    LAMMPS potential commands, so that reference results are not shared
+    after a potential's files change.
+    
+    Parameters
+    ----------
+    pair_info : str
+        The LAMMPS commands for the potential, as generated by
+        Potential.pair_info().  Every term that is the path to an existing
+        file is treated as a parameter file.
+    
+    Returns
+    -------
+    str
+        The hex digest of the SHA-256 hash of the files' contents.
+    """
+    h = hashlib.sha256()
+    for term in pair_info.split():
+        if os.path.isfile(term):
+            h.update(term.encode('utf-8') + b'\x00')
+            with open(term, 'rb') as f:
+                for block in iter(lambda: f.read(1048576), b''):
+                    h.update(block)
+            h.update(b'\x00')
+    return h.hexdigest()
+
+def system_reference_key(calculation, lammps_command, potential, system,
+                         **params):
+    """
+    Builds the reference key for a calculation's results for an atomic
+    system, which depend on the LAMMPS version, the potential and its
+    parameter files, the system and the calculation's run parameters.
+    
+    Parameters
+    ----------
+    calculation : str
+        The name of the calculation style that the results are for.
+    lammps_command : str
+        Command for running LAMMPS.
+    potential : atomman.lammps.Potential
+        The LAMMPS implemented potential to use.
+    system : atomman.System
+        The system being evaluated.
+    **params : str, int, float, bool or None
+        All other parameters that the results depend on, such as etol,
+        ftol, maxiter, maxeval and dmax.
+    
+    Returns
+    -------
+    str
+        The reference key.
+    """
+    lammps_date = checkversion(lammps_command)['date']
+    pair_info = potential.pair_info(system.symbols)
+    terms = {'calculation': calculation,
+             'lammps_date': lammps_date.isoformat(),
+             'pair_info': pair_info,
+             'potential_files': potential_files_hash(pair_info),
+             'units': potential.units,
+             'atom_style': potential.atom_style,
+             'box': system.box.vects,
+             'origin': system.box.origin,
+             'pbc': system.pbc,
+             'atype': system.atoms.atype,
+             'pos': system.atoms.pos,
+             'symbols': list(system.symbols)}
+    
+    # Convert numpy scalars so that the parameters are JSON serializable
+    for name in params:
+        value = params[name]
+        if isinstance(value, np.generic):
+            value = value.item()
+        terms['param_' + name] = value
+    
+    return reference_key(terms)
+
+def use_reference_dump(reference_file, dump_file, symbols):
+    """
+    Makes a local copy of a dump file from a reference result, converting it
+    if the reference was saved using a different dump format.
+    
+    Parameters
+    ----------
+    reference_file : str
+        The path to the dump file in the reference cache, as returned by
+        load_reference.
+    dump_file : str
+        The path to save the dump file to.  The extension sets the format.
+    symbols : tuple
+        The model symbols of the system's atom types.
+    """
+    if os.path.splitext(reference_file)[1] == os.path.splitext(dump_file)[1]:
+        shutil.copyfile(reference_file, dump_file)
+    else:
+        save_dump(load_dump(reference_file, symbols=symbols), dump_file)
+
+def load_reference(cache_directory, key):
+    """
+    Loads a reference result saved by save_reference.
+    
+    Parameters
+    ----------
+    cache_directory : str
+        The path to the shared reference cache directory.
+    key : str
+        The reference result's key, as built by reference_key.
+    
+    Returns
+    -------
+    tuple or None
+        None if no result is saved for key.  Otherwise, the result's values
+        as a dict and a dict of the paths to the result's saved files keyed
+        by the files' original names.
+    """
+    try:
+        with open(os.path.join(cache_directory, key + '.json')) as f:
+            reference = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    
+    files = {}
+    for name in reference['files']:
+        files[name] = os.path.join(cache_directory, key + '-' + name)
+        if not os.path.isfile(files[name]):
+            return None
+    
+    return reference['values'], files
+
+def save_reference(cache_directory, key, values, files=None):
+    """
+    Saves a reference result for other calculations to use.  The result's
+    files are copied first and the values are saved last by renaming a
+    temporary file, so that readers only see complete results.  Failing to
+    save is not an error, as the cache only avoids repeating simulations.
+    
+    Parameters
+    ----------
+    cache_directory : str
+        The path to the shared reference cache directory.
+    key : str
+        The reference result's key, as built by reference_key.
+    values : dict
+        The result's values.  Must be JSON serializable.
+    files : list of str, optional
+        Paths to files that are part of the result.
+    """
+    if files is None:
+        files = []
+    try:
+        if not os.path.isdir(cache_directory):
+            os.makedirs(cache_directory)
+        
+        # Copy files
+        names = []
+        for fname in files:
+            name = os.path.basename(fname)
+            fd, tempname = tempfile.mkstemp(dir=cache_directory, prefix='.' + key)
+            os.close(fd)
+            shutil.copyfile(fname, tempname)
+            set_default_mode(tempname)
+            os.rename(tempname, os.path.join(cache_directory, key + '-' + name))
+            names.append(name)
+        
+        # Save values
+        fd, tempname = tempfile.mkstemp(dir=cache_directory, prefix='.' + key)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'values': values, 'files': names}, f, indent=4)
+        set_default_mode(tempname)
+        os.rename(tempname, os.path.join(cache_directory, key + '.json'))
+    except (IOError, OSError):
+        pass
@@ -0,0 +1,95 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import os
+import tarfile
+
+# https://pytest.org/
+import pytest
+
+# iprPy imports
+from iprPy.database import archive
+
+def make_files(root):
+    """Creates a calculation folder to archive, returning its file contents."""
+    contents = {}
+    os.makedirs(os.path.join(root, 'sim', 'sub'))
+    for name, size in [('sim/results.json', 100),
+                       ('sim/sub/log.lammps', 20000),
+                       ('sim/big.bin', 5000000),
+                       ('sim/empty.txt', 0),
+                       ('sim/skip.restart', 10)]:
+        data = os.urandom(size)
+        with open(os.path.join(root, name), 'wb') as f:
+            f.write(data)
+        contents[name] = data
+    return contents
+
+@pytest.mark.parametrize('codec', ['gz', 'zst'])
+def test_indexed_archive(tmpdir, codec):
+    if codec == 'zst':
+        pytest.importorskip('zstandard')
+    root = str(tmpdir)
+    contents = make_files(root)
+    archive_file = os.path.join(root, 'sim' + archive.extensions[codec])
+    archive.make_archive(archive_file, root_dir=root, base_dir='sim',
+                         codec=codec, exclude=['*.restart'], index=True)
+    del contents['sim/skip.restart']
+    
+    with archive.open_archive(archive_file) as tar:
+        assert isinstance(tar, archive.IndexedArchive)
+        names = tar.getnames()
+        assert sorted(names) == sorted(['sim', 'sim/sub'] + list(contents))
+        
+        # Members are read from their offsets
+        for name in contents:
+            assert tar.extractfile(name).read() == contents[name]
+        assert tar.extractfile('sim/sub') is None
+        with pytest.raises(KeyError):
+            tar.extractfile('sim/skip.restart')
+        
+        # Other methods use the fully opened archive
+        assert sorted(tar.getmembers()[i].name
+                      for i in range(len(names))) == sorted(names)
+    
+    # The archive can be read without the index
+    with open(archive_file, 'rb') as f:
+        tar = archive.open_archive(f.read())
+    assert isinstance(tar, tarfile.TarFile)
+    for name in contents:
+        assert tar.extractfile(name).read() == contents[name]
+    tar.close()
+
+def test_gz_archive_readable_by_tarfile(tmpdir):
+    root = str(tmpdir)
+    contents = make_files(root)
+    archive_file = os.path.join(root, 'sim.tar.gz')
+    archive.make_archive(archive_file, root_dir=root, base_dir='sim')
+    
+    assert not os.path.isfile(archive_file + archive.index_extension)
+    with tarfile.open(archive_file) as tar:
+        for name in contents:
+            assert tar.extractfile(name).read() == contents[name]
+
+def test_stale_index(tmpdir):
+    root = str(tmpdir)
+    make_files(root)
+    archive_file = os.path.join(root, 'sim.tar.gz')
+    archive.make_archive(archive_file, root_dir=root, base_dir='sim',
+                         index=True)
+    assert archive.load_index(archive_file) is not None
+    
+    # Archives get the same permissions as files created with open
+    mask = os.umask(0)
+    os.umask(mask)
+    for fname in [archive_file, archive_file + archive.index_extension]:
+        assert os.stat(fname).st_mode & 0o777 == 0o666 & ~mask
+    
+    # An index that does not match the archive file is ignored
+    with open(archive_file, 'ab') as f:
+        f.write(b'\0' * 512)
+    assert archive.load_index(archive_file) is None
+    assert isinstance(archive.open_archive(archive_file), tarfile.TarFile)
+    
+    archive.delete_archive(archive_file)
+    assert os.listdir(root) == ['sim']
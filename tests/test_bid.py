@@ -0,0 +1,49 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import os
+import threading
+
+# iprPy imports
+from iprPy.database.runner import bid
+
+def test_bid_once(tmpdir):
+    sim = str(tmpdir)
+    assert bid(sim) is True
+    assert bid(sim) is False
+    
+    with open(os.path.join(sim, 'runner.bid')) as f:
+        assert 'pid: %i' % os.getpid() in f.read()
+
+def test_bid_existing(tmpdir):
+    sim = str(tmpdir)
+    with open(os.path.join(sim, 'other.bid'), 'w') as f:
+        f.write('bid')
+    assert bid(sim) is False
+    assert not os.path.isfile(os.path.join(sim, 'runner.bid'))
+
+def test_bid_missing(tmpdir):
+    assert bid(os.path.join(str(tmpdir), 'missing')) is False
+
+def test_bid_race(tmpdir):
+    sims = [str(tmpdir.mkdir('sim%i' % i)) for i in range(20)]
+    wins = []
+    lock = threading.Lock()
+    start = threading.Event()
+    
+    def bidder():
+        start.wait()
+        for sim in sims:
+            if bid(sim):
+                with lock:
+                    wins.append(sim)
+    
+    threads = [threading.Thread(target=bidder) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    start.set()
+    for thread in threads:
+        thread.join()
+    
+    # Every calculation is won by exactly one bidder
+    assert sorted(wins) == sorted(sims)
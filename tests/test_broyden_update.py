@@ -0,0 +1,59 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+
+# http://www.numpy.org/
+import numpy as np
+
+# iprPy imports
+from iprPy.calculation.relax_box.calc_relax_box import broyden_update
+
+def compliances():
+    """Returns 3x3 normal compliances of a cubic crystal (1/GPa)."""
+    C11, C12 = 170.0, 120.0
+    C = np.full((3, 3), C12) + np.identity(3) * (C11 - C12)
+    return np.linalg.inv(C)
+
+def test_secant_condition():
+    rng = np.random.RandomState(0)
+    compliance = compliances()
+    strain = rng.normal(scale=1e-3, size=3)
+    delta_residual = rng.normal(size=3)
+    
+    updated = broyden_update(compliance, strain, delta_residual)
+    
+    # The updated compliances reproduce the measured step
+    assert np.allclose(-updated.dot(delta_residual), strain)
+    
+    # The update only changes the compliances by rank one
+    assert np.linalg.matrix_rank(updated - compliance) == 1
+    
+    # Directions with no component along the step are unchanged
+    u = np.cross(strain.dot(compliance), rng.normal(size=3))
+    assert np.allclose(updated.dot(u), compliance.dot(u))
+
+def test_exact_compliances_unchanged():
+    rng = np.random.RandomState(1)
+    compliance = compliances()
+    
+    # Steps of a linear response that the compliances already predict
+    for i in range(3):
+        strain = rng.normal(scale=1e-3, size=3)
+        delta_residual = -np.linalg.solve(compliance, strain)
+        updated = broyden_update(compliance, strain, delta_residual)
+        assert np.allclose(updated, compliance)
+
+def test_ill_conditioned():
+    compliance = compliances()
+    
+    # No change in residual
+    updated = broyden_update(compliance, np.array([1e-3, 0.0, 0.0]),
+                             np.zeros(3))
+    assert updated is compliance
+    
+    # Step orthogonal to the predicted step
+    delta_residual = np.array([1.0, 0.0, 0.0])
+    predicted = compliance.dot(delta_residual)
+    strain = np.cross(predicted, [0.0, 0.0, 1.0])
+    updated = broyden_update(compliance, strain, delta_residual)
+    assert updated is compliance
@@ -0,0 +1,24 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+
+# iprPy imports
+from iprPy.database.prepare import ContentCache
+
+def test_other_values_returned_as_is():
+    cache = ContentCache(None)
+    for value in ['', 'abc', 'file', 'record', 'abc def']:
+        assert cache.get(value) == value
+
+def test_file_content_cached(tmpdir):
+    fname = str(tmpdir.join('system.json'))
+    with open(fname, 'w') as f:
+        f.write('content')
+    
+    cache = ContentCache(None, maxsize=1)
+    assert cache.get('file ' + fname) == b'content'
+    
+    # Cached content is returned without reading the file again
+    with open(fname, 'w') as f:
+        f.write('changed')
+    assert cache.get('file ' + fname) == b'content'
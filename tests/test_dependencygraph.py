@@ -0,0 +1,81 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import os
+
+# iprPy imports
+from iprPy.database.runner import DependencyGraph
+
+def make_sim(run_directory, sim, parents=()):
+    """Creates a calculation folder with parent record files."""
+    sim_dir = os.path.join(run_directory, sim)
+    os.mkdir(sim_dir)
+    for parent in parents:
+        with open(os.path.join(sim_dir, parent + '.json'), 'w') as f:
+            f.write('{}')
+    with open(os.path.join(sim_dir, 'calc_test.in'), 'w') as f:
+        f.write('')
+
+def take_all(graph):
+    """Takes all ready calculations from a graph."""
+    sims = []
+    sim = graph.next()
+    while sim is not None:
+        sims.append(sim)
+        sim = graph.next()
+    return sims
+
+def test_parents_block_children(tmpdir):
+    run_directory = str(tmpdir)
+    make_sim(run_directory, 'a')
+    make_sim(run_directory, 'b', ['a'])
+    make_sim(run_directory, 'c', ['a', 'b'])
+    make_sim(run_directory, 'd', ['external'])
+    
+    graph = DependencyGraph(run_directory)
+    assert len(graph) == 4
+    assert sorted(take_all(graph)) == ['a', 'd']
+    
+    graph.remove('a')
+    assert take_all(graph) == ['b']
+    
+    graph.remove('b')
+    assert take_all(graph) == ['c']
+
+def test_results_file_is_not_a_parent(tmpdir):
+    run_directory = str(tmpdir)
+    make_sim(run_directory, 'results')
+    make_sim(run_directory, 'a', ['results'])
+    
+    graph = DependencyGraph(run_directory)
+    assert sorted(take_all(graph)) == ['a', 'results']
+
+def test_scan_changes(tmpdir):
+    run_directory = str(tmpdir)
+    make_sim(run_directory, 'a')
+    with open(os.path.join(run_directory, 'notes.txt'), 'w') as f:
+        f.write('not a calculation')
+    
+    graph = DependencyGraph(run_directory)
+    assert take_all(graph) == ['a']
+    
+    # New children of calculations in the graph wait on them
+    make_sim(run_directory, 'b', ['a'])
+    graph.scan(force=True)
+    assert take_all(graph) == ['a']
+    
+    # Removing a parent folder unblocks its children
+    os.remove(os.path.join(run_directory, 'a', 'calc_test.in'))
+    os.rmdir(os.path.join(run_directory, 'a'))
+    graph.scan(force=True)
+    assert len(graph) == 1
+    assert take_all(graph) == ['b']
+
+def test_scan_exclude(tmpdir):
+    run_directory = str(tmpdir)
+    make_sim(run_directory, 'a')
+    make_sim(run_directory, 'b')
+    
+    graph = DependencyGraph(run_directory)
+    graph.scan(exclude=set(['a']))
+    assert take_all(graph) == ['b']
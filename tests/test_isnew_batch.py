@@ -0,0 +1,72 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import random
+
+# http://www.numpy.org/
+import numpy as np
+
+# https://pandas.pydata.org/
+import pandas as pd
+
+# iprPy imports
+import iprPy
+
+def random_row(rng):
+    """Builds a random flat E_vs_r_scan record dictionary."""
+    row = {'script': rng.choice(['calc_E_vs_r_scan', 'calc_other']),
+           'load_file': rng.choice(['a.json', 'b.json', np.nan]),
+           'load_options': rng.choice(['', 'x']),
+           'symbols': rng.choice(['Al', 'Ni Al']),
+           'potential_LAMMPS_key': rng.choice(['k1', 'k2']),
+           'number_of_steps_r': rng.choice([200, 100]),
+           'maximum_r': rng.choice([6.0, 6.0 + 1e-10, 5.0, np.nan]),
+           'minimum_r': rng.choice([2.0, 1.0])}
+    for m in 'abc':
+        row[m + '_mult1'] = rng.choice([0, -1])
+        row[m + '_mult2'] = rng.choice([3, 2])
+    return row
+
+def test_isnew_batch_matches_isnew():
+    rng = random.Random(1)
+    record_df = pd.DataFrame([random_row(rng) for i in range(200)])
+    candidate_df = pd.DataFrame([random_row(rng) for i in range(300)])
+    
+    record = iprPy.load_record('calculation_E_vs_r_scan', 'x')
+    batch = record.isnew_batch(candidate_df, record_df=record_df)
+    
+    single = []
+    for row in candidate_df.to_dict('records'):
+        candidate = iprPy.load_record('calculation_E_vs_r_scan', 'c',
+                                      summary=row)
+        single.append(candidate.isnew(record_df=record_df))
+    
+    assert 0 < batch.sum() < len(batch)
+    assert np.array_equal(batch, single)
+
+def test_isnew_batch_compares_total_multipliers():
+    rng = random.Random(2)
+    row = random_row(rng)
+    record_df = pd.DataFrame([row])
+    
+    # Shifted multipliers with the same totals match
+    shifted = dict(row)
+    shifted['a_mult1'] -= 1
+    shifted['a_mult2'] -= 1
+    
+    # Different totals do not match
+    bigger = dict(row)
+    bigger['a_mult2'] += 1
+    
+    record = iprPy.load_record('calculation_E_vs_r_scan', 'x')
+    isnew = record.isnew_batch(pd.DataFrame([row, shifted, bigger]),
+                               record_df=record_df)
+    assert isnew.tolist() == [False, False, True]
+
+def test_isnew_batch_empty_records():
+    rng = random.Random(3)
+    candidate_df = pd.DataFrame([random_row(rng) for i in range(5)])
+    
+    record = iprPy.load_record('calculation_E_vs_r_scan', 'x')
+    isnew = record.isnew_batch(candidate_df, record_df=pd.DataFrame())
+    assert isnew.all()
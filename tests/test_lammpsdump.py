@@ -0,0 +1,73 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import os
+
+# https://pytest.org/
+import pytest
+
+# http://www.numpy.org/
+import numpy as np
+
+# https://github.com/usnistgov/atomman
+import atomman as am
+
+# iprPy imports
+from iprPy.tools import (dump_extension, dump_style, load_dump, save_dump,
+                         load_binary_dump)
+
+# Dump files of the same 108 atom system written by LAMMPS 22 Jul 2025
+files_dir = os.path.join(os.path.dirname(__file__), 'files')
+binary_file = os.path.join(files_dir, 'lammps-custom.bin')
+text_file = os.path.join(files_dir, 'lammps-custom.dump')
+
+def test_dump_format_names():
+    assert dump_extension('text') == '.dump'
+    assert dump_extension('binary') == '.bin'
+    with pytest.raises(ValueError):
+        dump_extension('netcdf')
+    
+    assert dump_style('perfect.dump') == 'atom_dump'
+    assert dump_style('perfect.bin') == 'atom_dump_binary'
+
+def test_load_lammps_binary():
+    binary = load_dump(binary_file, symbols='Cu')
+    text = load_dump(text_file, symbols='Cu')
+    
+    assert binary.natoms == text.natoms == 108
+    assert np.allclose(binary.box.vects, text.box.vects, rtol=0, atol=1e-12)
+    assert np.allclose(binary.box.origin, text.box.origin, rtol=0, atol=1e-12)
+    assert np.array_equal(binary.atoms.atype, text.atoms.atype)
+    assert np.array_equal(binary.atoms.atom_id, text.atoms.atom_id)
+    assert np.allclose(binary.atoms.pos, text.atoms.pos, rtol=0, atol=1e-12)
+    assert np.allclose(binary.atoms.c_peatom, text.atoms.c_peatom,
+                       rtol=1e-12, atol=0)
+    assert binary.pbc.tolist() == [True, True, True]
+    assert binary.symbols == ('Cu',)
+
+def test_load_bytes():
+    with open(binary_file, 'rb') as f:
+        data = f.read()
+    system = load_binary_dump(data, symbols='Cu')
+    assert np.array_equal(system.atoms.pos,
+                          load_dump(binary_file, symbols='Cu').atoms.pos)
+
+@pytest.mark.parametrize('pbc', [[True, True, True], [True, True, False]])
+def test_round_trip(tmpdir, pbc):
+    rng = np.random.RandomState(0)
+    box = am.Box(avect=[3.1, 0.0, 0.0], bvect=[0.4, 3.3, 0.0],
+                 cvect=[0.2, -0.3, 3.7], origin=[-1.0, 0.5, 2.0])
+    atoms = am.Atoms(atype=rng.randint(1, 3, 50), pos=rng.rand(50, 3))
+    system = am.System(atoms=atoms, box=box, scale=True, pbc=pbc,
+                       symbols=['Al', 'Ni'])
+    
+    fname = str(tmpdir.join('system.bin'))
+    save_dump(system, fname)
+    loaded = load_dump(fname, symbols=['Al', 'Ni'])
+    
+    # Binary dumps keep the full precision of the values
+    assert np.array_equal(loaded.box.vects, system.box.vects)
+    assert np.array_equal(loaded.box.origin, system.box.origin)
+    assert np.array_equal(loaded.atoms.atype, system.atoms.atype)
+    assert np.array_equal(loaded.atoms.pos, system.atoms.pos)
+    assert loaded.pbc.tolist() == pbc
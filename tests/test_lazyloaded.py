@@ -0,0 +1,84 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import os
+import sys
+import subprocess
+
+# https://pytest.org/
+import pytest
+
+# iprPy imports
+from iprPy.tools.dynamic_import import lazy_import
+
+@pytest.fixture
+def stylepkg(tmpdir):
+    """Creates a temporary package of style submodules on sys.path."""
+    pkgname = 'lazystyles_%d' % id(tmpdir)
+    pkg = tmpdir.mkdir(pkgname)
+    pkg.join('__init__.py').write('')
+    pkg.join('good.py').write("__all__ = ['Good']\n"
+                              "class Good(object):\n"
+                              "    pass\n")
+    pkg.join('broken.py').write("import a_module_that_does_not_exist\n"
+                                "__all__ = ['Broken']\n")
+    pkg.mkdir('other').join('__init__.py').write("__all__ = ['other']\n"
+                                                 "def other():\n"
+                                                 "    return 1\n")
+    sys.path.insert(0, str(tmpdir))
+    yield pkgname, str(pkg.join('__init__.py'))
+    sys.path.remove(str(tmpdir))
+    for name in list(sys.modules):
+        if name.split('.')[0] == pkgname:
+            del sys.modules[name]
+
+def test_import_on_access(stylepkg):
+    pkgname, pkgfile = stylepkg
+    loaded, failed = lazy_import(pkgfile, pkgname)
+    
+    # Nothing is imported until accessed
+    assert pkgname + '.good' not in sys.modules
+    assert loaded['good'].__name__ == 'Good'
+    assert pkgname + '.good' in sys.modules
+    assert pkgname + '.other' not in sys.modules
+    assert loaded['other']() == 1
+    
+    with pytest.raises(KeyError):
+        loaded['missing']
+
+def test_failed_style(stylepkg):
+    pkgname, pkgfile = stylepkg
+    loaded, failed = lazy_import(pkgfile, pkgname)
+    assert sorted(loaded) == ['broken', 'good', 'other']
+    assert failed == {}
+    
+    # Failing styles are moved to failed and raise KeyErrors
+    with pytest.raises(KeyError):
+        loaded['broken']
+    assert list(failed) == ['broken']
+    assert 'a_module_that_does_not_exist' in failed['broken']
+    with pytest.raises(KeyError):
+        loaded['broken']
+    
+    assert sorted(loaded) == ['good', 'other']
+    assert len(loaded) == 2
+
+def test_importall(stylepkg):
+    pkgname, pkgfile = stylepkg
+    loaded, failed = lazy_import(pkgfile, pkgname, ignorelist=['other'])
+    
+    loaded.importall()
+    assert list(failed) == ['broken']
+    assert list(loaded) == ['good']
+    assert pkgname + '.good' in sys.modules
+
+def test_import_iprPy_is_light():
+    # Importing iprPy does not import the styles' large dependencies
+    script = ('import sys, iprPy\n'
+              'print(" ".join(m for m in ["pandas", "requests", "atomman"] '
+              'if m in sys.modules))\n')
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))] + sys.path)
+    output = subprocess.check_output([sys.executable, '-c', script], env=env)
+    assert output.decode('utf-8').strip() == ''
@@ -0,0 +1,49 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import json
+
+# iprPy imports
+from iprPy.calculation.surface_energy_static.calc_surface_energy_static import parent_E_coh
+
+class Potential(object):
+    key = 'pot-key'
+
+def parent_record(root='calculation-relax-static', pressure=0.0):
+    """Builds the content of a finished relaxation record."""
+    phase = {'temperature': {'value': 0.0, 'unit': 'K'}}
+    for term in ['xx', 'yy', 'zz', 'xy', 'xz', 'yz']:
+        phase['pressure-' + term] = {'value': 0.0, 'unit': 'GPa'}
+    phase['pressure-xx']['value'] = pressure
+    return json.dumps({root: {'potential-LAMMPS': {'key': 'pot-key'},
+                              'phase-state': phase,
+                              'cohesive-energy': {'value': -3.54, 'unit': 'eV'}}})
+
+def input_dict(content, load_options='key final-system'):
+    return {'load_style': 'system_model', 'load_file': 'parent.json',
+            'load_content': content, 'load_options': load_options,
+            'box_parameters': None, 'potential': Potential()}
+
+def test_relaxed_parent():
+    assert parent_E_coh(input_dict(parent_record())) == -3.54
+    assert parent_E_coh(input_dict(parent_record('calculation-relax-box'))) == -3.54
+
+def test_other_systems_of_parent():
+    content = parent_record()
+    assert parent_E_coh(input_dict(content, None)) is None
+    assert parent_E_coh(input_dict(content, 'key initial-system')) is None
+    assert parent_E_coh(input_dict(content, 'key final-system index 1')) is None
+
+def test_pressurized_parent():
+    assert parent_E_coh(input_dict(parent_record(pressure=1.0))) is None
+
+def test_untrusted_parents():
+    assert parent_E_coh(input_dict(parent_record('calculation-relax-dynamic'))) is None
+    
+    other = input_dict(parent_record())
+    other['potential'] = type(str('Other'), (object,), {'key': 'other'})()
+    assert parent_E_coh(other) is None
+    
+    rescaled = input_dict(parent_record())
+    rescaled['box_parameters'] = [3.6, 3.6, 3.6]
+    assert parent_E_coh(rescaled) is None
@@ -0,0 +1,32 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+
+# iprPy imports
+from iprPy.record import Record
+
+class CustomRecord(Record):
+    """Record style defined outside of iprPy that overrides todict."""
+    def todict(self, full=True, flat=False):
+        return {'name': self.name, 'full': full, 'flat': flat}
+
+def test_todict_override():
+    record = CustomRecord('x')
+    assert record.todict() == {'name': 'x', 'full': True, 'flat': False}
+    assert (record._todict_cached(full=False, flat=True)
+            == {'name': 'x', 'full': False, 'flat': True})
+
+def test_todict_cached_uses_summary():
+    summary = {'name': 'x', 'key': 'abc'}
+    record = CustomRecord('x', summary=summary)
+    
+    # Only the input-only flat representation comes from the summary
+    cached = record._todict_cached(full=False, flat=True)
+    assert cached == summary
+    cached['key'] = 'changed'
+    assert record._todict_cached(full=False, flat=True) == summary
+    assert record._todict_cached() == {'name': 'x', 'full': True, 'flat': False}
+    
+    # The style's todict is still used when called directly
+    assert record.todict(full=False, flat=True) == {'name': 'x', 'full': False,
+                                                    'flat': True}
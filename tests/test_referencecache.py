@@ -0,0 +1,114 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+import os
+
+# http://www.numpy.org/
+import numpy as np
+
+# iprPy imports
+from iprPy.tools import (reference_key, potential_files_hash,
+                         use_reference_dump, load_reference, save_reference,
+                         load_dump)
+
+files_dir = os.path.join(os.path.dirname(__file__), 'files')
+
+def umask():
+    """Returns the process umask."""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+def test_reference_key():
+    terms = {'potential': 'EAM', 'a': 3.52, 'sizemults': [3, 3, 3],
+             'pos': np.arange(6, dtype=float).reshape(2, 3)}
+    key = reference_key(terms)
+    
+    # Key is deterministic and independent of term order
+    assert key == reference_key(dict(reversed(list(terms.items()))))
+    
+    # Key changes with values
+    assert key != reference_key(dict(terms, a=3.53))
+    assert key != reference_key(dict(terms, sizemults=[3, 3, 4]))
+    
+    # Key changes with array dtype and shape, not just bytes
+    assert key != reference_key(dict(terms, pos=terms['pos'].reshape(3, 2)))
+    assert key != reference_key(dict(terms, pos=terms['pos'].view(np.int64)))
+    
+    # Non-contiguous arrays hash by value
+    assert key == reference_key(dict(terms, pos=np.asfortranarray(terms['pos'])))
+
+def test_potential_files_hash(tmpdir):
+    paramfile = str(tmpdir.join('Ni.eam.alloy'))
+    with open(paramfile, 'w') as f:
+        f.write('Ni parameters')
+    pair_info = 'pair_style eam/alloy\npair_coeff * * %s Ni\n' % paramfile
+    
+    h = potential_files_hash(pair_info)
+    assert h == potential_files_hash(pair_info)
+    
+    # Hash changes when the file's contents change
+    with open(paramfile, 'w') as f:
+        f.write('Ni parameters v2')
+    assert h != potential_files_hash(pair_info)
+    
+    # Potentials without files all hash the same
+    assert (potential_files_hash('pair_style lj/cut 2.5\n')
+            == potential_files_hash('pair_style morse 4.0\n'))
+
+def test_save_load_reference(tmpdir):
+    cache = str(tmpdir.join('cache'))
+    datafile = str(tmpdir.join('perfect.dump'))
+    with open(datafile, 'w') as f:
+        f.write('dump contents')
+    key = reference_key({'a': 1})
+    
+    assert load_reference(cache, key) is None
+    
+    save_reference(cache, key, {'E_total': -44.5}, files=[datafile])
+    values, files = load_reference(cache, key)
+    assert values == {'E_total': -44.5}
+    assert list(files) == ['perfect.dump']
+    with open(files['perfect.dump']) as f:
+        assert f.read() == 'dump contents'
+    
+    # Saved files can be read by other users
+    mode = 0o666 & ~umask()
+    assert os.stat(os.path.join(cache, key + '.json')).st_mode & 0o777 == mode
+    assert os.stat(files['perfect.dump']).st_mode & 0o777 == mode
+    
+    # Other keys are not found
+    assert load_reference(cache, reference_key({'a': 2})) is None
+    
+    # Results with missing files are not used
+    os.remove(files['perfect.dump'])
+    assert load_reference(cache, key) is None
+    
+    # No temporary files are left behind
+    assert sorted(os.listdir(cache)) == [key + '.json']
+
+def test_save_reference_failure(tmpdir):
+    # Failing to save does not raise an error
+    blocker = str(tmpdir.join('blocker'))
+    with open(blocker, 'w') as f:
+        f.write('')
+    cache = os.path.join(blocker, 'cache')
+    save_reference(cache, 'key', {'E_total': -44.5})
+    assert load_reference(cache, 'key') is None
+
+def test_use_reference_dump(tmpdir):
+    binary_file = os.path.join(files_dir, 'lammps-custom.bin')
+    
+    # Dumps in the same format are copied
+    copied = str(tmpdir.join('perfect.bin'))
+    use_reference_dump(binary_file, copied, 'Cu')
+    with open(binary_file, 'rb') as f1, open(copied, 'rb') as f2:
+        assert f1.read() == f2.read()
+    
+    # Dumps in other formats are converted
+    converted = str(tmpdir.join('perfect.dump'))
+    use_reference_dump(binary_file, converted, 'Cu')
+    reference = load_dump(binary_file, symbols='Cu')
+    system = load_dump(converted, symbols='Cu')
+    assert system.natoms == reference.natoms
+    assert np.allclose(system.atoms.pos, reference.atoms.pos, atol=1e-10)
@@ -0,0 +1,31 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+
+# iprPy imports
+from iprPy.calculation.relax_static.calc_relax_static import boxchange
+
+def evaluate(ctol, old, new):
+    """Evaluates the boxchange formula for old and new box terms."""
+    terms = dict(new)
+    for name in old:
+        terms['v_' + name + '0'] = old[name]
+    return eval(boxchange(ctol), {'abs': abs}, terms)
+
+def test_cubic_box_converges_with_tilt_noise():
+    # Round-off noise in zero tilt factors flips sign between cycles
+    old = dict(lx=10.6922636262173, ly=10.6922636262173, lz=10.6922636262173,
+               xy=-2.1e-16, xz=4.0e-16, yz=0.0)
+    new = dict(lx=10.6922636262173, ly=10.6922636262173, lz=10.6922636262173,
+               xy=1.3e-15, xz=-7.0e-16, yz=2.2e-16)
+    assert evaluate(1e-10, old, new) == 0.0
+
+def test_changed_box_not_converged():
+    old = dict(lx=10.6922636262173, ly=10.6922636262173, lz=10.6922636262173,
+               xy=0.0, xz=0.0, yz=0.0)
+    
+    new = dict(old, lx=10.6922636262173 * (1 + 1e-8))
+    assert evaluate(1e-10, old, new) > 0.0
+    
+    new = dict(old, xy=1e-6)
+    assert evaluate(1e-10, old, new) > 0.0
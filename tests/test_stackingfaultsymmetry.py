@@ -0,0 +1,61 @@
+# Standard Python libraries
+from __future__ import (absolute_import, print_function,
+                        division, unicode_literals)
+
+# https://pytest.org/
+import pytest
+
+# http://www.numpy.org/
+import numpy as np
+
+# https://github.com/usnistgov/atomman
+import atomman as am
+
+# iprPy imports
+from iprPy.calculation.stacking_fault_map_2D.calc_stacking_fault_map_2D import stackingfaultsymmetry
+
+def fcc_cell():
+    """Builds a conventional fcc unit cell."""
+    box = am.Box(a=3.6, b=3.6, c=3.6)
+    atoms = am.Atoms(atype=1, pos=[[0.0, 0.0, 0.0], [0.5, 0.5, 0.0],
+                                   [0.5, 0.0, 0.5], [0.0, 0.5, 0.5]])
+    return am.System(atoms=atoms, box=box, scale=True, symbols='Cu')
+
+def test_fcc_100():
+    ucell = fcc_cell()
+    irreducible = stackingfaultsymmetry(ucell, ucell.box.avect,
+                                        ucell.box.bvect, numshifts1=5,
+                                        numshifts2=5, cutboxvector='c')
+    grid = irreducible.reshape(5, 5)
+    
+    # Each point refers to the first point of its set
+    assert np.all(irreducible <= np.arange(25))
+    assert np.all(irreducible[irreducible] == irreducible)
+    
+    # Shift fractions 0 and 1 are equivalent
+    assert grid[0, 0] == grid[0, 4] == grid[4, 0] == grid[4, 4] == 0
+    
+    # The fcc centering translation and the 4-fold rotation
+    assert grid[2, 2] == 0
+    assert grid[0, 1] == grid[1, 0]
+    assert grid[0, 2] != grid[0, 0]
+    
+    assert sorted(set(irreducible)) == [0, 1, 2, 6]
+
+def test_no_symmetry():
+    rng = np.random.RandomState(0)
+    atoms = am.Atoms(atype=1, pos=rng.rand(5, 3))
+    box = am.Box(a=3.0, b=3.3, c=3.7)
+    system = am.System(atoms=atoms, box=box, scale=True, symbols='Cu')
+    irreducible = stackingfaultsymmetry(system, system.box.avect,
+                                        system.box.bvect, numshifts1=5,
+                                        numshifts2=5, cutboxvector='c')
+    
+    # Only the periodic images at fraction 1 are equivalent
+    assert len(set(irreducible)) == 16
+
+def test_invalid_cutboxvector():
+    ucell = fcc_cell()
+    with pytest.raises(ValueError):
+        stackingfaultsymmetry(ucell, ucell.box.avect, ucell.box.bvect,
+                              cutboxvector='d')